@@ -0,0 +1,13 @@
+"""
+Root URLconf for requests served by the ASGI handler.
+
+Same routes as ``TheProject.urls``; the app's read-heavy pages resolve to
+async views (see ``The_App_Code.middleware``).
+"""
+from django.contrib import admin
+from django.urls import include, path
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('', include('The_App_Code.asgi_urls')),
+]
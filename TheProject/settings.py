@@ -64,6 +64,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'The_App_Code.middleware.ASGIUrlconfMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,6 +75,8 @@ MIDDLEWARE = [
 ]
 
 ROOT_URLCONF = 'TheProject.urls'
+# Requests served over ASGI resolve here: the read pages use async views.
+ASGI_URLCONF = 'TheProject.asgi_urls'
 
 TEMPLATES = [
     {
@@ -104,10 +107,93 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Take the write lock when a transaction starts so concurrent
+            # transfers queue on the busy timeout instead of failing.
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        'TEST': {
+            # A file (not shared-cache memory) database lets threaded tests
+            # exercise real locking.
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Per-process memory by default; point CACHE_LOCATION at a directory to
+# share the cache between worker processes without an external server.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'unipay',
+    }
+}
+
+if os.getenv("CACHE_LOCATION"):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv("CACHE_LOCATION"),
+    }
+
+DASHBOARD_CACHE_TIMEOUT = 300
+
+# Rows per bulk_create batch when importing bank statements
+IMPORT_BATCH_SIZE = 1000
+
+# Rows fetched per cursor round-trip when streaming statement exports
+EXPORT_CHUNK_SIZE = 2000
+
+# Background jobs (see The_App_Code/services/jobs.py; run with `manage.py run_jobs`)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BASE_DELAY = 5  # seconds; doubles on every failed attempt
+JOB_RETRY_MAX_DELAY = 3600
+JOB_LOCK_TIMEOUT = 300  # requeue running jobs whose lock has not been refreshed for this long
+JOB_HEARTBEAT_INTERVAL = 60  # seconds between lock refreshes while a job runs; keep well under JOB_LOCK_TIMEOUT
+
+# Outgoing email is written to an outbox and sent by `mail.flush` jobs
+MAIL_BATCH_SIZE = 50  # messages per flush, sent over one connection
+MAIL_RATE_LIMIT = float(os.getenv("MAIL_RATE_LIMIT", "10"))  # messages/second per worker; 0 = unlimited
+MAIL_MAX_ATTEMPTS = 5
+MAIL_LOCK_TIMEOUT = 300
+
+# Password reset links stop working after this many seconds
+PASSWORD_RESET_TIMEOUT = 60 * 60 * 2
+
+# Sliding-window limits checked before any password hashing: {rule: (attempts, window seconds)}
+RATE_LIMITS = {
+    "login:ip": (30, 300),
+    "login:username": (10, 300),
+    "register:ip": (10, 3600),
+}
+
+# Exchange rates (see The_App_Code/services/fx.py; load with `manage.py load_fx_rates`)
+FX_BASE_CURRENCY = "USD"  # feeds quote every rate as units per one of these
+FX_RATE_CACHE_TTL = 300  # seconds a process reuses its rate table before checking for a newer load
+
+# Shard (0-1023) stamped into transfer reference numbers (see The_App_Code/services/references.py).
+# Unset, each process leases a free shard from the ReferenceShard table on first use; set it only
+# to pin a process to a shard that no leasing process can take.
+TRANSFER_REFERENCE_SHARD = os.getenv("TRANSFER_REFERENCE_SHARD")
+TRANSFER_REFERENCE_SHARD_LEASE = 600  # seconds a lease lasts; renewed once half of it has passed
+
+# Transfer fees (see The_App_Code/services/fees.py; rules are edited in the Django admin)
+TRANSFER_FEE_RATE = "0.02"  # fraction charged when no fee rule matches
+FEE_SCHEDULE_CACHE_TTL = 300
+
+# Admin dashboard KPI tiles are served from cache and recomputed by one request once older than this
+ADMIN_KPI_CACHE_TTL = 60
+
+# Live admin feed (server-sent events tailing TransferEvent; streaming needs an ASGI server such as `uvicorn TheProject.asgi:application`)
+SSE_HEARTBEAT_SECONDS = 15
+SSE_POLL_SECONDS = 1  # how often an open stream checks the transfer event log
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -148,3 +234,9 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Hot-path tracing (see The_App_Code/services/tracing.py)
+# Fraction of requests whose span timings and query counts are recorded.
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+TRACE_BUFFER_SIZE = 1000
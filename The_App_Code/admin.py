@@ -1,3 +1,49 @@
 from django.contrib import admin
 
+from .models import AdminAuditLog, FeeRule, TransferEvent
+
 # Register your models here.
+
+
+@admin.register(FeeRule)
+class FeeRuleAdmin(admin.ModelAdmin):
+    list_display = (
+        "name", "sender_country", "recipient_country", "currency",
+        "min_amount", "max_amount", "rate", "flat_fee", "promotion", "priority", "is_active",
+    )
+    list_filter = ("is_active", "currency")
+    search_fields = ("name", "sender_country", "recipient_country")
+
+
+@admin.register(AdminAuditLog)
+class AdminAuditLogAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "actor", "action", "changes", "matched", "affected", "reason")
+    list_filter = ("action",)
+    search_fields = ("reason", "actor__username")
+
+    # The log is append-only.
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(TransferEvent)
+class TransferEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "reference_number", "kind", "from_status", "to_status", "amount", "currency", "compensated", "created_at")
+    list_filter = ("kind", "to_status", "compensated")
+    search_fields = ("reference_number",)
+
+    # The log is append-only.
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
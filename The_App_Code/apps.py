@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class TheAppCodeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'The_App_Code'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        # Importing the services registers their job handlers
+        from .services import mail, notifications  # noqa: F401
@@ -0,0 +1,26 @@
+"""
+The app's routes for requests served over ASGI.
+
+Identical to ``urls`` except that the read-heavy pages resolve to their
+async views. ``ASGIUrlconfMiddleware`` selects this URLconf.
+"""
+from django.urls import path
+
+from .urls import urlpatterns as sync_urlpatterns
+from .views.ForLearning_views import alearning_view, learning_view
+from .views.donate_views import adonate_view, donate_view
+from .views.promotions_views import apromotions_view, promotions_view
+from .views.users_views import ausers_view, users_view
+
+ASYNC_VIEWS = {
+    promotions_view: apromotions_view,
+    learning_view: alearning_view,
+    users_view: ausers_view,
+    donate_view: adonate_view,
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS[pattern.callback], name=pattern.name)
+    if getattr(pattern, "callback", None) in ASYNC_VIEWS else pattern
+    for pattern in sync_urlpatterns
+]
@@ -2,6 +2,7 @@ from django import forms
 from django.contrib.auth.forms import AuthenticationForm
 
 from .models import BudgetEntry, Donation, SavingGoal, Transaction, UserProfile
+from .services import phones
 
 
 class StyledDateInput(forms.DateInput):
@@ -96,6 +97,13 @@ class ProfileForm(forms.ModelForm):
             "language": forms.TextInput(attrs={"class": "field"}),
         })
 
+    def clean(self):
+        cleaned_data = super().clean()
+        e164 = phones.normalize(cleaned_data.get("phone_number"), cleaned_data.get("country"))
+        if e164 and UserProfile.objects.filter(phone_e164=e164).exclude(pk=self.instance.pk).exists():
+            self.add_error("phone_number", "This phone number is already registered.")
+        return cleaned_data
+
 
 class StyledAuthenticationForm(AuthenticationForm):
     """Wrap Django's auth form so templates can use a consistent CSS class."""
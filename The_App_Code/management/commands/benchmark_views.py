@@ -0,0 +1,119 @@
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+DEFAULT_PATHS = ["/promotions/", "/learning/", "/users/", "/donate/"]
+
+
+def _percentile(latencies, fraction):
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec for the read-only pages served by the WSGI handler "
+        "(a thread pool) and the ASGI handler (one event loop), in process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Requests per path and handler.")
+        parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight at once.")
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help=f"Path to request (may be repeated; default: {', '.join(DEFAULT_PATHS)}).",
+        )
+        parser.add_argument("--host", default="localhost", help="Host header; must be in ALLOWED_HOSTS.")
+
+    def handle(self, *args, **options):
+        self.host = options["host"]
+        total, concurrency = options["requests"], options["concurrency"]
+        if total < 1 or concurrency < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+
+        self.stdout.write(f"{'path':<20} {'server':<6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+        for path in options["paths"] or DEFAULT_PATHS:
+            for server, run in (("wsgi", self._run_wsgi), ("asgi", self._run_asgi)):
+                elapsed, latencies, errors = run(path, total, concurrency)
+                self.stdout.write(
+                    f"{path:<20} {server:<6} {total / elapsed:>9.1f} "
+                    f"{_percentile(latencies, 0.5) * 1000:>8.2f} {_percentile(latencies, 0.95) * 1000:>8.2f} {errors:>7}"
+                )
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def _run_wsgi(self, path, total, concurrency):
+        handler = WSGIHandler()
+
+        def one(_):
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": path,
+                "QUERY_STRING": "",
+                "SERVER_NAME": self.host,
+                "SERVER_PORT": "80",
+                "HTTP_HOST": self.host,
+                "wsgi.input": io.BytesIO(b""),
+                "wsgi.url_scheme": "http",
+                "wsgi.errors": io.StringIO(),
+            }
+            status = []
+            start = time.perf_counter()
+            response = handler(environ, lambda code, headers, exc_info=None: status.append(code))
+            b"".join(response)
+            response.close()
+            return time.perf_counter() - start, not status[0].startswith("200")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(one, range(total)))
+            # Worker threads opened their own connections; release them.
+            for future in [pool.submit(connections.close_all) for _ in range(concurrency)]:
+                future.result()
+        elapsed = time.perf_counter() - start
+        return elapsed, [latency for latency, _ in results], sum(failed for _, failed in results)
+
+    def _run_asgi(self, path, total, concurrency):
+        handler = ASGIHandler()
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", self.host.encode())],
+            "client": ("127.0.0.1", 0),
+            "server": (self.host, 80),
+        }
+
+        async def one(gate):
+            async with gate:
+                sent = []
+                request = asyncio.Queue()
+                await request.put({"type": "http.request", "body": b"", "more_body": False})
+
+                async def send(message):
+                    sent.append(message)
+
+                start = time.perf_counter()
+                await handler(dict(scope), request.get, send)
+                return time.perf_counter() - start, sent[0]["status"] != 200
+
+        async def run():
+            gate = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(one(gate) for _ in range(total)))
+
+        start = time.perf_counter()
+        results = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+        return elapsed, [latency for latency, _ in results], sum(failed for _, failed in results)
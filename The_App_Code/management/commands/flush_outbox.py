@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from ...models import OutboxEmail
+from ...services import mail
+
+
+class Command(BaseCommand):
+    help = "Send pending outbox email now, without waiting for the job worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Messages sent per connection (defaults to MAIL_BATCH_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            sent = mail.flush(batch_size=options["batch_size"])
+            total += sent
+            if not sent:
+                break
+        pending = OutboxEmail.objects.filter(status=OutboxEmail.PENDING).count()
+        failed = OutboxEmail.objects.filter(status=OutboxEmail.FAILED).count()
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {total} email(s); {pending} pending retry, {failed} failed."
+        ))
@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services import imports as import_service
+
+
+class Command(BaseCommand):
+    help = "Import a CSV or OFX bank statement into a user's transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Statement file to import.")
+        parser.add_argument("--user", required=True, help="Username that owns the transactions.")
+        parser.add_argument(
+            "--format",
+            choices=[import_service.CSV, import_service.OFX],
+            help="File format; guessed from the extension when omitted.",
+        )
+        parser.add_argument("--batch-size", type=int, help="Rows per bulk insert.")
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user named {options['user']!r}.")
+
+        fmt = options["format"] or import_service.detect_format(options["path"])
+        with open(options["path"], "rb") as handle:
+            report = import_service.import_file(
+                user, handle, fmt=fmt, batch_size=options["batch_size"]
+            )
+
+        for line, error in report.errors:
+            self.stderr.write(f"row {line}: {error}")
+        if report.error_count > len(report.errors):
+            self.stderr.write(f"... and {report.error_count - len(report.errors)} more")
+        self.stdout.write(self.style.SUCCESS(str(report)))
@@ -0,0 +1,33 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services import fx
+
+
+class Command(BaseCommand):
+    help = "Load effective-dated exchange rates from a CSV or JSON feed file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Rate file: CSV with currency,rate,effective_at columns, or JSON.")
+        parser.add_argument(
+            "--format",
+            choices=[fx.CSV, fx.JSON],
+            help="File format; guessed from the extension when omitted.",
+        )
+        parser.add_argument("--source", help="Label stored with each rate (default: the file name).")
+
+    def handle(self, *args, **options):
+        fmt = options["format"] or fx.detect_format(options["path"])
+        source = options["source"] or os.path.basename(options["path"])
+        try:
+            with open(options["path"], "rb") as handle:
+                # Parse the whole feed first so a bad entry loads nothing.
+                entries = list(fx.parse_feed(handle, fmt))
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        loaded = fx.load(entries, source=source)
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {loaded} rate(s) quoted against {fx.base_currency()} from {source}."
+        ))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services import ledger
+
+
+class Command(BaseCommand):
+    help = "Rebuild or verify the per-user balance ledger from the raw transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only compare the ledger with the transactions; do not write anything.",
+        )
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Limit to this user id (may be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        user_ids = options["user_ids"]
+
+        if options["verify"]:
+            mismatches = ledger.verify(user_ids)
+            for row in mismatches:
+                self.stdout.write(
+                    f"user={row['user_id']} currency={row['currency']} kind={row['kind']} "
+                    f"expected={row['expected']} actual={row['actual']}"
+                )
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} ledger row(s) out of sync.")
+            self.stdout.write(self.style.SUCCESS("Ledger matches transactions."))
+            return
+
+        written = ledger.rebuild(user_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} ledger row(s)."))
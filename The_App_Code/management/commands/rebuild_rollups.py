@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services import rollups
+
+
+class Command(BaseCommand):
+    help = "Backfill or verify the monthly transaction rollups from the raw transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only compare the rollups with the transactions; do not write anything.",
+        )
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Limit to this user id (may be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        user_ids = options["user_ids"]
+
+        if options["verify"]:
+            mismatches = rollups.verify(user_ids)
+            for row in mismatches:
+                self.stdout.write(
+                    f"user={row['user_id']} month={row['month']:%Y-%m} category={row['category']!r} "
+                    f"kind={row['kind']} currency={row['currency']} expected={row['expected']} actual={row['actual']}"
+                )
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} rollup row(s) out of sync.")
+            self.stdout.write(self.style.SUCCESS("Rollups match transactions."))
+            return
+
+        written = rollups.rebuild(user_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} rollup row(s)."))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services import donation_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the donate page totals and donor set from the Donation table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drift; do not write anything.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            drift = donation_stats.check()
+            for field, (expected, actual) in drift.items():
+                self.stdout.write(f"{field}: expected={expected} actual={actual}")
+            if drift:
+                raise CommandError("Donation stats are out of sync.")
+            self.stdout.write(self.style.SUCCESS("Donation stats match donations."))
+            return
+
+        stats = donation_stats.reconcile()
+        self.stdout.write(self.style.SUCCESS(
+            f"Reconciled: {stats.total_packs} packs, {stats.donation_count} donations, "
+            f"{stats.donor_count} donors."
+        ))
@@ -0,0 +1,56 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...services import jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs with a pool of worker threads."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=getattr(settings, "JOB_WORKERS", 4),
+            help="Worker threads in this process (run more processes to scale out).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds an idle worker waits before checking the queue again.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no job is ready instead of polling forever.",
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options["workers"])
+        stop = threading.Event()
+        self.stdout.write(f"Starting {workers} job worker(s); Ctrl+C to stop.")
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jobs") as pool:
+            futures = [
+                pool.submit(
+                    jobs.work,
+                    jobs.worker_name(str(index)),
+                    stop,
+                    poll_interval=options["poll_interval"],
+                    drain=options["once"],
+                )
+                for index in range(workers)
+            ]
+            try:
+                while wait(futures, timeout=1).not_done:
+                    pass
+            except KeyboardInterrupt:
+                self.stdout.write("Stopping after the current jobs finish...")
+                stop.set()
+
+        processed = sum(future.result() for future in futures)
+        self.stdout.write(self.style.SUCCESS(f"Ran {processed} job(s)."))
@@ -0,0 +1,33 @@
+"""
+Route requests served by the ASGI handler to the async read views.
+
+WSGI (and runserver) keeps the sync views, so it never pays an
+``async_to_sync`` hop per request. Under ASGI the middleware chain is
+built async, and ``request.urlconf`` switches to ``settings.ASGI_URLCONF``
+where the read-heavy pages are served by their async twins.
+"""
+from __future__ import annotations
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+
+class ASGIUrlconfMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.urlconf = getattr(settings, "ASGI_URLCONF", None)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self.urlconf:
+            request.urlconf = self.urlconf
+        return await self.get_response(request)
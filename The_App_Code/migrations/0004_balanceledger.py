@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_ledger(apps, schema_editor):
+    Transaction = apps.get_model('The_App_Code', 'Transaction')
+    BalanceLedger = apps.get_model('The_App_Code', 'BalanceLedger')
+    rows = (
+        Transaction.objects.order_by()
+        .values('user_id', 'currency', 'kind')
+        .annotate(total=Sum('amount'), entry_count=Count('id'))
+    )
+    BalanceLedger.objects.bulk_create(
+        [
+            BalanceLedger(
+                user_id=row['user_id'],
+                currency=row['currency'],
+                kind=row['kind'],
+                total=row['total'] or 0,
+                entry_count=row['entry_count'],
+            )
+            for row in rows
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('The_App_Code', '0003_passwordresettoken'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('currency', models.CharField(max_length=6)),
+                ('kind', models.CharField(choices=[('incoming', 'Incoming'), ('outgoing', 'Outgoing'), ('transfer_in', 'Transfer Received'), ('transfer_out', 'Transfer Sent')], max_length=12)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_ledger', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'currency', 'kind')},
+            },
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('The_App_Code', '0004_balanceledger'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moneytransfer',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='moneytransfer',
+            constraint=models.UniqueConstraint(fields=('sender', 'idempotency_key'), name='unique_transfer_idempotency_key'),
+        ),
+    ]
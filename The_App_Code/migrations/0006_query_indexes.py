@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('The_App_Code', '0005_moneytransfer_idempotency_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='budgetentry',
+            index=models.Index(fields=['user', 'month'], name='budget_user_month_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['email'], name='donation_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['-created_at'], name='donation_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='moneytransfer',
+            index=models.Index(fields=['-created_at'], name='transfer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='moneytransfer',
+            index=models.Index(fields=['status', '-created_at'], name='transfer_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='moneytransfer',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['-created_at'], name='transfer_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promotion',
+            index=models.Index(fields=['is_active', 'valid_from', 'valid_until'], name='promo_active_validity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promotion',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-priority', 'title'], name='promo_live_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', '-occurred_at'], name='tx_user_occurred_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', '-created_at'], name='tx_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'kind', '-occurred_at'], name='tx_user_kind_occurred_idx'),
+        ),
+    ]
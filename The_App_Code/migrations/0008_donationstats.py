@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:43
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_stats(apps, schema_editor):
+    Donation = apps.get_model('The_App_Code', 'Donation')
+    DonationStats = apps.get_model('The_App_Code', 'DonationStats')
+    DonorEmail = apps.get_model('The_App_Code', 'DonorEmail')
+    per_email = Donation.objects.order_by().values('email').annotate(total=Count('id'))
+    DonorEmail.objects.bulk_create(
+        [DonorEmail(email=row['email'], donation_count=row['total']) for row in per_email],
+        batch_size=500,
+    )
+    totals = Donation.objects.aggregate(packs=Sum('quantity'), donations=Count('id'))
+    DonationStats.objects.create(
+        pk=1,
+        total_packs=totals['packs'] or 0,
+        donation_count=totals['donations'] or 0,
+        donor_count=DonorEmail.objects.count(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('The_App_Code', '0007_userprofile_name_lower_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DonationStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('total_packs', models.PositiveBigIntegerField(default=0)),
+                ('donation_count', models.PositiveIntegerField(default=0)),
+                ('donor_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Donation stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='DonorEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('donation_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('The_App_Code', '0009_transaction_import_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='moneytransfer',
+            index=models.Index(fields=['sender', '-created_at'], name='transfer_sender_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='moneytransfer',
+            index=models.Index(fields=['recipient', '-created_at'], name='transfer_recip_created_idx'),
+        ),
+    ]
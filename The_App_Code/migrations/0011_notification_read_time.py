@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def drop_global_fanout(apps, schema_editor):
+    # Global notifications are resolved at read time now; the per-user rows
+    # written for them by the old fan-out are redundant.
+    NotificationDelivery = apps.get_model('The_App_Code', 'NotificationDelivery')
+    NotificationDelivery.objects.filter(adminnotification__is_global=True).delete()
+
+
+def backfill_watermarks(apps, schema_editor):
+    # Nothing recorded what existing users had read, so count everything
+    # sent before this migration as seen, as start_watermark() does for a
+    # new account. Without a watermark every old global notification would
+    # come back as unread.
+    AdminNotification = apps.get_model('The_App_Code', 'AdminNotification')
+    NotificationWatermark = apps.get_model('The_App_Code', 'NotificationWatermark')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    newest = AdminNotification.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+    last_pk = 0
+    while True:
+        user_ids = list(User.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:BATCH_SIZE])
+        if not user_ids:
+            return
+        last_pk = user_ids[-1]
+        NotificationWatermark.objects.bulk_create(
+            [NotificationWatermark(user_id=user_id, last_seen_id=newest) for user_id in user_ids],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('The_App_Code', '0010_transfer_party_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationWatermark',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_watermark', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('last_seen_id', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        # Adopt the existing auto-created recipients table as an explicit
+        # through model so it can carry a (user, notification) index.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='NotificationDelivery',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('adminnotification', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='The_App_Code.adminnotification')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'The_App_Code_adminnotification_recipients',
+                        'unique_together': {('adminnotification', 'user')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='adminnotification',
+                    name='recipients',
+                    field=models.ManyToManyField(blank=True, related_name='received_notifications', through='The_App_Code.NotificationDelivery', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='adminnotification',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_global', True)), fields=['id'], name='notif_live_global_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationdelivery',
+            index=models.Index(fields=['user', 'adminnotification'], name='notif_delivery_user_idx'),
+        ),
+        migrations.RunPython(drop_global_fanout, migrations.RunPython.noop),
+        migrations.RunPython(backfill_watermarks, migrations.RunPython.noop),
+    ]
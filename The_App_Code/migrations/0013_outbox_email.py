@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:59
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def move_queued_sends(apps, schema_editor):
+    # Email jobs queued before the outbox existed become outbox rows, with
+    # one flush job to send them.
+    Job = apps.get_model('The_App_Code', 'Job')
+    OutboxEmail = apps.get_model('The_App_Code', 'OutboxEmail')
+    queued = Job.objects.filter(name='mail.send', status='queued')
+    emails = []
+    for job in queued:
+        emails.append(OutboxEmail(
+            subject=job.payload.get('subject', ''),
+            body=job.payload.get('message', ''),
+            from_email=job.payload.get('from_email') or '',
+            to=list(job.payload.get('recipient_list') or []),
+        ))
+    if emails:
+        OutboxEmail.objects.bulk_create(emails)
+        Job.objects.create(name='mail.flush')
+    queued.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('The_App_Code', '0012_job_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                ('from_email', models.CharField(blank=True, max_length=254)),
+                ('to', models.JSONField(default=list)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+            options={
+                'ordering': ['next_attempt_at', 'id'],
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['next_attempt_at', 'id'], name='outbox_pending_idx'), models.Index(condition=models.Q(('status', 'sending')), fields=['locked_at'], name='outbox_sending_idx')],
+            },
+        ),
+        migrations.RunPython(move_queued_sends, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:04
+
+from django.db import migrations, models
+
+
+def backfill_email(apps, schema_editor):
+    # The oldest account keeps a shared address; later duplicates stay NULL
+    # until an administrator resolves them.
+    UserProfile = apps.get_model('The_App_Code', 'UserProfile')
+    seen = set()
+    batch = []
+    profiles = UserProfile.objects.exclude(user__email='').select_related('user').order_by('user_id')
+    for profile in profiles.iterator(chunk_size=1000):
+        email = profile.user.email.strip().lower()
+        if email in seen:
+            continue
+        seen.add(email)
+        profile.email_normalized = email
+        batch.append(profile)
+        if len(batch) >= 1000:
+            UserProfile.objects.bulk_update(batch, ['email_normalized'])
+            batch = []
+    UserProfile.objects.bulk_update(batch, ['email_normalized'])
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('The_App_Code', '0013_outbox_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='email_normalized',
+            field=models.EmailField(blank=True, editable=False, max_length=254, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_email, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:06
+
+import re
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+# A frozen copy of services.phones as of this migration, so later changes
+# to the live rules cannot change what this backfill writes.
+CALLING_CODES = {
+    "United States": "1",
+    "Canada": "1",
+    "United Kingdom": "44",
+    "Germany": "49",
+    "France": "33",
+    "Kenya": "254",
+    "Ghana": "233",
+    "Nigeria": "234",
+    "South Africa": "27",
+    "Uganda": "256",
+    "Tanzania": "255",
+    "Rwanda": "250",
+    "Ethiopia": "251",
+    "Senegal": "221",
+    "Morocco": "212",
+    "Australia": "61",
+    "India": "91",
+    "Philippines": "63",
+}
+NATIONAL_LENGTHS = {
+    "1": (10, 10),
+    "44": (9, 10),
+    "49": (6, 11),
+    "33": (9, 9),
+    "254": (9, 9),
+    "233": (9, 9),
+    "234": (8, 10),
+    "27": (9, 9),
+    "256": (9, 9),
+    "255": (9, 9),
+    "250": (9, 9),
+    "251": (9, 9),
+    "221": (9, 9),
+    "212": (9, 9),
+    "61": (9, 9),
+    "91": (10, 10),
+    "63": (8, 10),
+}
+MIN_DIGITS = 8
+MAX_DIGITS = 15
+SEPARATORS = re.compile(r"[\s\-.()/]")
+
+
+def normalize(raw, country):
+    text = SEPARATORS.sub("", raw or "")
+    if text.startswith("00"):
+        text = "+" + text[2:]
+    if text.startswith("+"):
+        digits = text[1:]
+    else:
+        code = CALLING_CODES.get(country or "")
+        if code is None:
+            return None
+        shortest, longest = NATIONAL_LENGTHS[code]
+        if text.startswith(code) and shortest <= len(text) - len(code) <= longest:
+            digits = text
+        elif text.startswith("0"):
+            digits = code + text[1:]
+        else:
+            digits = code + text
+    if not digits.isdigit() or digits.startswith("0"):
+        return None
+    if not MIN_DIGITS <= len(digits) <= MAX_DIGITS:
+        return None
+    return "+" + digits
+
+
+def backfill_e164(apps, schema_editor):
+    # Walk the table in primary-key batches so no batch holds more than
+    # BATCH_SIZE rows. The first profile to claim a number keeps it; numbers
+    # that cannot be parsed, or that repeat, stay NULL.
+    UserProfile = apps.get_model('The_App_Code', 'UserProfile')
+    claimed = set()
+    last_pk = 0
+    while True:
+        batch = list(
+            UserProfile.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .only('pk', 'phone_number', 'country')[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+        last_pk = batch[-1].pk
+        changed = []
+        for profile in batch:
+            e164 = normalize(profile.phone_number, profile.country)
+            if e164 and e164 not in claimed:
+                claimed.add(e164)
+                profile.phone_e164 = e164
+                changed.append(profile)
+        UserProfile.objects.bulk_update(changed, ['phone_e164'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('The_App_Code', '0014_userprofile_email_normalized'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='phone_e164',
+            field=models.CharField(blank=True, editable=False, max_length=16, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_e164, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('The_App_Code', '0015_userprofile_phone_e164'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(max_length=6)),
+                ('rate', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('effective_at', models.DateTimeField()),
+                ('source', models.CharField(blank=True, max_length=100)),
+                ('loaded_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['currency', 'effective_at'],
+                'constraints': [models.UniqueConstraint(fields=('currency', 'effective_at'), name='fx_rate_currency_at_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('The_App_Code', '0016_exchange_rate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeeRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=100)),
+                ('sender_country', models.CharField(blank=True, max_length=64)),
+                ('recipient_country', models.CharField(blank=True, max_length=64)),
+                ('currency', models.CharField(blank=True, max_length=6)),
+                ('min_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('max_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('rate', models.DecimalField(decimal_places=4, default=0, help_text='Fraction of the amount, e.g. 0.0200 for 2%.', max_digits=6)),
+                ('flat_fee', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('min_fee', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('max_fee', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('priority', models.PositiveSmallIntegerField(default=0)),
+                ('is_active', models.BooleanField(default=True)),
+                ('promotion', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='fee_rules', to='The_App_Code.promotion')),
+            ],
+            options={
+                'ordering': ['sender_country', 'recipient_country', 'currency', 'min_amount'],
+            },
+        ),
+    ]
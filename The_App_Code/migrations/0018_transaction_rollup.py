@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:16
+
+import django.db.models.deletion
+from django.conf import settings
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_rollups(apps, schema_editor):
+    Transaction = apps.get_model('The_App_Code', 'Transaction')
+    TransactionRollup = apps.get_model('The_App_Code', 'TransactionRollup')
+    rows = (
+        Transaction.objects.order_by()
+        .annotate(month=TruncMonth('occurred_at', output_field=DateField()))
+        .values('user_id', 'month', 'category', 'kind', 'currency')
+        .annotate(total=Sum('amount'), entry_count=Count('id'))
+    )
+    batch = []
+    for row in rows.iterator(chunk_size=2000):
+        row['total'] = Decimal(row['total'] or 0).quantize(Decimal('0.01'))
+        batch.append(TransactionRollup(**row))
+        if len(batch) >= 500:
+            TransactionRollup.objects.bulk_create(batch)
+            batch = []
+    TransactionRollup.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('The_App_Code', '0017_fee_rule'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('month', models.DateField()),
+                ('category', models.CharField(blank=True, max_length=64)),
+                ('kind', models.CharField(choices=[('incoming', 'Incoming'), ('outgoing', 'Outgoing'), ('transfer_in', 'Transfer Received'), ('transfer_out', 'Transfer Sent')], max_length=12)),
+                ('currency', models.CharField(max_length=6)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transaction_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'month', 'category', 'kind', 'currency')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_events(apps, schema_editor):
+    # Existing transfers start their history with one event carrying their current status.
+    MoneyTransfer = apps.get_model('The_App_Code', 'MoneyTransfer')
+    TransferEvent = apps.get_model('The_App_Code', 'TransferEvent')
+    batch = []
+    for transfer in MoneyTransfer.objects.order_by('created_at', 'pk').iterator(chunk_size=2000):
+        batch.append(TransferEvent(
+            transfer_id=transfer.pk,
+            kind='created',
+            to_status=transfer.status,
+            reference_number=transfer.reference_number,
+            sender_id=transfer.sender_id,
+            recipient_id=transfer.recipient_id,
+            amount=transfer.amount,
+            service_fee=transfer.service_fee,
+            currency=transfer.currency,
+            created_at=transfer.created_at,
+        ))
+        if len(batch) >= 2000:
+            TransferEvent.objects.bulk_create(batch)
+            batch = []
+    TransferEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('The_App_Code', '0019_admin_audit_log'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransferEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('created', 'Created'), ('status_changed', 'Status changed')], max_length=16)),
+                ('from_status', models.CharField(blank=True, max_length=16)),
+                ('to_status', models.CharField(max_length=16)),
+                ('reference_number', models.CharField(max_length=32)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('service_fee', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('currency', models.CharField(max_length=6)),
+                ('compensated', models.BooleanField(default=False)),
+                ('reason', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('recipient', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('sender', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('transfer', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='events', to='The_App_Code.moneytransfer')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['transfer', 'id'], name='transfer_event_transfer_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_events, migrations.RunPython.noop),
+    ]
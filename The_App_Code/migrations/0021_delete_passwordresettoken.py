@@ -0,0 +1,16 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:55
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('The_App_Code', '0020_transfer_event'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='PasswordResetToken',
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('The_App_Code', '0021_delete_passwordresettoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferenceShard',
+            fields=[
+                ('shard', models.PositiveSmallIntegerField(primary_key=True, serialize=False)),
+                ('holder', models.CharField(max_length=64)),
+                ('leased_until', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['shard'],
+            },
+        ),
+    ]
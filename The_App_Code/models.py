@@ -1,6 +1,9 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User  # Add this import
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from decimal import Decimal
 
@@ -46,13 +49,50 @@ class UserProfile(TimeStampedModel):
     address = models.CharField(max_length=255, blank=True)
     postal_code = models.CharField(max_length=12, blank=True)
     phone_number = models.CharField(max_length=32, blank=True, unique=True)
+    # phone_number in E.164, kept in sync by save(); transfers look recipients up here
+    phone_e164 = models.CharField(max_length=16, unique=True, null=True, blank=True, editable=False)
+    # Lower-cased copy of user.email; the unique index makes sign-up race-safe
+    email_normalized = models.EmailField(max_length=254, unique=True, null=True, blank=True, editable=False)
     language = models.CharField(max_length=32, default="English")
     role = models.CharField(max_length=16, choices=ROLE_CHOICES, default=STANDARD)
     is_active = models.BooleanField(default=True)
+
+    class Meta:
+        indexes = [
+            # Serves case-insensitive name prefix search in the recipient picker
+            models.Index(Lower("display_name"), name="profile_name_lower_idx"),
+        ]
     
     def __str__(self) -> str:
         return f"Profile for {self.user.get_username()}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The stored number and country; save() re-normalizes only when they move.
+        instance._loaded_phone = (instance.__dict__.get("phone_number"), instance.__dict__.get("country"))
+        return instance
+
+    def save(self, *args, **kwargs):
+        from .services import phones, registration
+
+        if self._state.adding and self.email_normalized is None and self.user_id:
+            # Profiles made outside sign-up (get_or_create) take the account's address if free.
+            email = registration.normalize_email(self.user.email)
+            if email and not UserProfile.objects.filter(email_normalized=email).exists():
+                self.email_normalized = email
+        update_fields = kwargs.get("update_fields")
+        phone = (self.phone_number, self.country)
+        # Migration 0015 left repeated numbers NULL; an unrelated save must not
+        # claim them and trip the unique index.
+        changed = self._state.adding or getattr(self, "_loaded_phone", None) != phone
+        if changed and (update_fields is None or {"phone_number", "country"} & set(update_fields)):
+            self.phone_e164 = phones.normalize(self.phone_number, self.country)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "phone_e164"}
+        super().save(*args, **kwargs)
+        self._loaded_phone = phone
+
     def is_admin(self):
         return self.role in [self.ADMIN, self.SUPER_ADMIN]
 
@@ -70,6 +110,14 @@ class MoneyTransfer(TimeStampedModel):
         (FAILED, "Failed"),
         (CANCELLED, "Cancelled"),
     ]
+    # Statuses each status may move to. A completed transfer can still be
+    # cancelled (reversed); failed and cancelled are final.
+    TRANSITIONS = {
+        PENDING: {COMPLETED, FAILED, CANCELLED},
+        COMPLETED: {CANCELLED},
+        FAILED: set(),
+        CANCELLED: set(),
+    }
 
     sender = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -88,13 +136,156 @@ class MoneyTransfer(TimeStampedModel):
     description = models.CharField(max_length=255, blank=True)
     status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
     reference_number = models.CharField(max_length=32, unique=True)
+    # Client-supplied key so a resubmitted form maps back to the same transfer
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True)
     
     class Meta:
         ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["sender", "idempotency_key"],
+                name="unique_transfer_idempotency_key",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["-created_at"], name="transfer_created_idx"),
+            models.Index(fields=["status", "-created_at"], name="transfer_status_created_idx"),
+            models.Index(fields=["sender", "-created_at"], name="transfer_sender_created_idx"),
+            models.Index(fields=["recipient", "-created_at"], name="transfer_recip_created_idx"),
+            models.Index(
+                fields=["-created_at"],
+                condition=models.Q(status="pending"),
+                name="transfer_pending_idx",
+            ),
+        ]
     
     def __str__(self):
         return f"{self.sender.username} → {self.recipient.username}: {self.amount} {self.currency}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The stored status, for checking the move a later save() makes.
+        instance._loaded_status = instance.__dict__.get("status")
+        return instance
+
+    def clean(self):
+        super().clean()
+        previous = getattr(self, "_loaded_status", None)
+        if previous is None or previous == self.status:
+            return
+        if self.status not in self.TRANSITIONS.get(previous, set()):
+            raise ValidationError({"status": f"A {previous} transfer cannot be marked as {self.status}."})
+        if self.status in (self.FAILED, self.CANCELLED):
+            # Only services.transfer_states.move posts the compensating entries.
+            raise ValidationError({"status": "Fail or cancel transfers through the admin dashboard."})
+
+    def save(self, *args, **kwargs):
+        self.clean()
+        super().save(*args, **kwargs)
+        self._loaded_status = self.status
+
+    def can_transition_to(self, status: str) -> bool:
+        return status in self.TRANSITIONS.get(self.status, set())
+
+    @classmethod
+    def statuses_leading_to(cls, status: str) -> list:
+        """Statuses a transfer may be in to move to ``status``."""
+        return [source for source, targets in cls.TRANSITIONS.items() if status in targets]
+
+
+class TransferEventQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        raise TypeError("Transfer events are append-only.")
+
+    def delete(self):
+        raise TypeError("Transfer events are append-only.")
+
+
+class TransferEvent(models.Model):
+    """
+    Append-only history of transfers: one row when a transfer is created and
+    one per status change.
+
+    Ids only grow, so "events after id N" is a primary-key range read, and
+    each row copies the parties and amounts so reconciliation and the admin
+    feed never join back to ``MoneyTransfer``. The only secondary index is
+    (transfer, id) for one transfer's history, to keep inserts cheap.
+    """
+
+    CREATED = "created"
+    STATUS_CHANGED = "status_changed"
+    KIND_CHOICES = [
+        (CREATED, "Created"),
+        (STATUS_CHANGED, "Status changed"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    # No database constraints: the log outlives the rows it describes.
+    transfer = models.ForeignKey(
+        MoneyTransfer, on_delete=models.DO_NOTHING, db_constraint=False, related_name="events"
+    )
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    from_status = models.CharField(max_length=16, blank=True)
+    to_status = models.CharField(max_length=16)
+    reference_number = models.CharField(max_length=32)
+    sender = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    service_fee = models.DecimalField(max_digits=10, decimal_places=2)
+    currency = models.CharField(max_length=6)
+    # True when compensating transactions were posted with this change.
+    compensated = models.BooleanField(default=False)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    reason = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = TransferEventQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["transfer", "id"], name="transfer_event_transfer_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.reference_number}: {self.from_status or '-'} → {self.to_status}"
+
+    @classmethod
+    def for_transfer(cls, transfer: MoneyTransfer, from_status: str = "", **fields) -> "TransferEvent":
+        return cls(
+            transfer_id=transfer.pk,
+            kind=cls.STATUS_CHANGED if from_status else cls.CREATED,
+            from_status=from_status,
+            to_status=transfer.status,
+            reference_number=transfer.reference_number,
+            sender_id=transfer.sender_id,
+            recipient_id=transfer.recipient_id,
+            amount=transfer.amount,
+            service_fee=transfer.service_fee,
+            currency=transfer.currency,
+            **fields,
+        )
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise TypeError("Transfer events are append-only.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise TypeError("Transfer events are append-only.")
+
 
 class AdminNotification(TimeStampedModel):
     """System notifications sent by administrators."""
@@ -118,8 +309,10 @@ class AdminNotification(TimeStampedModel):
         on_delete=models.CASCADE,
         related_name="sent_notifications",
     )
+    # Targeted sends only; global notifications are resolved at read time
     recipients = models.ManyToManyField(
         settings.AUTH_USER_MODEL,
+        through="NotificationDelivery",
         related_name="received_notifications",
         blank=True,
     )
@@ -128,11 +321,48 @@ class AdminNotification(TimeStampedModel):
     
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(is_global=True, is_active=True),
+                name="notif_live_global_idx",
+            ),
+        ]
     
     def __str__(self):
         return f"{self.title} by {self.sent_by.username}"
 
 
+class NotificationDelivery(models.Model):
+    """One targeted notification for one user (the recipients through table)."""
+
+    adminnotification = models.ForeignKey(AdminNotification, on_delete=models.CASCADE)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+
+    class Meta:
+        db_table = "The_App_Code_adminnotification_recipients"
+        unique_together = ("adminnotification", "user")
+        indexes = [
+            models.Index(fields=["user", "adminnotification"], name="notif_delivery_user_idx"),
+        ]
+
+
+class NotificationWatermark(models.Model):
+    """Highest notification id a user has seen; everything at or below it is read."""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_watermark",
+    )
+    last_seen_id = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} seen up to {self.last_seen_id}"
+
+
 class Transaction(TimeStampedModel):
     """Represents money moving in or out for a user."""
 
@@ -165,14 +395,82 @@ class Transaction(TimeStampedModel):
         blank=True,
         related_name="transactions"
     )
+    # Content hash of an imported statement line, used to skip re-imports
+    import_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ["-occurred_at"]
+        constraints = [
+            # Hash first so the import dedupe probe (hash IN ...) can use it
+            models.UniqueConstraint(
+                fields=["import_hash", "user"],
+                name="unique_transaction_import_hash",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["user", "-occurred_at"], name="tx_user_occurred_idx"),
+            models.Index(fields=["user", "-created_at"], name="tx_user_created_idx"),
+            models.Index(fields=["user", "kind", "-occurred_at"], name="tx_user_kind_occurred_idx"),
+        ]
 
     def __str__(self) -> str:
         direction = "" if self.kind in [self.OUTGOING, self.TRANSFER_OUT] else "+"
         return f"{direction}{self.amount} {self.currency} - {self.description}"
 
+    def save(self, *args, **kwargs):
+        # post_save runs outside any transaction in autocommit mode, so the
+        # ledger and rollups are updated here to commit with the row itself.
+        from .services import ledger, rollups
+
+        with transaction.atomic():
+            previous = ledger.snapshot(self)
+            super().save(*args, **kwargs)
+            ledger.record_save(previous, self)
+            rollups.record_save(previous, self)
+
+
+class BalanceLedger(TimeStampedModel):
+    """Running totals of a user's transactions per currency and kind."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="balance_ledger",
+    )
+    currency = models.CharField(max_length=6)
+    kind = models.CharField(max_length=12, choices=Transaction.KIND_CHOICES)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    entry_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "currency", "kind")
+
+    def __str__(self) -> str:
+        return f"{self.user_id} {self.kind}: {self.total} {self.currency}"
+
+
+class TransactionRollup(TimeStampedModel):
+    """Monthly totals of a user's transactions per category, kind and currency."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="transaction_rollups",
+    )
+    month = models.DateField()  # first day of the month
+    category = models.CharField(max_length=64, blank=True)
+    kind = models.CharField(max_length=12, choices=Transaction.KIND_CHOICES)
+    currency = models.CharField(max_length=6)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    entry_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # User and month lead so a date-range series is one index range scan.
+        unique_together = ("user", "month", "category", "kind", "currency")
+
+    def __str__(self) -> str:
+        return f"{self.user_id} {self.month:%Y-%m} {self.category or '-'} {self.kind}: {self.total} {self.currency}"
+
 
 class SavingGoal(TimeStampedModel):
     """Savings or remittance goals the user is tracking."""
@@ -225,6 +523,17 @@ class Promotion(TimeStampedModel):
 
     class Meta:
         ordering = ["-is_active", "-priority", "title"]
+        indexes = [
+            models.Index(
+                fields=["is_active", "valid_from", "valid_until"],
+                name="promo_active_validity_idx",
+            ),
+            models.Index(
+                fields=["-priority", "title"],
+                condition=models.Q(is_active=True),
+                name="promo_live_priority_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.title
@@ -246,6 +555,9 @@ class BudgetEntry(TimeStampedModel):
     class Meta:
         ordering = ["-month", "category"]
         unique_together = ("user", "category", "month")
+        indexes = [
+            models.Index(fields=["user", "month"], name="budget_user_month_idx"),
+        ]
 
     def variance(self):
         return self.planned_amount - self.actual_amount
@@ -282,10 +594,47 @@ class Donation(TimeStampedModel):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["email"], name="donation_email_idx"),
+            models.Index(fields=["-created_at"], name="donation_created_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} - {self.quantity} packs"
 
+    def save(self, *args, **kwargs):
+        # Keep DonationStats in the same transaction as the pledge itself.
+        from .services import donation_stats
+
+        with transaction.atomic():
+            previous = donation_stats.snapshot(self)
+            super().save(*args, **kwargs)
+            donation_stats.record_save(previous, self)
+
+
+class DonationStats(TimeStampedModel):
+    """Running totals shown on the donate page; a single row."""
+
+    total_packs = models.PositiveBigIntegerField(default=0)
+    donation_count = models.PositiveIntegerField(default=0)
+    donor_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Donation stats"
+
+    def __str__(self) -> str:
+        return f"{self.total_packs} packs from {self.donor_count} donors"
+
+
+class DonorEmail(models.Model):
+    """Distinct donor emails counted by DonationStats.donor_count."""
+
+    email = models.EmailField(unique=True)
+    donation_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return self.email
+
 
 class LearningResource(TimeStampedModel):
     """Financial education resources surfaced in the learning hub."""
@@ -335,20 +684,207 @@ class LearningResource(TimeStampedModel):
         return self.title
 
 
-class PasswordResetToken(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
-    token = models.CharField(max_length=100, unique=True)
+class Job(TimeStampedModel):
+    """A unit of deferred work, claimed and run by the ``run_jobs`` worker."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["run_at", "id"]
+        indexes = [
+            models.Index(
+                fields=["run_at", "id"],
+                condition=models.Q(status="queued"),
+                name="job_ready_idx",
+            ),
+            models.Index(
+                fields=["locked_at"],
+                condition=models.Q(status="running"),
+                name="job_running_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class OutboxEmail(TimeStampedModel):
+    """An outgoing email, written by requests and sent in batches by ``services.mail.flush``."""
+
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENDING, "Sending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["next_attempt_at", "id"]
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at", "id"],
+                condition=models.Q(status="pending"),
+                name="outbox_pending_idx",
+            ),
+            models.Index(
+                fields=["locked_at"],
+                condition=models.Q(status="sending"),
+                name="outbox_sending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
+class ExchangeRate(models.Model):
+    """Units of ``currency`` per one unit of ``FX_BASE_CURRENCY``, from ``effective_at`` on."""
+
+    currency = models.CharField(max_length=6)
+    rate = models.DecimalField(max_digits=20, decimal_places=8)
+    effective_at = models.DateTimeField()
+    source = models.CharField(max_length=100, blank=True)
+    loaded_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["currency", "effective_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["currency", "effective_at"], name="fx_rate_currency_at_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.currency} {self.rate} @ {self.effective_at:%Y-%m-%d %H:%M}"
+
+
+class FeeRule(TimeStampedModel):
+    """
+    One tier of the transfer fee schedule.
+
+    A rule covers a corridor (sender and recipient country), a currency and
+    an amount band ``[min_amount, max_amount)``; blank fields match anything.
+    Rules tied to a promotion apply only while it runs and win over the
+    standard schedule. See ``services.fees`` for how a rule is chosen.
+    """
+
+    name = models.CharField(max_length=100)
+    sender_country = models.CharField(max_length=64, blank=True)
+    recipient_country = models.CharField(max_length=64, blank=True)
+    currency = models.CharField(max_length=6, blank=True)
+    min_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    max_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    rate = models.DecimalField(max_digits=6, decimal_places=4, default=0, help_text="Fraction of the amount, e.g. 0.0200 for 2%.")
+    flat_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    min_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    max_fee = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    promotion = models.ForeignKey(
+        Promotion,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="fee_rules",
+    )
+    priority = models.PositiveSmallIntegerField(default=0)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ["sender_country", "recipient_country", "currency", "min_amount"]
+
+    def clean(self):
+        if self.max_amount is not None and self.max_amount <= self.min_amount:
+            raise ValidationError({"max_amount": "Upper bound must be above the lower bound."})
+        if self.max_fee is not None and self.max_fee < self.min_fee:
+            raise ValidationError({"max_fee": "Fee cap must not be below the minimum fee."})
+
+    def __str__(self):
+        upper = self.max_amount if self.max_amount is not None else "∞"
+        return f"{self.name} [{self.min_amount}, {upper})"
+
+
+class AdminAuditLog(models.Model):
+    """
+    One administrative bulk change: who made it, which rows it selected and
+    which it actually changed. Rows are only ever added.
+    """
+
+    TRANSFER_STATUS = "transfer_status"
+    USER_ACTIVE = "user_active"
+    ACTION_CHOICES = [
+        (TRANSFER_STATUS, "Transfer status"),
+        (USER_ACTIVE, "User activation"),
+    ]
+
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="admin_actions",
+    )
+    action = models.CharField(max_length=32, choices=ACTION_CHOICES)
+    changes = models.JSONField(default=dict)  # e.g. {"status": "failed"}
+    filters = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)  # the selection as submitted
+    object_ids = models.JSONField(default=list)  # rows actually changed
+    matched = models.PositiveIntegerField(default=0)
+    affected = models.PositiveIntegerField(default=0)
+    reason = models.CharField(max_length=255, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    expires_at = models.DateTimeField()
-    used = models.BooleanField(default=False)
-    
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["action", "-created_at"], name="audit_action_created_idx"),
+        ]
+
     def __str__(self):
-        return f"Reset token for {self.user.username}"
-    
-    def is_expired(self):
-        return timezone.now() > self.expires_at
-    
+        return f"{self.get_action_display()} by {self.actor or 'system'}: {self.affected}/{self.matched}"
+
+
+class ReferenceShard(models.Model):
+    """
+    A process's lease on one transfer reference shard (see
+    ``services.references``). A lease that has run out may be taken over
+    by another process.
+    """
+
+    shard = models.PositiveSmallIntegerField(primary_key=True)
+    holder = models.CharField(max_length=64)  # host:pid of the leasing process
+    leased_until = models.DateTimeField()
+
     class Meta:
-        db_table = 'password_reset_tokens'
-        verbose_name = 'Password Reset Token'
-        verbose_name_plural = 'Password Reset Tokens'
+        ordering = ["shard"]
+
+    def __str__(self):
+        return f"Shard {self.shard} leased by {self.holder} until {self.leased_until:%Y-%m-%d %H:%M:%S}"
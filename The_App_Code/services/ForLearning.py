@@ -17,9 +17,11 @@ def list_resources(category: str | None = None):
     return qs
 
 
-def category_counts():
-    qs = LearningResource.objects.values("category").annotate(total=Count("id"))
-    data = {row["category"]: row["total"] for row in qs}
+def _category_counts_qs():
+    return LearningResource.objects.values("category").annotate(total=Count("id"))
+
+
+def _label_counts(data):
     results = []
     for key, label in CATEGORY_LABELS.items():
         results.append({
@@ -28,3 +30,16 @@ def category_counts():
             "count": data.get(key, 0),
         })
     return results
+
+
+def category_counts():
+    return _label_counts({row["category"]: row["total"] for row in _category_counts_qs()})
+
+
+async def alist_resources(category: str | None = None):
+    """Async ``list_resources``, evaluated to a list for the template."""
+    return [resource async for resource in list_resources(category)]
+
+
+async def acategory_counts():
+    return _label_counts({row["category"]: row["total"] async for row in _category_counts_qs()})
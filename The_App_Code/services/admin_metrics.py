@@ -0,0 +1,73 @@
+"""
+KPI tiles for the admin dashboard.
+
+``compute`` reads every transfer figure from one ``GROUP BY status`` pass.
+``kpis`` serves the last result from the cache. Once it is older than
+``ADMIN_KPI_CACHE_TTL``, the request that wins a ``cache.add`` lock
+recomputes it inline, and concurrent requests keep getting the previous
+figures until it is done. The refresh happens in the process that serves
+the page, so it works with a per-process cache as well as a shared one.
+"""
+from __future__ import annotations
+
+import time
+from decimal import Decimal
+from typing import Dict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Count, Sum
+
+from ..models import MoneyTransfer
+
+CACHE_KEY = "admin:kpis"
+REFRESH_LOCK_KEY = "admin:kpis:refreshing"
+REFRESH_LOCK_SECONDS = 30
+CENT = Decimal("0.01")
+
+
+def _ttl() -> int:
+    return getattr(settings, "ADMIN_KPI_CACHE_TTL", 60)
+
+
+def compute() -> Dict[str, object]:
+    by_status = {
+        row["status"]: row
+        for row in MoneyTransfer.objects.order_by()
+        .values("status")
+        .annotate(count=Count("id"), fees=Sum("service_fee"))
+    }
+    total = sum(row["count"] for row in by_status.values())
+    completed = by_status.get(MoneyTransfer.COMPLETED, {})
+    # SQLite sums decimals as floats; round back to cents.
+    earnings = Decimal(str(completed.get("fees") or 0)).quantize(CENT)
+    return {
+        "total_users": User.objects.count(),
+        "active_transfers": by_status.get(MoneyTransfer.PENDING, {}).get("count", 0),
+        "total_earnings": earnings,
+        "success_rate": (completed.get("count", 0) / total * 100) if total else 0,
+        "transfers_by_status": {status: row["count"] for status, row in by_status.items()},
+    }
+
+
+def refresh() -> Dict[str, object]:
+    """Recompute the KPIs and cache them for every admin served by this cache."""
+    try:
+        data = compute()
+        # Kept well past the TTL so a slow refresh still leaves stale tiles to show.
+        cache.set(CACHE_KEY, {"data": data, "computed_at": time.time()}, _ttl() * 10)
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
+    return data
+
+
+def kpis() -> Dict[str, object]:
+    """The cached KPIs, recomputed inline when they are older than the TTL."""
+    entry = cache.get(CACHE_KEY)
+    if entry is not None and time.time() - entry["computed_at"] <= _ttl():
+        return {**entry["data"], "computed_at": entry["computed_at"]}
+    # The lock lets one request recompute; the rest serve what is cached.
+    if entry is None or cache.add(REFRESH_LOCK_KEY, True, REFRESH_LOCK_SECONDS):
+        return {**refresh(), "computed_at": time.time()}
+    return {**entry["data"], "computed_at": entry["computed_at"]}
@@ -8,6 +8,8 @@ from django.db.models import Sum
 
 from ..forms import BudgetEntryForm
 from ..models import BudgetEntry, first_day_of_current_month
+from . import fx, rollups
+from .tracing import traced
 
 
 def _parse_month(value: str | None) -> date:
@@ -40,6 +42,7 @@ def handle_post(request, user) -> Tuple[bool, Dict[str, object]]:
     return False, {"form": form}
 
 
+@traced()
 def build_context(user, *, month: str | None = None):
     target_month = _parse_month(month)
 
@@ -63,4 +66,7 @@ def build_context(user, *, month: str | None = None):
         "planned_total": planned,
         "actual_total": actual,
         "variance_total": planned - actual,
+        # Entries carry no currency of their own; they are typed in this one.
+        "currency": fx.preferred_currency(user) if user.is_authenticated else fx.base_currency(),
+        "category_trend": rollups.series(user, until=target_month) if user.is_authenticated else None,
     }
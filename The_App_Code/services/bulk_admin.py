@@ -0,0 +1,157 @@
+"""
+Bulk admin operations for incident cleanup.
+
+Each operation selects rows by id list, by a whitelisted filter
+expression, or both, then changes them with one ``queryset.update()``
+inside a transaction that also writes an ``AdminAuditLog`` row. Transfer
+status changes go through ``transfer_states.move`` and only touch rows
+for which ``MoneyTransfer.TRANSITIONS`` allows the move; the rest are
+counted as matched but left alone.
+
+``update()`` skips ``save()`` and the model signals; for transfers,
+``move`` does the work those signals would have done per row.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import AdminAuditLog, MoneyTransfer, UserProfile
+from . import transfer_states
+
+# Filter names accepted from clients, mapped to ORM lookups.
+TRANSFER_FILTERS = {
+    "status": "status",
+    "currency": "currency__iexact",
+    "sender": "sender__username",
+    "recipient": "recipient__username",
+    "reference_prefix": "reference_number__startswith",
+    "created_after": "created_at__gte",
+    "created_before": "created_at__lt",
+    "min_amount": "amount__gte",
+    "max_amount": "amount__lt",
+}
+USER_FILTERS = {
+    "role": "role",
+    "country": "country__iexact",
+    "username": "user__username",
+    "is_active": "is_active",
+    "joined_after": "created_at__gte",
+    "joined_before": "created_at__lt",
+}
+
+
+class BulkActionError(ValueError):
+    """The request cannot be applied as given; nothing was changed."""
+
+
+@dataclass
+class BulkResult:
+    matched: int
+    updated: int
+    audit_id: int | None = None
+    dry_run: bool = False
+
+    @property
+    def skipped(self) -> int:
+        return self.matched - self.updated
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "matched": self.matched,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "audit_id": self.audit_id,
+            "dry_run": self.dry_run,
+        }
+
+
+def _select(queryset, lookups: Mapping[str, str], ids: Iterable | None, filters: Mapping | None, id_field: str):
+    ids = list(ids or [])
+    filters = dict(filters or {})
+    if not ids and not filters:
+        # An empty selection must never mean "every row".
+        raise BulkActionError("Select rows by id or with at least one filter.")
+    unknown = sorted(set(filters) - set(lookups))
+    if unknown:
+        raise BulkActionError(f"Unknown filter: {', '.join(unknown)}.")
+    try:
+        if ids:
+            queryset = queryset.filter(**{f"{id_field}__in": ids})
+        return queryset.filter(**{lookups[name]: value for name, value in filters.items()})
+    except (TypeError, ValueError, ValidationError) as e:
+        raise BulkActionError(f"Invalid selection: {e}") from e
+
+
+def _audit(actor, action, changes, filters, ids, object_ids: List[int], matched: int, reason: str) -> AdminAuditLog:
+    return AdminAuditLog.objects.create(
+        actor=actor if getattr(actor, "pk", None) else None,
+        action=action,
+        changes=changes,
+        filters={**dict(filters or {}), **({"ids": list(ids)} if ids else {})},
+        object_ids=object_ids,
+        matched=matched,
+        affected=len(object_ids),
+        reason=(reason or "")[:255],
+    )
+
+
+def update_transfer_status(
+    actor,
+    status: str,
+    *,
+    ids: Iterable | None = None,
+    filters: Mapping | None = None,
+    reason: str = "",
+    dry_run: bool = False,
+) -> BulkResult:
+    """Move the selected transfers to ``status`` where the transition is allowed."""
+    if status not in dict(MoneyTransfer.STATUS_CHOICES):
+        raise BulkActionError(f"Unknown transfer status: {status}.")
+    sources = MoneyTransfer.statuses_leading_to(status)
+
+    with transaction.atomic():
+        selected = _select(MoneyTransfer.objects.order_by(), TRANSFER_FILTERS, ids, filters, "pk")
+        matched = selected.count()
+        movable = selected.filter(status__in=sources)
+        if dry_run:
+            return BulkResult(matched, movable.count(), dry_run=True)
+
+        # Lock and read the rows once: the audit log and the event log both need them.
+        rows = list(movable.select_for_update(of=("self",)).select_related("sender", "recipient"))
+        pks = [row.pk for row in rows]
+        transfer_states.move(rows, status, actor=actor, reason=reason)
+        audit = _audit(actor, AdminAuditLog.TRANSFER_STATUS, {"status": status}, filters, ids, pks, matched, reason)
+
+    return BulkResult(matched, len(pks), audit.pk)
+
+
+def set_users_active(
+    actor,
+    active: bool,
+    *,
+    ids: Iterable | None = None,
+    filters: Mapping | None = None,
+    reason: str = "",
+    dry_run: bool = False,
+) -> BulkResult:
+    """Activate or suspend the selected users' profiles; ``ids`` are user ids."""
+    with transaction.atomic():
+        selected = _select(UserProfile.objects.order_by(), USER_FILTERS, ids, filters, "user_id")
+        matched = selected.count()
+        changing = selected.exclude(is_active=active)
+        if not active and getattr(actor, "pk", None):
+            # An admin cannot lock themselves out mid-incident.
+            changing = changing.exclude(user_id=actor.pk)
+        if dry_run:
+            return BulkResult(matched, changing.count(), dry_run=True)
+
+        user_ids = list(changing.select_for_update().values_list("user_id", flat=True))
+        UserProfile.objects.filter(user_id__in=user_ids).update(is_active=active, updated_at=timezone.now())
+        audit = _audit(actor, AdminAuditLog.USER_ACTIVE, {"is_active": active}, filters, ids, user_ids, matched, reason)
+
+    return BulkResult(matched, len(user_ids), audit.pk)
@@ -1,18 +1,21 @@
 
 #Dashboard.py service
 from __future__ import annotations
+import time
 from decimal import Decimal
 from typing import Dict, Tuple
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Q, Sum
 from django.utils import timezone
 
 from ..forms import SavingGoalForm, TransactionForm
 from ..models import Donation, SavingGoal, Transaction
+from . import donation_stats, fx, ledger
+from .tracing import traced
 
-
-def _as_decimal(value) -> Decimal:
-    return value if isinstance(value, Decimal) else Decimal(value or 0)
+SNAPSHOT_RECENT = 10
 
 
 def handle_post(request, user) -> Tuple[bool, Dict[str, object]]:
@@ -52,31 +55,119 @@ def handle_post(request, user) -> Tuple[bool, Dict[str, object]]:
     return False, {}
 
 
+def _version_key(user_id) -> str:
+    return f"dashboard:version:{user_id}"
+
+
+def _snapshot_key(user_id) -> str:
+    version_key = _version_key(user_id)
+    version = cache.get(version_key)
+    if version is None:
+        # Start from a fresh timestamp so an evicted version never resurrects
+        # a snapshot cached under an older one.
+        cache.add(version_key, time.time_ns(), None)
+        version = cache.get(version_key)
+    return f"dashboard:snapshot:{user_id}:{version}"
+
+
+def invalidate(user_id) -> None:
+    """Retire the user's cached snapshot; the next dashboard view rebuilds it."""
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        pass  # No version yet, so nothing has been cached for this user.
+
+
+INCOMING_KINDS = (Transaction.INCOMING, Transaction.TRANSFER_IN)
+OUTGOING_KINDS = (Transaction.OUTGOING, Transaction.TRANSFER_OUT)
+
+
+def _merge(totals, kinds) -> Dict[str, Decimal]:
+    merged: Dict[str, Decimal] = {}
+    for kind in kinds:
+        for currency, amount in totals.get(kind, {}).items():
+            merged[currency] = merged.get(currency, Decimal("0")) + amount
+    return merged
+
+
+def convert_flows(flows, currency: str) -> Dict[str, object]:
+    """
+    Turn per-currency flows into totals in ``currency``.
+
+    Conversion uses the in-memory rate table, so it runs on every view
+    instead of being cached: new rates or a new preferred currency show up
+    without retiring any snapshot.
+    """
+    currency = fx.reportable(currency)
+    incoming, missing_in = fx.sum_converted(flows["incoming"], currency)
+    outgoing, missing_out = fx.sum_converted(flows["outgoing"], currency)
+    return {
+        "currency": currency,
+        "incoming_total": incoming,
+        "outgoing_total": outgoing,
+        "net_flow": incoming - outgoing,
+        "unconverted_currencies": sorted(missing_in | missing_out),
+    }
+
+
+def compute_snapshot(user) -> Dict[str, object]:
+    totals = ledger.totals_by_currency(user)
+
+    donor_filter = Q(donor=user)
+    if user.email:
+        donor_filter |= Q(email=user.email)
+    donation_stats = Donation.objects.filter(donor_filter).aggregate(total_packs=Sum("quantity"))
+
+    return {
+        "recent_transactions": list(
+            Transaction.objects.filter(user=user).order_by("-created_at")[:SNAPSHOT_RECENT]
+        ),
+        "goals": list(SavingGoal.objects.filter(user=user)),
+        "flows": {
+            "incoming": _merge(totals, INCOMING_KINDS),
+            "outgoing": _merge(totals, OUTGOING_KINDS),
+        },
+        "donation_total_packs": donation_stats.get("total_packs") or 0,
+    }
+
+
+def snapshot(user) -> Dict[str, object]:
+    """
+    Cached dashboard metrics for ``user``, rebuilt after any invalidation,
+    with money totals converted to the user's preferred currency.
+    """
+    key = _snapshot_key(user.pk)
+    data = cache.get(key)
+    if data is None:
+        data = compute_snapshot(user)
+        cache.set(key, data, getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 300))
+    return {**data, **convert_flows(data["flows"], fx.preferred_currency(user))}
+
+
+@traced()
 def build_context(user, *, overrides: Dict[str, object] | None = None) -> Dict[str, object]:
     """Prepare dashboard metrics for the requested user, safe for guests."""
     overrides = overrides or {}
     now = timezone.now()
 
     if user.is_authenticated:
-        tx_qs = Transaction.objects.filter(user=user)
-        goal_qs = SavingGoal.objects.filter(user=user)
-        donation_qs = Donation.objects.filter(Q(donor=user) | Q(email=user.email))
+        metrics = snapshot(user)
+        recent_transactions = metrics["recent_transactions"][:5]
+        goal_list = metrics["goals"]
+        incoming = metrics["incoming_total"]
+        outgoing = metrics["outgoing_total"]
+        currency = metrics["currency"]
+        donation_total_packs = metrics["donation_total_packs"]
     else:
-        # ✅ Empty querysets for guests
-        tx_qs = Transaction.objects.none()
-        goal_qs = SavingGoal.objects.none()
-        donation_qs = Donation.objects.all()
-
-    totals = tx_qs.aggregate(
-        incoming=Sum("amount", filter=Q(kind=Transaction.INCOMING)),
-        outgoing=Sum("amount", filter=Q(kind=Transaction.OUTGOING)),
-    )
-
-    incoming = _as_decimal(totals.get("incoming"))
-    outgoing = _as_decimal(totals.get("outgoing"))
+        # ✅ Empty metrics for guests
+        recent_transactions = []
+        goal_list = []
+        incoming = outgoing = Decimal("0")
+        currency = fx.base_currency()
+        donation_total_packs = donation_stats.current().total_packs
 
     goals = []
-    for goal in goal_qs:
+    for goal in goal_list:
         goals.append({
             "name": goal.name,
             "target": goal.target_amount,
@@ -86,16 +177,15 @@ def build_context(user, *, overrides: Dict[str, object] | None = None) -> Dict[s
             "due_date": goal.due_date,
         })
 
-    donation_stats = donation_qs.aggregate(total_packs=Sum("quantity"))
-
     context = {
         "now": now,
-        "recent_transactions": tx_qs.select_related("user")[:5],
+        "recent_transactions": recent_transactions,
         "goals": goals,
         "incoming_total": incoming,
         "outgoing_total": outgoing,
         "net_flow": incoming - outgoing,
-        "donation_total_packs": donation_stats.get("total_packs") or 0,
+        "currency": currency,
+        "donation_total_packs": donation_total_packs,
         "transaction_form": overrides.get("transaction_form") or TransactionForm(prefix="transaction"),
         "goal_form": overrides.get("goal_form") or SavingGoalForm(prefix="goal"),
     }
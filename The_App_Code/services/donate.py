@@ -1,10 +1,12 @@
 #donate.py
 from __future__ import annotations
 
-from django.db.models import Sum
+import asyncio
 
 from ..forms import DonationForm
 from ..models import Donation
+from . import donation_stats
+from .tracing import traced
 
 
 def handle_post(request, user):
@@ -26,20 +28,40 @@ def handle_post(request, user):
     return False, {"form": form}
 
 
-def build_context(user):
-    stats = Donation.objects.aggregate(total_packs=Sum("quantity"))
-    donors = Donation.objects.values("email").distinct().count()
-    recent = Donation.objects.order_by("-created_at")[:5]
+DONATION_GOAL = 1600
+RECENT_DONATIONS = 5
+
 
-    total_packs = stats.get("total_packs") or 0
-    goal = 1600
-    percent = 0 if not total_packs else min(int((total_packs / goal) * 100), 100)
+def _context(stats, recent):
+    total_packs = stats.total_packs
+    percent = 0 if not total_packs else min(int((total_packs / DONATION_GOAL) * 100), 100)
 
     return {
         "form": DonationForm(prefix="donation"),
         "donation_total_packs": total_packs,
-        "donor_count": donors,
+        "donor_count": stats.donor_count,
         "recent_donations": recent,
         "donation_goal_percent": percent,
-        "donation_goal_target": goal,
+        "donation_goal_target": DONATION_GOAL,
     }
+
+
+@traced()
+def build_context(user):
+    recent = Donation.objects.order_by("-created_at")[:RECENT_DONATIONS]
+    return _context(donation_stats.current(), recent)
+
+
+@traced()
+async def abuild_context(user):
+    """Async ``build_context``: the stats row and recent pledges are fetched together."""
+    recent = Donation.objects.order_by("-created_at")[:RECENT_DONATIONS]
+    stats, recent = await asyncio.gather(
+        donation_stats.acurrent(),
+        _alist(recent),
+    )
+    return _context(stats, recent)
+
+
+async def _alist(queryset):
+    return [row async for row in queryset]
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from ..models import Donation, DonationStats, DonorEmail
+
+STATS_PK = 1
+
+Entry = Tuple[str, int]
+
+
+def snapshot(donation: Donation) -> Entry | None:
+    """Return the stored (email, quantity) for ``donation`` before it is overwritten."""
+    if donation.pk is None or donation._state.adding:
+        return None
+    return (
+        Donation.objects.select_for_update()
+        .filter(pk=donation.pk)
+        .values_list("email", "quantity")
+        .first()
+    )
+
+
+def _apply(packs: int = 0, donations: int = 0, donors: int = 0) -> None:
+    if not (packs or donations or donors):
+        return
+    DonationStats.objects.get_or_create(pk=STATS_PK)
+    DonationStats.objects.filter(pk=STATS_PK).update(
+        total_packs=F("total_packs") + packs,
+        donation_count=F("donation_count") + donations,
+        donor_count=F("donor_count") + donors,
+    )
+
+
+def _add_email(email: str) -> int:
+    """Count one more pledge for ``email``; returns 1 if it is a new donor."""
+    row, created = DonorEmail.objects.get_or_create(email=email)
+    DonorEmail.objects.filter(pk=row.pk).update(donation_count=F("donation_count") + 1)
+    return 1 if created else 0
+
+
+def _remove_email(email: str) -> int:
+    """Count one pledge less for ``email``; returns -1 if it was the last one."""
+    DonorEmail.objects.filter(email=email).update(donation_count=F("donation_count") - 1)
+    deleted, _ = DonorEmail.objects.filter(email=email, donation_count__lte=0).delete()
+    return -1 if deleted else 0
+
+
+def record_save(previous: Entry | None, donation: Donation) -> None:
+    if previous is None:
+        _apply(
+            packs=int(donation.quantity),
+            donations=1,
+            donors=_add_email(donation.email),
+        )
+        return
+
+    old_email, old_quantity = previous
+    donors = 0
+    if old_email != donation.email:
+        donors += _add_email(donation.email)
+        donors += _remove_email(old_email)
+    _apply(packs=int(donation.quantity) - old_quantity, donors=donors)
+
+
+def record_delete(donation: Donation) -> None:
+    _apply(
+        packs=-int(donation.quantity),
+        donations=-1,
+        donors=_remove_email(donation.email),
+    )
+
+
+def current() -> DonationStats:
+    """The maintained totals: a single primary-key read."""
+    stats = DonationStats.objects.filter(pk=STATS_PK).first()
+    return stats or DonationStats(pk=STATS_PK)
+
+
+async def acurrent() -> DonationStats:
+    stats = await DonationStats.objects.filter(pk=STATS_PK).afirst()
+    return stats or DonationStats(pk=STATS_PK)
+
+
+def _expected() -> Tuple[Dict[str, int], Dict[str, int]]:
+    per_email = {
+        row["email"]: row["total"]
+        for row in Donation.objects.order_by().values("email").annotate(total=Count("id"))
+    }
+    totals = Donation.objects.aggregate(packs=Sum("quantity"), donations=Count("id"))
+    return per_email, {
+        "total_packs": totals["packs"] or 0,
+        "donation_count": totals["donations"] or 0,
+        "donor_count": len(per_email),
+    }
+
+
+def check() -> Dict[str, Tuple[int, int]]:
+    """Return ``{field: (expected, actual)}`` for every figure that has drifted."""
+    per_email, expected = _expected()
+    stats = current()
+    drift = {
+        field: (value, getattr(stats, field))
+        for field, value in expected.items()
+        if getattr(stats, field) != value
+    }
+    stored = dict(DonorEmail.objects.values_list("email", "donation_count"))
+    if stored != per_email:
+        drift["donor_emails"] = (len(per_email), len(stored))
+    return drift
+
+
+def reconcile() -> DonationStats:
+    """Recompute the totals and donor set from the Donation table."""
+    with transaction.atomic():
+        per_email, expected = _expected()
+        DonorEmail.objects.all().delete()
+        DonorEmail.objects.bulk_create(
+            [DonorEmail(email=email, donation_count=count) for email, count in per_email.items()],
+            batch_size=500,
+        )
+        DonationStats.objects.update_or_create(pk=STATS_PK, defaults=expected)
+    return current()
@@ -0,0 +1,133 @@
+"""
+Statement export for transactions and money transfers.
+
+Rows are read with ``.iterator(chunk_size=...)`` (a server-side cursor on
+PostgreSQL) and turned into CSV or NDJSON one line at a time, so a response
+can start streaming straight away and memory does not depend on how much
+history the user has.
+"""
+from __future__ import annotations
+
+import csv
+import heapq
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from ..models import MoneyTransfer, Transaction
+
+CSV = "csv"
+NDJSON = "ndjson"
+FORMATS = (CSV, NDJSON)
+CONTENT_TYPES = {CSV: "text/csv", NDJSON: "application/x-ndjson"}
+
+TRANSACTIONS = "transactions"
+TRANSFERS = "transfers"
+SENT = "sent"
+RECEIVED = "received"
+
+TRANSACTION_COLUMNS = [
+    "occurred_at", "description", "amount", "currency", "kind", "category", "transfer_reference",
+]
+TRANSFER_COLUMNS = [
+    "created_at", "reference_number", "direction", "counterparty", "amount",
+    "service_fee", "total_amount", "currency", "status", "description",
+]
+
+
+def _chunk_size() -> int:
+    return getattr(settings, "EXPORT_CHUNK_SIZE", 2000)
+
+
+def _bounds(start: date | None, end: date | None) -> Dict[str, datetime]:
+    """Inclusive date range as datetime bounds, so the indexed column is compared directly."""
+    bounds = {}
+    if start:
+        bounds["gte"] = timezone.make_aware(datetime.combine(start, time.min))
+    if end:
+        bounds["lt"] = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+    return bounds
+
+
+def _filter_range(qs: QuerySet, field: str, start: date | None, end: date | None) -> QuerySet:
+    return qs.filter(**{f"{field}__{op}": value for op, value in _bounds(start, end).items()})
+
+
+def transaction_rows(user, *, start: date | None = None, end: date | None = None, kinds: Iterable[str] = ()) -> Iterator[Dict[str, object]]:
+    qs = _filter_range(Transaction.objects.filter(user=user), "occurred_at", start, end)
+    kinds = [kind for kind in kinds if kind]
+    if kinds:
+        qs = qs.filter(kind__in=kinds)
+    rows = qs.order_by("-occurred_at", "-pk").values_list(
+        "occurred_at", "description", "amount", "currency", "kind", "category",
+        "related_transfer__reference_number",
+    )
+    for row in rows.iterator(chunk_size=_chunk_size()):
+        yield dict(zip(TRANSACTION_COLUMNS, row))
+
+
+def _transfer_side(user, direction: str, start, end) -> Iterator[Dict[str, object]]:
+    own, other = ("sender", "recipient") if direction == SENT else ("recipient", "sender")
+    qs = _filter_range(MoneyTransfer.objects.filter(**{own: user}), "created_at", start, end)
+    rows = qs.order_by("-created_at", "-pk").values_list(
+        "created_at", "reference_number", f"{other}__username", "amount", "service_fee",
+        "total_amount", "currency", "status", "description",
+    )
+    for created_at, reference, counterparty, *rest in rows.iterator(chunk_size=_chunk_size()):
+        yield dict(zip(TRANSFER_COLUMNS, [created_at, reference, direction, counterparty, *rest]))
+
+
+def transfer_rows(user, *, start: date | None = None, end: date | None = None, kinds: Iterable[str] = ()) -> Iterator[Dict[str, object]]:
+    """
+    Sent and received transfers, newest first.
+
+    Each side is read in (user, -created_at) index order and the two streams
+    are merged, rather than asking the database to sort an OR across both
+    foreign keys.
+    """
+    directions = [kind for kind in kinds if kind in (SENT, RECEIVED)] or [SENT, RECEIVED]
+    sides = [_transfer_side(user, direction, start, end) for direction in directions]
+    return heapq.merge(*sides, key=lambda row: row["created_at"], reverse=True)
+
+
+SOURCES = {
+    TRANSACTIONS: (TRANSACTION_COLUMNS, transaction_rows),
+    TRANSFERS: (TRANSFER_COLUMNS, transfer_rows),
+}
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat() if timezone.is_aware(value) else value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return "" if value is None else value
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def render(fmt: str, columns: List[str], rows: Iterable[Dict[str, object]]) -> Iterator[str]:
+    """Yield the export line by line in ``fmt``."""
+    if fmt == NDJSON:
+        for row in rows:
+            yield json.dumps({column: _plain(row[column]) for column in columns}) + "\n"
+        return
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_plain(row[column]) for column in columns])
+
+
+def export(user, source: str = TRANSACTIONS, fmt: str = CSV, **filters) -> Iterator[str]:
+    columns, rows = SOURCES[source]
+    return render(fmt, columns, rows(user, **filters))
@@ -0,0 +1,204 @@
+"""
+Transfer fee schedule.
+
+``FeeRule`` rows are compiled into an in-memory index: one sorted list of
+amount boundaries per (sender country, recipient country, currency) key,
+with the rules covering each interval between boundaries ranked in advance.
+A quote is then at most eight binary searches (each key with and without
+its wildcards) and no query. The compiled index is shared by the process
+for ``FEE_SCHEDULE_CACHE_TTL`` seconds. After that a version stamp is read
+from the database (latest ``updated_at`` and row count of the rules and
+the promotions) and the index is recompiled only if the stamp moved, so
+an edit saved by any process is quoted everywhere within the TTL. The
+process that saves the edit drops its own index at once.
+
+Precedence: a rule tied to a running promotion beats the standard
+schedule, then the more specific corridor wins, then the higher priority.
+With no matching rule the fee is ``TRANSFER_FEE_RATE`` of the amount.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from itertools import product
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from ..models import FeeRule, Promotion
+
+CENT = Decimal("0.01")
+DEFAULT_RATE = Decimal("0.02")
+
+Key = Tuple[str, str, str]
+
+_lock = threading.Lock()
+# {"version": ..., "expires": monotonic seconds, "index": {key: (bounds, candidates)}}
+_compiled: Dict[str, object] = {}
+
+
+@dataclass(frozen=True)
+class _Rule:
+    id: int
+    name: str
+    rate: Decimal
+    flat_fee: Decimal
+    min_fee: Decimal
+    max_fee: Decimal | None
+    priority: int
+    specificity: int
+    promotion: str
+    valid_from: date | None
+    valid_until: date | None
+
+    def live(self, today: date) -> bool:
+        if self.valid_from is not None and self.valid_from > today:
+            return False
+        return self.valid_until is None or self.valid_until >= today
+
+    def rank(self) -> Tuple[bool, int, int]:
+        return bool(self.promotion), self.specificity, self.priority
+
+    def fee(self, amount: Decimal) -> Decimal:
+        fee = max(amount * self.rate + self.flat_fee, self.min_fee)
+        if self.max_fee is not None:
+            fee = min(fee, self.max_fee)
+        return fee.quantize(CENT)
+
+
+@dataclass
+class Quote:
+    amount: Decimal
+    currency: str
+    fee: Decimal
+    rule: str = ""
+    promotion: str = ""
+
+    @property
+    def total(self) -> Decimal:
+        return self.amount + self.fee
+
+    def as_dict(self) -> Dict[str, str]:
+        return {
+            "amount": str(self.amount),
+            "currency": self.currency,
+            "fee": str(self.fee),
+            "total": str(self.total),
+            "rule": self.rule,
+            "promotion": self.promotion,
+        }
+
+
+def _norm(value: str | None) -> str:
+    return (value or "").strip().casefold()
+
+
+def _snapshot(rule: FeeRule) -> _Rule:
+    promotion = rule.promotion
+    return _Rule(
+        id=rule.pk,
+        name=rule.name,
+        rate=rule.rate,
+        flat_fee=rule.flat_fee,
+        min_fee=rule.min_fee,
+        max_fee=rule.max_fee,
+        priority=rule.priority,
+        specificity=sum(1 for field in (rule.sender_country, rule.recipient_country, rule.currency) if field),
+        promotion=promotion.title if promotion else "",
+        valid_from=promotion.valid_from if promotion else None,
+        valid_until=promotion.valid_until if promotion else None,
+    )
+
+
+def compile_index(rules) -> Dict[Key, Tuple[List[Decimal], List[List[_Rule]]]]:
+    """Group rules by key and rank the candidates for every amount interval."""
+    grouped: Dict[Key, List[Tuple[Decimal, Decimal | None, _Rule]]] = {}
+    for rule in rules:
+        key = (_norm(rule.sender_country), _norm(rule.recipient_country), _norm(rule.currency))
+        grouped.setdefault(key, []).append((rule.min_amount, rule.max_amount, _snapshot(rule)))
+
+    index = {}
+    for key, bands in grouped.items():
+        bounds = sorted({low for low, _, _ in bands} | {high for _, high, _ in bands if high is not None})
+        candidates = []
+        for low in bounds:
+            covering = [rule for start, end, rule in bands if start <= low and (end is None or low < end)]
+            covering.sort(key=_Rule.rank, reverse=True)
+            candidates.append(covering)
+        index[key] = (bounds, candidates)
+    return index
+
+
+def _load():
+    rules = (
+        FeeRule.objects.filter(is_active=True)
+        .exclude(promotion__is_active=False)
+        .select_related("promotion")
+    )
+    return compile_index(rules)
+
+
+def _version() -> Tuple[object, ...]:
+    rules = FeeRule.objects.aggregate(latest=Max("updated_at"), count=Count("id"))
+    promotions = Promotion.objects.aggregate(latest=Max("updated_at"), count=Count("id"))
+    return rules["latest"], rules["count"], promotions["latest"], promotions["count"]
+
+
+def _index():
+    now = time.monotonic()
+    with _lock:
+        if _compiled and _compiled["expires"] > now:
+            return _compiled["index"]
+        cached_version, index = _compiled.get("version"), _compiled.get("index")
+    version = _version()
+    if index is None or cached_version != version:
+        index = _load()
+    ttl = getattr(settings, "FEE_SCHEDULE_CACHE_TTL", 300)
+    with _lock:
+        _compiled.update(version=version, expires=now + ttl, index=index)
+    return index
+
+
+def invalidate() -> None:
+    """Drop this process's index; the next quote recompiles it."""
+    with _lock:
+        _compiled.clear()
+
+
+def _match(amount: Decimal, currency: str, sender_country: str, recipient_country: str) -> _Rule | None:
+    index = _index()
+    today = timezone.localdate()
+    best = None
+    keys = product(
+        {_norm(sender_country), ""}, {_norm(recipient_country), ""}, {_norm(currency), ""}
+    )
+    for key in keys:
+        entry = index.get(key)
+        if entry is None:
+            continue
+        bounds, candidates = entry
+        position = bisect_right(bounds, amount) - 1
+        if position < 0:
+            continue
+        for rule in candidates[position]:
+            if rule.live(today):
+                if best is None or rule.rank() > best.rank():
+                    best = rule
+                break
+    return best
+
+
+def quote(amount: Decimal, currency: str, sender_country: str = "", recipient_country: str = "") -> Quote:
+    """Price a transfer of ``amount`` along the given corridor."""
+    currency = (currency or "USD").upper()
+    rule = _match(amount, currency, sender_country, recipient_country)
+    if rule is None:
+        rate = Decimal(str(getattr(settings, "TRANSFER_FEE_RATE", DEFAULT_RATE)))
+        return Quote(amount, currency, (amount * rate).quantize(CENT))
+    return Quote(amount, currency, rule.fee(amount), rule.name, rule.promotion)
@@ -0,0 +1,261 @@
+"""
+Currency conversion from effective-dated exchange rates.
+
+Rates are stored as ``ExchangeRate`` rows (units of a currency per one unit
+of ``FX_BASE_CURRENCY``) and loaded from a local CSV or JSON feed with
+``manage.py load_fx_rates``. Each process keeps the whole table in memory,
+sorted by effective date, and looks rates up with a binary search. The
+table is reused for ``FX_RATE_CACHE_TTL`` seconds; after that one aggregate
+query reads a version stamp from the table itself (latest ``loaded_at``
+and row count) and the rates are reloaded only if it moved. The stamp
+lives in the database so a load made by ``manage.py load_fx_rates``, in
+its own process, reaches every web worker within the TTL.
+
+Conversions work on totals grouped by currency (``sum_converted``,
+``queryset_total``), so converting a queryset costs one ``GROUP BY`` and one
+multiplication per currency, not a lookup per row.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime, time as dt_time, timezone as dt_timezone
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, List, Mapping, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from ..models import ExchangeRate
+
+CENT = Decimal("0.01")
+CSV = "csv"
+JSON = "json"
+
+_lock = threading.Lock()
+# {"version": ..., "expires": monotonic seconds, "rates": {currency: (timestamps, rates)}}
+_table: Dict[str, object] = {}
+
+
+class RateNotFound(LookupError):
+    """No rate for the currency was in effect at the requested time."""
+
+
+class FeedError(ValueError):
+    """The rate feed could not be read; the message names the offending entry."""
+
+
+def base_currency() -> str:
+    return getattr(settings, "FX_BASE_CURRENCY", "USD").upper()
+
+
+def preferred_currency(user) -> str:
+    """The currency ``user`` wants totals shown in, defaulting to the base one."""
+    profile = getattr(user, "profile", None)
+    currency = getattr(profile, "preferred_currency", "") or base_currency()
+    return currency.upper()
+
+
+def reportable(currency: str) -> str:
+    """``currency`` if totals can be converted into it now, else the base currency."""
+    currency = (currency or "").upper()
+    try:
+        rate(currency)
+    except RateNotFound:
+        return base_currency()
+    return currency
+
+
+def _version() -> Tuple[object, int]:
+    stamp = ExchangeRate.objects.aggregate(latest=Max("loaded_at"), count=Count("id"))
+    return stamp["latest"], stamp["count"]
+
+
+def _build() -> Dict[str, Tuple[List[float], List[Decimal]]]:
+    rates: Dict[str, Tuple[List[float], List[Decimal]]] = {}
+    rows = ExchangeRate.objects.order_by("currency", "effective_at").values_list(
+        "currency", "effective_at", "rate"
+    )
+    for currency, effective_at, rate in rows.iterator(chunk_size=2000):
+        stamps, values = rates.setdefault(currency, ([], []))
+        stamps.append(effective_at.timestamp())
+        values.append(rate)
+    return rates
+
+
+def _rates() -> Dict[str, Tuple[List[float], List[Decimal]]]:
+    now = time.monotonic()
+    with _lock:
+        if _table and _table["expires"] > now:
+            return _table["rates"]
+        cached_version, rates = _table.get("version"), _table.get("rates")
+    version = _version()
+    if rates is None or cached_version != version:
+        rates = _build()
+    ttl = getattr(settings, "FX_RATE_CACHE_TTL", 300)
+    with _lock:
+        _table.update(version=version, expires=now + ttl, rates=rates)
+    return rates
+
+
+def rate(currency: str, at: datetime | None = None) -> Decimal:
+    """Units of ``currency`` per base unit in effect at ``at`` (default: now)."""
+    currency = (currency or "").upper()
+    if currency == base_currency():
+        return Decimal("1")
+    series = _rates().get(currency)
+    if series is not None:
+        stamps, values = series
+        index = bisect_right(stamps, (at or timezone.now()).timestamp())
+        if index:
+            return values[index - 1]
+    raise RateNotFound(f"No {currency} rate in effect at {at or 'present'}.")
+
+
+def convert(amount, from_currency: str, to_currency: str, at: datetime | None = None) -> Decimal:
+    """Convert ``amount`` between currencies, rounded to cents."""
+    amount = Decimal(amount or 0)
+    if (from_currency or "").upper() == (to_currency or "").upper():
+        return amount.quantize(CENT)
+    return (amount * rate(to_currency, at) / rate(from_currency, at)).quantize(CENT)
+
+
+def sum_converted(
+    totals: Mapping[str, Decimal], to_currency: str, at: datetime | None = None
+) -> Tuple[Decimal, Set[str]]:
+    """
+    Add up ``{currency: amount}`` in ``to_currency``.
+
+    Returns ``(total, missing)``: currencies without a rate are left out of
+    the total and listed in ``missing`` rather than guessed at.
+    """
+    target = rate(to_currency, at)
+    total = Decimal("0")
+    missing: Set[str] = set()
+    for currency, amount in totals.items():
+        if not amount:
+            continue
+        try:
+            total += Decimal(amount) * target / rate(currency, at)
+        except RateNotFound:
+            missing.add(currency)
+    return total.quantize(CENT), missing
+
+
+def queryset_total(
+    queryset,
+    to_currency: str,
+    *,
+    amount_field: str = "amount",
+    currency_field: str = "currency",
+    at: datetime | None = None,
+) -> Tuple[Decimal, Set[str]]:
+    """Sum a queryset's amounts in ``to_currency`` with one grouped query."""
+    rows = (
+        queryset.order_by()
+        .values_list(currency_field)
+        .annotate(total=Sum(amount_field))
+    )
+    totals: Dict[str, Decimal] = {}
+    for currency, amount in rows:
+        key = (currency or "").upper()
+        # SQLite sums decimals as floats; round back to cents.
+        totals[key] = totals.get(key, Decimal("0")) + Decimal(str(amount or 0)).quantize(CENT)
+    return sum_converted(totals, to_currency, at)
+
+
+def _parse_when(value, line) -> datetime:
+    text = str(value or "").strip()
+    when = parse_datetime(text)
+    if when is None:
+        day = parse_date(text)
+        if day is None:
+            raise FeedError(f"entry {line}: unreadable date {text!r}")
+        when = datetime.combine(day, dt_time.min)
+    if timezone.is_naive(when):
+        when = timezone.make_aware(when, dt_timezone.utc)
+    return when
+
+
+def _parse_rate(value, line) -> Decimal:
+    try:
+        parsed = Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        raise FeedError(f"entry {line}: unreadable rate {value!r}")
+    if not parsed.is_finite() or parsed <= 0:
+        raise FeedError(f"entry {line}: rate must be positive")
+    return parsed
+
+
+def _entries(payload) -> Iterator[Tuple[str, object, object]]:
+    # {"base": "USD", "date": "...", "rates": {"EUR": 0.92, ...}}: one day's table.
+    if isinstance(payload, dict):
+        payload = [payload]
+    for entry in payload:
+        if "rates" in entry:
+            base = (entry.get("base") or base_currency()).upper()
+            if base != base_currency():
+                raise FeedError(f"feed is quoted in {base}, expected {base_currency()}")
+            for currency, value in entry["rates"].items():
+                yield currency, value, entry.get("date")
+        else:
+            yield entry.get("currency"), entry.get("rate"), entry.get("effective_at") or entry.get("date")
+
+
+def parse_feed(handle, fmt: str) -> Iterator[Tuple[str, Decimal, datetime]]:
+    """Yield ``(currency, rate, effective_at)`` from a CSV or JSON rate file."""
+    if fmt == CSV:
+        text = io.TextIOWrapper(handle, encoding="utf-8-sig", newline="")
+        raw: Iterable = (
+            (row.get("currency"), row.get("rate"), row.get("effective_at") or row.get("date"))
+            for row in csv.DictReader(text)
+        )
+    elif fmt == JSON:
+        raw = _entries(json.load(handle))
+    else:
+        raise FeedError(f"unsupported feed format {fmt!r}")
+
+    for line, (currency, value, when) in enumerate(raw, start=1):
+        currency = (currency or "").strip().upper()
+        if not currency or len(currency) > 6:
+            raise FeedError(f"entry {line}: missing or invalid currency")
+        yield currency, _parse_rate(value, line), _parse_when(when, line)
+
+
+def detect_format(name: str) -> str:
+    return JSON if name.lower().endswith(".json") else CSV
+
+
+def load(entries: Iterable[Tuple[str, Decimal, datetime]], source: str = "", batch_size: int = 1000) -> int:
+    """
+    Upsert rates keyed on ``(currency, effective_at)`` and drop this
+    process's cached table. Returns the number of rows written.
+    """
+    rows = [
+        ExchangeRate(currency=currency, rate=value, effective_at=when, source=source[:100])
+        for currency, value, when in entries
+    ]
+    with transaction.atomic():
+        ExchangeRate.objects.bulk_create(
+            rows,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["currency", "effective_at"],
+            update_fields=["rate", "source", "loaded_at"],
+        )
+        # Other processes notice the new stamp once their TTL runs out.
+        transaction.on_commit(reset)
+    return len(rows)
+
+
+def reset() -> None:
+    """Drop this process's table; the next lookup reloads it."""
+    with _lock:
+        _table.clear()
@@ -0,0 +1,225 @@
+"""
+Database-backed job queue.
+
+``enqueue`` writes a ``Job`` row, normally inside the caller's transaction,
+so work is only queued if the request commits. Workers (``manage.py run_jobs``)
+claim ready rows with ``SELECT ... FOR UPDATE SKIP LOCKED`` where the database
+supports it. Elsewhere (SQLite) they use a conditional UPDATE that exactly one
+worker can win. Failed jobs are retried with exponential backoff until
+``max_attempts`` is reached.
+
+While a handler runs, a heartbeat thread moves the job's ``locked_at``
+forward every ``JOB_HEARTBEAT_INTERVAL`` seconds, so only a job whose
+worker has died (no heartbeat for ``JOB_LOCK_TIMEOUT``) is requeued, however
+long a healthy handler takes.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+from datetime import timedelta
+from typing import Callable, Dict, List
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Job
+
+logger = logging.getLogger(__name__)
+
+# Candidates fetched per claim on databases without SKIP LOCKED; losing a
+# race for one row just moves on to the next.
+CLAIM_OVERSCAN = 4
+MAX_ERROR_LENGTH = 4000
+
+Handler = Callable[..., object]
+_handlers: Dict[str, Handler] = {}
+
+
+def handler(name: str):
+    """Register the decorated function as the handler for jobs called ``name``."""
+    def register(func: Handler) -> Handler:
+        _handlers[name] = func
+        return func
+    return register
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def worker_name(suffix: str = "") -> str:
+    base = f"{socket.gethostname()}:{os.getpid()}"
+    return f"{base}:{suffix}" if suffix else base
+
+
+def enqueue(name: str, payload: Dict[str, object] | None = None, *, delay: timedelta | None = None, max_attempts: int | None = None) -> Job:
+    """Queue ``name`` to run with ``payload`` as keyword arguments."""
+    if name not in _handlers:
+        raise LookupError(f"No job handler registered as {name!r}.")
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        run_at=timezone.now() + (delay or timedelta()),
+        max_attempts=max_attempts or _setting("JOB_MAX_ATTEMPTS", 5),
+    )
+
+
+def _recover_stale(now) -> int:
+    """Requeue jobs whose worker died mid-run; their lock has outlived the timeout."""
+    cutoff = now - timedelta(seconds=_setting("JOB_LOCK_TIMEOUT", 300))
+    return Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff).update(
+        status=Job.QUEUED, locked_by="", locked_at=None,
+    )
+
+
+def claim(worker_id: str, limit: int = 1) -> List[Job]:
+    """Mark up to ``limit`` ready jobs as running under ``worker_id`` and return them."""
+    now = timezone.now()
+    _recover_stale(now)
+    ready = Job.objects.filter(status=Job.QUEUED, run_at__lte=now).order_by("run_at", "id")
+    claimed = {"status": Job.RUNNING, "locked_by": worker_id, "locked_at": now}
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            jobs = list(ready.select_for_update(skip_locked=True)[:limit])
+            Job.objects.filter(pk__in=[job.pk for job in jobs]).update(**claimed)
+    else:
+        won = []
+        for pk in ready.values_list("pk", flat=True)[:limit * CLAIM_OVERSCAN]:
+            if Job.objects.filter(pk=pk, status=Job.QUEUED).update(**claimed):
+                won.append(pk)
+                if len(won) == limit:
+                    break
+        jobs = list(Job.objects.filter(pk__in=won).order_by("run_at", "id"))
+
+    for job in jobs:
+        for field, value in claimed.items():
+            setattr(job, field, value)
+    return jobs
+
+
+class _Heartbeat(threading.Thread):
+    """Keep a running job's lock fresh until ``stop`` is called."""
+
+    def __init__(self, job: Job):
+        super().__init__(name=f"job-{job.pk}-heartbeat", daemon=True)
+        self.job = job
+        self.interval = _setting("JOB_HEARTBEAT_INTERVAL", _setting("JOB_LOCK_TIMEOUT", 300) / 3)
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        try:
+            while not self._stopped.wait(self.interval):
+                try:
+                    kept = Job.objects.filter(
+                        pk=self.job.pk, status=Job.RUNNING, locked_by=self.job.locked_by,
+                    ).update(locked_at=timezone.now())
+                except Exception:
+                    logger.warning("Heartbeat for job %s failed; will retry", self.job.pk, exc_info=True)
+                    continue
+                if not kept:
+                    logger.warning("Job %s %s lost its lock while running", self.job.pk, self.job.name)
+                    return
+        finally:
+            connection.close()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+def backoff(attempts: int) -> timedelta:
+    """Delay before retry number ``attempts``: doubling, capped, with 10% jitter."""
+    base = _setting("JOB_RETRY_BASE_DELAY", 5)
+    delay = min(base * 2 ** (attempts - 1), _setting("JOB_RETRY_MAX_DELAY", 3600))
+    return timedelta(seconds=delay * random.uniform(1.0, 1.1))
+
+
+def _finish(job: Job, **update) -> bool:
+    """
+    Record ``job``'s outcome only while this worker still holds its lock.
+
+    A job whose lock went stale has been reclaimed, and the new holder's
+    outcome is the one that counts.
+    """
+    finished = Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by).update(
+        locked_by="", locked_at=None, **update,
+    )
+    if not finished:
+        logger.warning("Job %s %s lost its lock; outcome not recorded", job.pk, job.name)
+    return bool(finished)
+
+
+def _fail(job: Job, exc: Exception) -> None:
+    attempts = job.attempts + 1
+    error = "".join(traceback.format_exception(exc))[-MAX_ERROR_LENGTH:]
+    if attempts >= job.max_attempts:
+        logger.error("Job %s %s failed permanently after %s attempts", job.pk, job.name, attempts)
+        update = {"status": Job.FAILED}
+    else:
+        logger.warning("Job %s %s failed (attempt %s); retrying", job.pk, job.name, attempts)
+        update = {"status": Job.QUEUED, "run_at": timezone.now() + backoff(attempts)}
+    _finish(job, attempts=attempts, last_error=error, **update)
+
+
+def run(job: Job) -> bool:
+    """Run one claimed job and record the outcome. Returns True if its success was recorded."""
+    try:
+        func = _handlers.get(job.name)
+        if func is None:
+            raise LookupError(f"No job handler registered as {job.name!r}.")
+        heartbeat = _Heartbeat(job)
+        heartbeat.start()
+        try:
+            func(**job.payload)
+        finally:
+            heartbeat.stop()
+    except Exception as exc:
+        _fail(job, exc)
+        return False
+    return _finish(job, status=Job.DONE, attempts=F("attempts") + 1, last_error="")
+
+
+def run_pending(worker_id: str | None = None) -> int:
+    """Drain every job that is ready now, in this thread. Returns jobs run."""
+    worker_id = worker_id or worker_name("inline")
+    processed = 0
+    while True:
+        jobs = claim(worker_id)
+        if not jobs:
+            return processed
+        for job in jobs:
+            run(job)
+            processed += 1
+
+
+def work(worker_id: str, stop: threading.Event, *, poll_interval: float = 1.0, drain: bool = False) -> int:
+    """
+    Worker loop: claim and run jobs until ``stop`` is set.
+
+    With ``drain`` the loop returns as soon as nothing is ready instead of
+    polling. Returns the number of jobs run.
+    """
+    processed = 0
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            jobs = claim(worker_id)
+            if not jobs:
+                if drain:
+                    break
+                stop.wait(poll_interval)
+                continue
+            for job in jobs:
+                run(job)
+                processed += 1
+    finally:
+        connection.close()
+    return processed
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Dict
+
+from ..models import BalanceLedger, Transaction
+from .running_totals import RunningTotals
+
+_totals = RunningTotals(
+    BalanceLedger,
+    ("user_id", "currency", "kind"),
+    key=lambda tx: (tx.user_id, tx.currency, tx.kind),
+    group=lambda qs: qs.values("user_id", "currency", "kind"),
+)
+
+
+def snapshot(tx: Transaction) -> Transaction | None:
+    """
+    Lock and return the stored copy of ``tx`` before it is overwritten.
+
+    Only the fields the ledger and the rollups key on are loaded.
+    """
+    if tx.pk is None or tx._state.adding:
+        return None
+    return (
+        Transaction.objects.select_for_update()
+        .only("user_id", "currency", "kind", "amount", "category", "occurred_at")
+        .filter(pk=tx.pk)
+        .first()
+    )
+
+
+apply_deltas = _totals.apply_deltas
+record_save = _totals.record_save
+record_delete = _totals.record_delete
+record_bulk = _totals.record_bulk
+rebuild = _totals.rebuild
+verify = _totals.verify
+
+
+def totals_by_kind(user) -> Dict[str, Decimal]:
+    """Sum the user's ledger rows per transaction kind across currencies."""
+    totals = {kind: Decimal("0") for kind, _ in Transaction.KIND_CHOICES}
+    rows = BalanceLedger.objects.filter(user=user).values_list("kind", "total")
+    for kind, total in rows:
+        totals[kind] = totals.get(kind, Decimal("0")) + total
+    return totals
+
+
+def totals_by_currency(user) -> Dict[str, Dict[str, Decimal]]:
+    """The user's ledger totals as ``{kind: {currency: total}}``, for conversion."""
+    totals: Dict[str, Dict[str, Decimal]] = {kind: {} for kind, _ in Transaction.KIND_CHOICES}
+    rows = BalanceLedger.objects.filter(user=user).values_list("kind", "currency", "total")
+    for kind, currency, total in rows:
+        per_currency = totals.setdefault(kind, {})
+        key = (currency or "").upper()
+        per_currency[key] = per_currency.get(key, Decimal("0")) + total
+    return totals
@@ -0,0 +1,154 @@
+"""
+The admin dashboard's live feed, read from the transfer event log.
+
+Every transfer creation and status change is appended to ``TransferEvent``
+in the transaction that makes it, whichever process that is: a web
+worker, the job runner or a management command. ``stream`` tails that
+table by id, so SSE ids are ``TransferEvent`` ids and a console that
+reconnects, to any worker and across restarts, resumes after its
+``Last-Event-ID``.
+
+Ids are assigned at insert, not at commit, so an event can become visible
+after one with a higher id. While connected, ``stream`` re-reads the last
+``LOOKBACK`` ids on every poll and skips the ones it already sent, so such
+an event is still delivered. A reconnect resumes strictly after
+``Last-Event-ID``. That is exact on SQLite, whose single writer commits
+events in id order. On a database with concurrent writers, an event still
+uncommitted when the client's last frame was read is missed by the resume.
+
+Each frame carries the transfer as the dashboard shows it plus the KPI
+delta the change implies, so a frame is applied whole or not at all.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from decimal import Decimal
+from typing import AsyncIterator, Dict, List, Set
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+
+from ..models import MoneyTransfer, TransferEvent
+from . import transfer_states
+
+BATCH_SIZE = 200
+LOOKBACK = 100  # trailing ids re-read each poll for events that committed late
+STATUS_LABELS = dict(MoneyTransfer.STATUS_CHOICES)
+
+
+def parse_id(value: str | None) -> int | None:
+    """The event id in a client's ``Last-Event-ID``; None for a new or garbled one."""
+    value = (value or "").strip()
+    return int(value) if value.isdigit() else None
+
+
+def latest_id() -> int:
+    return TransferEvent.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def kpi_delta(from_status: str | None, to_status: str, service_fee) -> Dict[str, object]:
+    delta = {"transfers": 0 if from_status else 1, "pending": 0, "completed": 0, "earnings": Decimal("0")}
+    for status, sign in ((from_status, -1), (to_status, 1)):
+        if status == MoneyTransfer.PENDING:
+            delta["pending"] += sign
+        elif status == MoneyTransfer.COMPLETED:
+            delta["completed"] += sign
+            delta["earnings"] += sign * Decimal(service_fee or 0)
+    return delta
+
+
+def encode(events: List[TransferEvent]) -> str:
+    """SSE frames for ``events``, with one query for the usernames they mention."""
+    user_ids = {event.sender_id for event in events} | {event.recipient_id for event in events}
+    names = dict(User.objects.filter(pk__in=user_ids).values_list("pk", "username"))
+    frames = []
+    for event in events:
+        data = {
+            "id": event.transfer_id,
+            "reference": event.reference_number,
+            "sender": names.get(event.sender_id, ""),
+            "recipient": names.get(event.recipient_id, ""),
+            "amount": event.amount,
+            "currency": event.currency,
+            "service_fee": event.service_fee,
+            "status": event.to_status,
+            "status_display": STATUS_LABELS.get(event.to_status, event.to_status),
+            "created_at": event.created_at.isoformat(),
+            "kpi": kpi_delta(event.from_status, event.to_status, event.service_fee),
+        }
+        kind = "transfer.created" if event.kind == TransferEvent.CREATED else "transfer.status"
+        frames.append(f"id: {event.id}\nevent: {kind}\ndata: {json.dumps(data, default=str)}\n\n")
+    return "".join(frames)
+
+
+def _id_frame(position: int) -> str:
+    # An id-only frame dispatches nothing but sets the client's Last-Event-ID.
+    return f"id: {position}\n\n"
+
+
+def preamble(position: int) -> str:
+    """Reconnect hint and the position the client should resume from."""
+    return "retry: 3000\n" + _id_frame(position)
+
+
+def replay(last_id: int | None) -> str:
+    """One response's worth of frames after ``last_id``, for servers that cannot stream."""
+    if last_id is None:
+        return preamble(latest_id())
+    events = transfer_states.events_since(last_id, BATCH_SIZE)
+    return preamble(last_id) + encode(events)
+
+
+def _next_batch(last_id: int, sent: Set[int]):
+    """
+    Frames for the events after ``last_id``, plus any event in the trailing
+    ``LOOKBACK`` ids that is not in ``sent``, the ids this stream has sent.
+    """
+    floor = max(last_id - LOOKBACK, 0)
+    events = [
+        event for event in transfer_states.events_since(floor, BATCH_SIZE + LOOKBACK)
+        if event.id not in sent
+    ]
+    if not events:
+        return last_id, ""
+    frames = encode(events)
+    newest = max(last_id, events[-1].id)
+    if events[-1].id < newest:
+        # A late event's frame moved the client's Last-Event-ID back; restore it.
+        frames += _id_frame(newest)
+    sent.update(event.id for event in events)
+    sent.difference_update([event_id for event_id in sent if event_id <= newest - LOOKBACK])
+    return newest, frames
+
+
+async def stream(
+    last_id: int | None = None, *, heartbeat: float | None = None, poll: float | None = None
+) -> AsyncIterator[str]:
+    """
+    Yield SSE frames: a retry hint, then every event after ``last_id``,
+    polling the log every ``poll`` seconds once caught up.
+
+    A comment line goes out every ``heartbeat`` seconds of silence so
+    proxies keep the connection open and dead clients are noticed.
+    """
+    heartbeat = heartbeat or getattr(settings, "SSE_HEARTBEAT_SECONDS", 15)
+    poll = poll or getattr(settings, "SSE_POLL_SECONDS", 1)
+    if last_id is None:
+        last_id = await sync_to_async(latest_id)()
+    yield preamble(last_id)
+    # Events at or below the resume point count as sent: the client had them.
+    sent = set(range(max(last_id - LOOKBACK, 0) + 1, last_id + 1))
+    idle = 0.0
+    while True:
+        last_id, frames = await sync_to_async(_next_batch)(last_id, sent)
+        if frames:
+            idle = 0.0
+            yield frames
+            continue
+        await asyncio.sleep(poll)
+        idle += poll
+        if idle >= heartbeat:
+            idle = 0.0
+            yield ": ping\n\n"
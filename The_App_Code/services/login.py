@@ -1,16 +1,35 @@
 from __future__ import annotations
 
+from django.contrib import messages
 from django.contrib.auth import login
 
 from ..forms import StyledAuthenticationForm
+from . import ratelimit
 
 
 def handle_request(request):
+    """
+    Returns ``(success, form, throttled)``; ``throttled`` is the rate limit
+    decision when the attempt was turned away, else None.
+    """
+    if request.method == "POST":
+        username = request.POST.get("username", "")
+        decision = ratelimit.hit("login", ip=ratelimit.client_ip(request), username=username)
+        if not decision.allowed:
+            # Unbound form: validating it would run the password hash we are avoiding
+            messages.error(
+                request, f"Too many login attempts. Try again in {decision.retry_after} seconds."
+            )
+            return False, StyledAuthenticationForm(request, initial={"username": username}), decision
+
     form = StyledAuthenticationForm(request, data=request.POST or None)
-    if request.method == "POST" and form.is_valid():
-        login(request, form.get_user())
-        return True, form
-    return False, form
+    if request.method == "POST":
+        with ratelimit.measure_hash("login"):
+            valid = form.is_valid()
+        if valid:
+            login(request, form.get_user())
+            return True, form, None
+    return False, form, None
 
 
 def build_context(form):
@@ -0,0 +1,151 @@
+"""
+Outbound email.
+
+Requests only write an ``OutboxEmail`` row (``queue``). A ``mail.flush`` job
+claims pending rows in batches and sends them over one backend connection,
+throttled to ``MAIL_RATE_LIMIT`` messages per second. A message that fails
+is retried with the job queue's backoff until ``MAIL_MAX_ATTEMPTS``.
+"""
+from __future__ import annotations
+
+import logging
+import time
+import traceback
+from datetime import timedelta
+from typing import List
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection as db_connection, transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from ..models import Job, OutboxEmail
+from . import jobs
+
+logger = logging.getLogger(__name__)
+
+FLUSH_JOB = "mail.flush"
+MAX_ERROR_LENGTH = 4000
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def queue(subject: str, message: str, recipient_list: List[str], from_email: str | None = None) -> OutboxEmail:
+    """Store the email for the next flush; nothing is sent in the caller's thread."""
+    with transaction.atomic():
+        email = OutboxEmail.objects.create(
+            subject=subject,
+            body=message,
+            from_email=from_email or "",
+            to=list(recipient_list),
+        )
+        schedule_flush()
+    return email
+
+
+def schedule_flush(at=None) -> None:
+    """Make sure a flush job is queued to run no later than ``at`` (default: now)."""
+    now = timezone.now()
+    at = max(at or now, now)
+    if not Job.objects.filter(name=FLUSH_JOB, status=Job.QUEUED, run_at__lte=at).exists():
+        jobs.enqueue(FLUSH_JOB, delay=at - now)
+
+
+def _claim(limit: int) -> List[OutboxEmail]:
+    now = timezone.now()
+    stale = now - timedelta(seconds=_setting("MAIL_LOCK_TIMEOUT", 300))
+    OutboxEmail.objects.filter(status=OutboxEmail.SENDING, locked_at__lt=stale).update(
+        status=OutboxEmail.PENDING, locked_at=None,
+    )
+    ready = OutboxEmail.objects.filter(
+        status=OutboxEmail.PENDING, next_attempt_at__lte=now,
+    ).order_by("next_attempt_at", "id")
+
+    with transaction.atomic():
+        if db_connection.features.has_select_for_update_skip_locked:
+            ready = ready.select_for_update(skip_locked=True)
+        ids = list(ready.values_list("pk", flat=True)[:limit])
+        # The status guard keeps two flushes from both taking a row on SQLite.
+        OutboxEmail.objects.filter(pk__in=ids, status=OutboxEmail.PENDING).update(
+            status=OutboxEmail.SENDING, locked_at=now,
+        )
+    return list(OutboxEmail.objects.filter(pk__in=ids, status=OutboxEmail.SENDING, locked_at=now))
+
+
+def _retry(email: OutboxEmail, exc: Exception) -> None:
+    attempts = email.attempts + 1
+    error = "".join(traceback.format_exception(exc))[-MAX_ERROR_LENGTH:]
+    if attempts >= _setting("MAIL_MAX_ATTEMPTS", 5):
+        logger.error("Email %s to %s failed permanently: %s", email.pk, email.to, exc)
+        update = {"status": OutboxEmail.FAILED}
+    else:
+        logger.warning("Email %s to %s failed (attempt %s): %s", email.pk, email.to, attempts, exc)
+        update = {"status": OutboxEmail.PENDING, "next_attempt_at": timezone.now() + jobs.backoff(attempts)}
+    OutboxEmail.objects.filter(pk=email.pk).update(
+        attempts=attempts, last_error=error, locked_at=None, **update,
+    )
+
+
+class _Throttle:
+    """Space calls at least ``1 / rate`` seconds apart; a rate of 0 disables it."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_at = 0.0
+
+    def wait(self) -> None:
+        now = time.monotonic()
+        if now < self.next_at:
+            time.sleep(self.next_at - now)
+            now = self.next_at
+        self.next_at = now + self.interval
+
+
+@jobs.handler(FLUSH_JOB)
+def flush(batch_size: int | None = None, backend: str | None = None) -> int:
+    """Send one batch of pending email over a single connection. Returns messages sent."""
+    emails = _claim(batch_size or _setting("MAIL_BATCH_SIZE", 50))
+    sent = 0
+    if emails:
+        try:
+            connection = get_connection(backend, fail_silently=False)
+            connection.open()
+        except Exception as exc:
+            for email in emails:
+                _retry(email, exc)
+        else:
+            throttle = _Throttle(_setting("MAIL_RATE_LIMIT", 10))
+            try:
+                for email in emails:
+                    throttle.wait()
+                    message = EmailMessage(
+                        subject=email.subject,
+                        body=email.body,
+                        from_email=email.from_email or settings.DEFAULT_FROM_EMAIL,
+                        to=email.to,
+                        connection=connection,
+                    )
+                    try:
+                        # One message per call so a bad address fails alone.
+                        connection.send_messages([message])
+                    except Exception as exc:
+                        _retry(email, exc)
+                        continue
+                    OutboxEmail.objects.filter(pk=email.pk).update(
+                        status=OutboxEmail.SENT, attempts=email.attempts + 1,
+                        sent_at=timezone.now(), locked_at=None, last_error="",
+                    )
+                    sent += 1
+            finally:
+                connection.close()
+
+    # Come back for the rest of the backlog or for the earliest retry.
+    next_at = OutboxEmail.objects.filter(status=OutboxEmail.PENDING).aggregate(
+        at=Min("next_attempt_at")
+    )["at"]
+    if next_at is not None:
+        schedule_flush(next_at)
+    return sent
@@ -0,0 +1,141 @@
+"""
+Administrator notifications.
+
+Global notifications are never copied per user: a reader sees every live
+global notification newer than their watermark (``NotificationWatermark``).
+Targeted notifications get one ``NotificationDelivery`` row per recipient,
+written in batches by background jobs queued alongside the notification.
+The watermark never passes a notification whose delivery jobs are still
+queued or running, so a row written late cannot land below it as read.
+"""
+from __future__ import annotations
+
+import heapq
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import BigIntegerField, Min
+from django.db.models.fields.json import KT
+from django.db.models.functions import Cast
+
+from ..models import AdminNotification, Job, NotificationDelivery, NotificationWatermark
+from . import jobs
+
+# Counts above this are shown as "99+"; it also bounds the index range read.
+UNREAD_CAP = 99
+RECENT_LIMIT = 20
+DELIVER_JOB = "notifications.deliver"
+
+
+def _batch_size() -> int:
+    return getattr(settings, "NOTIFICATION_BATCH_SIZE", 1000)
+
+
+def send(sender, title: str, message: str, notification_type: str = AdminNotification.GENERAL, *, is_global: bool = False, recipient_ids: Iterable[int] = ()) -> AdminNotification:
+    """Create a notification; targeted deliveries are queued as one job per batch."""
+    user_ids = sorted(set(recipient_ids))
+    with transaction.atomic():
+        notification = AdminNotification.objects.create(
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            sent_by=sender,
+            is_global=is_global,
+        )
+        if not is_global:
+            size = _batch_size()
+            for start in range(0, len(user_ids), size):
+                jobs.enqueue(DELIVER_JOB, {
+                    "notification_id": notification.pk,
+                    "user_ids": user_ids[start:start + size],
+                })
+    return notification
+
+
+@jobs.handler(DELIVER_JOB)
+def deliver(notification_id: int, user_ids: List[int]) -> int:
+    """Write one batch of delivery rows; safe to re-run after a partial failure."""
+    NotificationDelivery.objects.bulk_create(
+        [NotificationDelivery(adminnotification_id=notification_id, user_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+    return len(user_ids)
+
+
+def last_seen(user) -> int:
+    return (
+        NotificationWatermark.objects.filter(user=user)
+        .values_list("last_seen_id", flat=True)
+        .first()
+    ) or 0
+
+
+def _global(after: int = 0):
+    return AdminNotification.objects.filter(is_global=True, is_active=True, pk__gt=after)
+
+
+def _targeted_ids(user, after: int = 0):
+    return NotificationDelivery.objects.filter(
+        user=user, adminnotification_id__gt=after
+    ).values_list("adminnotification_id", flat=True)
+
+
+def unread_count(user) -> int:
+    """
+    Unread notifications, capped at ``UNREAD_CAP``.
+
+    Both halves are range reads past the watermark on an index
+    (the partial live-global index and the per-user delivery index).
+    """
+    seen = last_seen(user)
+    global_unread = _global(seen).order_by("pk")[:UNREAD_CAP].count()
+    targeted = list(_targeted_ids(user, seen).order_by("adminnotification_id")[:UNREAD_CAP])
+    targeted_unread = AdminNotification.objects.filter(
+        pk__in=targeted, is_active=True, is_global=False
+    ).count() if targeted else 0
+    return min(global_unread + targeted_unread, UNREAD_CAP)
+
+
+def recent(user, limit: int = RECENT_LIMIT) -> List[Dict[str, object]]:
+    """Newest live notifications for ``user``, each flagged read or unread."""
+    seen = last_seen(user)
+    global_ids = _global().order_by("-pk").values_list("pk", flat=True)[:limit]
+    targeted_ids = _targeted_ids(user).order_by("-adminnotification_id")[:limit]
+    ids = list(heapq.merge(global_ids, targeted_ids, reverse=True))[:limit]
+    rows = AdminNotification.objects.filter(pk__in=ids, is_active=True).order_by("-pk").values(
+        "pk", "title", "message", "notification_type", "created_at",
+    )
+    return [dict(row, unread=row["pk"] > seen) for row in rows]
+
+
+def _newest_id() -> int:
+    return AdminNotification.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+
+
+def start_watermark(user) -> None:
+    """Begin a new account's watermark at the newest existing notification."""
+    NotificationWatermark.objects.get_or_create(user=user, defaults={"last_seen_id": _newest_id()})
+
+
+def _undelivered_id() -> int | None:
+    """The oldest notification whose targeted deliveries are still being written."""
+    return Job.objects.filter(name=DELIVER_JOB, status__in=[Job.QUEUED, Job.RUNNING]).aggregate(
+        oldest=Min(Cast(KT("payload__notification_id"), BigIntegerField())),
+    )["oldest"]
+
+
+def mark_seen(user, upto: int | None = None) -> int:
+    """
+    Move the watermark forward to ``upto`` (default: the newest notification),
+    stopping short of any notification that is still being delivered.
+    """
+    if upto is None:
+        upto = _newest_id()
+    undelivered = _undelivered_id()
+    if undelivered is not None:
+        upto = min(upto, undelivered - 1)
+    watermark, _ = NotificationWatermark.objects.get_or_create(user=user)
+    # Never move backwards, even when two tabs race each other.
+    NotificationWatermark.objects.filter(user=user, last_seen_id__lt=upto).update(last_seen_id=upto)
+    return max(watermark.last_seen_id, upto)
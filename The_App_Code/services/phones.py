@@ -0,0 +1,108 @@
+"""
+Phone number normalization to E.164 (``+<country code><subscriber number>``).
+
+Covers the formats people actually type: spaces, dashes, dots and brackets,
+a ``00`` international prefix, and national numbers with a leading trunk
+``0``, which take the country code of the sign-up country. A number typed
+without ``+`` that starts with the calling code is read as international
+only when the digits after the code fit that country's national numbers.
+"""
+from __future__ import annotations
+
+import re
+
+# Calling codes for the countries offered at sign-up.
+CALLING_CODES = {
+    "United States": "1",
+    "Canada": "1",
+    "United Kingdom": "44",
+    "Germany": "49",
+    "France": "33",
+    "Kenya": "254",
+    "Ghana": "233",
+    "Nigeria": "234",
+    "South Africa": "27",
+    "Uganda": "256",
+    "Tanzania": "255",
+    "Rwanda": "250",
+    "Ethiopia": "251",
+    "Senegal": "221",
+    "Morocco": "212",
+    "Australia": "61",
+    "India": "91",
+    "Philippines": "63",
+}
+
+# National significant number lengths (without the trunk 0), inclusive.
+NATIONAL_LENGTHS = {
+    "1": (10, 10),
+    "44": (9, 10),
+    "49": (6, 11),
+    "33": (9, 9),
+    "254": (9, 9),
+    "233": (9, 9),
+    "234": (8, 10),
+    "27": (9, 9),
+    "256": (9, 9),
+    "255": (9, 9),
+    "250": (9, 9),
+    "251": (9, 9),
+    "221": (9, 9),
+    "212": (9, 9),
+    "61": (9, 9),
+    "91": (10, 10),
+    "63": (8, 10),
+}
+
+MIN_DIGITS = 8
+MAX_DIGITS = 15
+_SEPARATORS = re.compile(r"[\s\-.()/]")
+
+
+def normalize(raw: str | None, country: str | None = None, *, partial: bool = False) -> str | None:
+    """
+    Return ``raw`` as E.164, or None if it cannot be read as a phone number.
+
+    ``partial`` accepts a too-short number, for normalizing search prefixes.
+    """
+    text = _SEPARATORS.sub("", raw or "")
+    if text.startswith("00"):
+        text = "+" + text[2:]
+    if text.startswith("+"):
+        digits = text[1:]
+    else:
+        code = CALLING_CODES.get(country or "")
+        if code is None:
+            # A national number means nothing without its country.
+            return None
+        if text.startswith(code) and _fits_national(text[len(code):], code, partial):
+            digits = text
+        elif text.startswith("0"):
+            digits = code + text[1:]
+        else:
+            digits = code + text
+    if not digits.isdigit() or digits.startswith("0"):
+        return None
+    if len(digits) > MAX_DIGITS or (len(digits) < MIN_DIGITS and not partial):
+        return None
+    return "+" + digits
+
+
+def _fits_national(rest: str, code: str, partial: bool) -> bool:
+    """
+    Whether ``rest`` can be a national number after calling code ``code``.
+
+    A partial number shorter than any national number cannot tell, and is
+    read as typed.
+    """
+    shortest, longest = NATIONAL_LENGTHS[code]
+    if partial and len(code) + len(rest) < shortest:
+        return True
+    return shortest <= len(rest) <= longest
+
+
+def country_of(user) -> str:
+    """The user's profile country, used to read national numbers they type."""
+    profile = getattr(user, "profile", None)
+    return profile.country if profile is not None else ""
+
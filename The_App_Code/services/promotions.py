@@ -20,3 +20,8 @@ def list_promotions(include_inactive: bool = False):
 
 def feature_promotion():
     return list_promotions().first()
+
+
+async def alist_promotions(include_inactive: bool = False):
+    """Async ``list_promotions``, evaluated to a list for the template."""
+    return [promotion async for promotion in list_promotions(include_inactive)]
@@ -0,0 +1,177 @@
+"""
+Sliding-window rate limits for login and registration.
+
+Limits come from ``settings.RATE_LIMITS`` (``{rule: (attempts, window
+seconds)}``); a rule that is not listed there is not limited. Views turn a
+rejected attempt into a 429 with a ``Retry-After`` header (``reject``).
+
+Each limit keeps a counter per fixed window in the cache and estimates the
+sliding count as ``current + previous * (share of the previous window still
+inside the sliding one)``. When the cache backend errors, counting falls back
+to a per-process dict so attempts are still limited, just not shared.
+
+Rejected attempts are turned away before any query or password hash runs.
+``metrics()`` reports them together with the average hashing time measured
+on allowed attempts, which gives the CPU the limiter saved.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_local: Dict[str, Tuple[int, float]] = {}
+_stats: Dict[str, Dict[str, float]] = {}
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    retry_after: int = 0
+    limit: str = ""
+
+
+def _limits() -> Dict[str, Tuple[int, int]]:
+    return getattr(settings, "RATE_LIMITS", {})
+
+
+def _cache():
+    return caches[getattr(settings, "RATE_LIMIT_CACHE", "default")]
+
+
+def client_ip(request) -> str:
+    return request.META.get("REMOTE_ADDR") or "unknown"
+
+
+def _key(rule: str, identity: str, window_index: int) -> str:
+    # Hash the identity so arbitrary usernames make valid cache keys.
+    digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()
+    return f"ratelimit:{rule}:{digest}:{window_index}"
+
+
+def _local_get(key: str) -> int:
+    with _lock:
+        count, expires = _local.get(key, (0, 0.0))
+        return count if expires > time.time() else 0
+
+
+def _local_incr(key: str, ttl: int) -> None:
+    now = time.time()
+    with _lock:
+        if len(_local) > 10000:
+            for stale in [k for k, (_, expires) in _local.items() if expires <= now]:
+                del _local[stale]
+        count, expires = _local.get(key, (0, 0.0))
+        _local[key] = (count + 1, expires) if expires > now else (1, now + ttl)
+
+
+def _counts(keys) -> Dict[str, int]:
+    try:
+        return _cache().get_many(keys)
+    except Exception:
+        logger.warning("Rate limit cache unavailable; counting in process", exc_info=True)
+        return {key: _local_get(key) for key in keys}
+
+
+def _incr(key: str, ttl: int) -> None:
+    try:
+        cache = _cache()
+        if not cache.add(key, 1, ttl):
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, ttl)  # expired between add and incr
+    except Exception:
+        logger.warning("Rate limit cache unavailable; counting in process", exc_info=True)
+        _local_incr(key, ttl)
+
+
+def _record(scope: str, field: str, amount: float = 1) -> None:
+    with _lock:
+        stats = _stats.setdefault(scope, {"allowed": 0, "rejected": 0, "hash_seconds": 0.0, "hashes": 0})
+        stats[field] += amount
+
+
+def hit(scope: str, **identities: str) -> Decision:
+    """
+    Count one attempt for ``scope`` against each identity (e.g. ``ip=...``).
+
+    Nothing is counted when any limit is already exhausted, so a blocked
+    client's window drains instead of being extended by its own retries.
+    """
+    now = time.time()
+    checks = []
+    for name, identity in identities.items():
+        rule = f"{scope}:{name}"
+        if not identity or rule not in _limits():
+            continue
+        limit, window = _limits()[rule]
+        index = int(now // window)
+        elapsed = (now % window) / window
+        checks.append((rule, identity.lower(), limit, window, index, elapsed))
+
+    keys = [_key(rule, identity, index - back) for rule, identity, _, _, index, _ in checks for back in (0, 1)]
+    counts = _counts(keys)
+    for rule, identity, limit, window, index, elapsed in checks:
+        current = counts.get(_key(rule, identity, index), 0)
+        previous = counts.get(_key(rule, identity, index - 1), 0)
+        if current + previous * (1 - elapsed) >= limit:
+            _record(scope, "rejected")
+            # A hint, not a promise: when the current window rolls over.
+            return Decision(False, max(1, math.ceil(window * (1 - elapsed))), rule)
+
+    for rule, identity, _, window, index, _ in checks:
+        _incr(_key(rule, identity, index), window * 2)
+    _record(scope, "allowed")
+    return Decision(True)
+
+
+def reject(response, decision: Decision):
+    """Mark ``response`` as the 429 for a rejected ``decision``."""
+    response.status_code = 429
+    response["Retry-After"] = str(decision.retry_after)
+    return response
+
+
+class measure_hash:
+    """Time the password-hashing part of an allowed attempt for ``metrics()``."""
+
+    def __init__(self, scope: str):
+        self.scope = scope
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _record(self.scope, "hash_seconds", time.perf_counter() - self._start)
+        _record(self.scope, "hashes")
+        return False
+
+
+def metrics() -> Dict[str, Dict[str, float]]:
+    """Per-scope counts, plus the hashing seconds the rejections avoided."""
+    with _lock:
+        snapshot = {scope: dict(stats) for scope, stats in _stats.items()}
+    for stats in snapshot.values():
+        average = stats["hash_seconds"] / stats["hashes"] if stats["hashes"] else 0.0
+        stats["avg_hash_ms"] = round(average * 1000, 2)
+        stats["hash_seconds_saved"] = round(stats["rejected"] * average, 3)
+    return snapshot
+
+
+def reset() -> None:
+    """Clear the in-process fallback counters and metrics."""
+    with _lock:
+        _local.clear()
+        _stats.clear()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from ..models import UserProfile
+from . import phones
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+# Upper bound for prefix ranges; sorts after any character a user can type.
+PREFIX_END = "\U0010ffff"
+
+
+def _prefix(field: str, value: str) -> Q:
+    """Express ``startswith`` as a range so a plain B-tree index can serve it."""
+    return Q(**{f"{field}__gte": value, f"{field}__lt": value + PREFIX_END})
+
+
+def search(user, query: str = "", *, after: int | None = None, limit: int = DEFAULT_LIMIT) -> Tuple[List[Dict[str, object]], int | None]:
+    """
+    Return one page of active recipients matching ``query`` by phone or name prefix.
+
+    Pages are keyed on profile id: pass the returned cursor back as ``after``
+    to continue. The cursor is None on the last page.
+    """
+    limit = max(1, min(limit, MAX_LIMIT))
+    qs = (
+        UserProfile.objects.filter(is_active=True, phone_number__gt="")
+        .exclude(user=user)
+        .alias(name_key=Lower("display_name"))
+    )
+
+    query = (query or "").strip()
+    if query:
+        matches = _prefix("phone_number", query) | _prefix("name_key", query.lower())
+        # "0700" or "+254 700" should find "+254700..." too
+        e164 = phones.normalize(query, partial=True)
+        if e164 is None and query[:1].isdigit():
+            e164 = phones.normalize(query, phones.country_of(user), partial=True)
+        if e164:
+            matches |= _prefix("phone_e164", e164)
+        qs = qs.filter(matches)
+    if after:
+        qs = qs.filter(pk__gt=after)
+
+    rows = list(
+        qs.order_by("pk").values(
+            "pk", "phone_number", "display_name", "country", "user__username"
+        )[: limit + 1]
+    )
+    next_cursor = rows[limit - 1]["pk"] if len(rows) > limit else None
+
+    results = [
+        {
+            "phone_number": row["phone_number"],
+            "display_name": row["display_name"] or row["user__username"],
+            "country": row["country"],
+        }
+        for row in rows[:limit]
+    ]
+    return results, next_cursor
@@ -0,0 +1,172 @@
+"""
+Short, time-ordered transfer reference numbers.
+
+A reference packs 56 bits into 12 Crockford base32 characters plus one
+check symbol::
+
+    32 bits  seconds since REFERENCE_EPOCH
+    10 bits  shard (one per worker process)
+    14 bits  per-second sequence within the shard
+
+Fixed-width, time-first encoding keeps new values at the right-hand end
+of the unique index, and the shard/sequence pair keeps values from two
+processes apart as long as they use different shards. On first use each
+process (and each forked worker, since the pid changes) leases a shard
+from the ``ReferenceShard`` table and renews the lease once half of
+``TRANSFER_REFERENCE_SHARD_LEASE`` has passed. Only expired leases are
+taken over, and a process whose lease was taken over leases another shard
+before its next reference. ``TRANSFER_REFERENCE_SHARD`` pins a process to
+a fixed shard instead.
+
+The lease is written on the caller's connection. ``send_money`` draws its
+reference before opening its transaction, so the lease commits on its own.
+"""
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from ..models import ReferenceShard
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+CHECK_ALPHABET = ALPHABET + "*~$=U"
+REFERENCE_EPOCH = int(datetime(2025, 1, 1, tzinfo=dt_timezone.utc).timestamp())
+
+SHARD_BITS = 10
+SEQUENCE_BITS = 14
+BODY_LENGTH = 12
+MAX_SHARD = (1 << SHARD_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+_lock = threading.Lock()
+_state = {"pid": None, "holder": "", "shard": 0, "renew_at": 0.0, "second": -1, "sequence": 0}
+
+
+class NoShardAvailable(RuntimeError):
+    """Every reference shard is leased by a live process."""
+
+
+def _configured_shard() -> int | None:
+    shard = getattr(settings, "TRANSFER_REFERENCE_SHARD", None)
+    if shard is None:
+        return None
+    try:
+        shard = int(shard)
+    except (TypeError, ValueError):
+        shard = -1
+    if not 0 <= shard <= MAX_SHARD:
+        # Wrapping an out-of-range value would quietly share another worker's shard.
+        raise ImproperlyConfigured(f"TRANSFER_REFERENCE_SHARD must be between 0 and {MAX_SHARD}.")
+    return shard
+
+
+def _lease_seconds() -> int:
+    return int(getattr(settings, "TRANSFER_REFERENCE_SHARD_LEASE", 600))
+
+
+def _claim_shard(holder: str) -> int:
+    """Lease the lowest expired shard to ``holder``, or a shard never leased before."""
+    for _ in range(MAX_SHARD + 1):
+        now = timezone.now()
+        until = now + timedelta(seconds=_lease_seconds())
+        expired = ReferenceShard.objects.filter(leased_until__lt=now).values_list("shard", flat=True).first()
+        if expired is not None:
+            # Conditional on the lease still being expired, so two claimants cannot both win.
+            if ReferenceShard.objects.filter(shard=expired, leased_until__lt=now).update(holder=holder, leased_until=until):
+                return expired
+            continue
+        highest = ReferenceShard.objects.aggregate(highest=Max("shard"))["highest"]
+        shard = 0 if highest is None else highest + 1
+        if shard > MAX_SHARD:
+            raise NoShardAvailable(f"All {MAX_SHARD + 1} reference shards are leased.")
+        try:
+            with transaction.atomic():
+                ReferenceShard.objects.create(shard=shard, holder=holder, leased_until=until)
+            return shard
+        except IntegrityError:
+            continue  # Another process created this shard first.
+    raise NoShardAvailable("Could not lease a reference shard.")
+
+
+def _renew_shard(shard: int, holder: str) -> bool:
+    """Extend ``holder``'s lease on ``shard``; False once another process has taken it over."""
+    until = timezone.now() + timedelta(seconds=_lease_seconds())
+    return bool(ReferenceShard.objects.filter(shard=shard, holder=holder).update(leased_until=until))
+
+
+def _encode(value: int) -> str:
+    chars = []
+    for _ in range(BODY_LENGTH):
+        value, index = divmod(value, 32)
+        chars.append(ALPHABET[index])
+    return "".join(reversed(chars))
+
+
+def _decode(body: str) -> int:
+    value = 0
+    for char in body:
+        value = value * 32 + ALPHABET.index(char)
+    return value
+
+
+def check_symbol(value: int) -> str:
+    return CHECK_ALPHABET[value % 37]
+
+
+def _next_slot() -> tuple[int, int, int]:
+    with _lock:
+        pid = os.getpid()
+        if _state["pid"] != pid:
+            # New (or forked) process: never reuse the parent's shard or sequence.
+            _state.update(pid=pid, holder="", second=-1, sequence=0)
+            configured = _configured_shard()
+            if configured is None:
+                _state["renew_at"] = 0.0
+            else:
+                _state.update(shard=configured, renew_at=float("inf"))
+
+        if time.time() >= _state["renew_at"]:
+            if not (_state["holder"] and _renew_shard(_state["shard"], _state["holder"])):
+                holder = f"{socket.gethostname()}:{pid}"
+                _state.update(holder=holder, shard=_claim_shard(holder))
+            _state["renew_at"] = time.time() + _lease_seconds() / 2
+
+        while True:
+            second = max(int(time.time()) - REFERENCE_EPOCH, _state["second"])
+            if second != _state["second"]:
+                _state["second"] = second
+                _state["sequence"] = 0
+                break
+            if _state["sequence"] < MAX_SEQUENCE:
+                _state["sequence"] += 1
+                break
+            # Sequence space for this second is used up; wait for the next one.
+            time.sleep(0.001)
+        return _state["second"], _state["shard"], _state["sequence"]
+
+
+def new_reference() -> str:
+    second, shard, sequence = _next_slot()
+    value = (second << (SHARD_BITS + SEQUENCE_BITS)) | (shard << SEQUENCE_BITS) | sequence
+    return _encode(value) + check_symbol(value)
+
+
+def is_valid(reference: str) -> bool:
+    """Check a (possibly hand-typed) reference against its check symbol."""
+    reference = (reference or "").strip().upper().replace("-", "")
+    reference = reference.replace("O", "0").replace("I", "1").replace("L", "1")
+    if len(reference) != BODY_LENGTH + 1:
+        return False
+    body, check = reference[:-1], reference[-1]
+    if any(char not in ALPHABET for char in body):
+        return False
+    return check_symbol(_decode(body)) == check
@@ -0,0 +1,107 @@
+"""
+Account sign-up.
+
+Uniqueness is enforced by the database (username, normalized email, E.164 phone).
+A single UNION query pre-checks all three so obvious duplicates are turned
+away before the password is hashed. Any race past it surfaces as an
+IntegrityError, which is mapped back to the same field errors.
+"""
+from __future__ import annotations
+
+from typing import Dict
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Value
+
+from ..models import UserProfile
+from . import phones
+
+FIELD_MESSAGES = {
+    "username": "Username already exists.",
+    "email": "Email already registered.",
+    "phone_number": "Phone number already registered.",
+}
+
+
+class RegistrationError(Exception):
+    """Sign-up was rejected; ``errors`` maps form fields to messages."""
+
+    def __init__(self, errors: Dict[str, str]):
+        super().__init__("; ".join(errors.values()))
+        self.errors = errors
+
+
+def normalize_email(email: str) -> str:
+    return (email or "").strip().lower()
+
+
+def sync_email(user) -> None:
+    """
+    Point the profile's ``email_normalized`` at ``user.email``.
+
+    An address another account already holds stays unset on this one, as
+    migration 0014 left duplicates, so the change itself still goes through.
+    """
+    email = normalize_email(user.email) or None
+    profiles = UserProfile.objects.filter(user=user).exclude(email_normalized=email)
+    try:
+        with transaction.atomic():
+            profiles.update(email_normalized=email)
+    except IntegrityError:
+        profiles.update(email_normalized=None)
+
+
+def conflicts(username: str, email: str, phone_number: str, country: str = "") -> Dict[str, str]:
+    """Fields already taken, found with one round-trip of three indexed lookups."""
+    e164 = phones.normalize(phone_number, country)
+    same_phone = {"phone_e164": e164} if e164 else {"phone_number": phone_number}
+    taken = User.objects.filter(username=username).annotate(
+        field=Value("username")
+    ).values_list("field", flat=True)
+    # Every branch hits a unique index, so each returns at most one row.
+    taken = taken.union(
+        UserProfile.objects.filter(email_normalized=normalize_email(email)).annotate(
+            field=Value("email")
+        ).values_list("field", flat=True),
+        UserProfile.objects.filter(**same_phone).annotate(
+            field=Value("phone_number")
+        ).values_list("field", flat=True),
+    )
+    return {field: FIELD_MESSAGES[field] for field in taken}
+
+
+def register(*, username: str, email: str, password: str, phone_number: str, first_name: str = "", last_name: str = "", country: str = "", **profile_fields) -> User:
+    """Create the user and profile; raises RegistrationError on a taken field."""
+    errors = conflicts(username, email, phone_number, country)
+    if errors:
+        raise RegistrationError(errors)
+
+    user = User(
+        username=username,
+        email=User.objects.normalize_email(email),
+        first_name=first_name,
+        last_name=last_name,
+    )
+    # Hash before opening the transaction so no write lock is held meanwhile.
+    user.set_password(password)
+    try:
+        with transaction.atomic():
+            user.save()
+            UserProfile.objects.create(
+                user=user,
+                display_name=f"{first_name} {last_name}".strip() or username,
+                phone_number=phone_number,
+                email_normalized=normalize_email(email),
+                country=country,
+                role=UserProfile.STANDARD,
+                is_active=True,
+                **profile_fields,
+            )
+    except IntegrityError:
+        # A concurrent sign-up won the race; report which field it took.
+        errors = conflicts(username, email, phone_number, country)
+        if not errors:
+            raise
+        raise RegistrationError(errors)
+    return user
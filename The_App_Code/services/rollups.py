@@ -0,0 +1,111 @@
+"""
+Monthly transaction rollups for trend charts.
+
+``TransactionRollup`` holds one row per (user, month, category, kind,
+currency), kept in step with every transaction write the same way as the
+balance ledger (both are ``running_totals.RunningTotals``):
+``Transaction.save`` and the delete signal apply deltas, and
+``record_bulk`` covers ``bulk_create``. A twelve-month chart then reads
+a few dozen rollup rows instead of the user's whole history.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Sequence, Tuple
+
+from django.db.models import DateField, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from ..models import Transaction, TransactionRollup
+from . import fx
+from .running_totals import RunningTotals
+
+CENT = Decimal("0.01")
+DEFAULT_MONTHS = 12
+SPENDING_KINDS = (Transaction.OUTGOING, Transaction.TRANSFER_OUT)
+UNCATEGORIZED = "Uncategorized"
+
+
+def month_of(when) -> date:
+    """First day of the month ``when`` falls in, in the current time zone."""
+    if timezone.is_aware(when):
+        when = timezone.localtime(when)
+    return date(when.year, when.month, 1)
+
+
+_totals = RunningTotals(
+    TransactionRollup,
+    ("user_id", "month", "category", "kind", "currency"),
+    key=lambda tx: (tx.user_id, month_of(tx.occurred_at), tx.category or "", tx.kind, tx.currency),
+    group=lambda qs: qs.annotate(month=TruncMonth("occurred_at", output_field=DateField())).values(
+        "user_id", "month", "category", "kind", "currency",
+    ),
+)
+
+apply_deltas = _totals.apply_deltas
+record_save = _totals.record_save
+record_delete = _totals.record_delete
+record_bulk = _totals.record_bulk
+rebuild = _totals.rebuild
+verify = _totals.verify
+
+
+def _months(count: int, until: date) -> List[date]:
+    months = []
+    year, month = until.year, until.month
+    for _ in range(count):
+        months.append(date(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return months[::-1]
+
+
+def series(
+    user,
+    *,
+    months: int = DEFAULT_MONTHS,
+    kinds: Sequence[str] = SPENDING_KINDS,
+    currency: str | None = None,
+    until: date | None = None,
+) -> Dict[str, object]:
+    """
+    Per-category monthly totals for the last ``months`` months, ready to chart.
+
+    Returns ``{"labels": ["2026-01", ...], "currency": ..., "series":
+    [{"name": category, "data": [...]}, ...]}`` with one value per label.
+    Amounts are converted to ``currency`` (default: the user's preferred
+    one); currencies without a rate are left out.
+    """
+    buckets = _months(months, until or month_of(timezone.now()))
+    rows = (
+        TransactionRollup.objects.filter(
+            user=user, month__gte=buckets[0], month__lte=buckets[-1], kind__in=kinds,
+            entry_count__gt=0,  # emptied by deletes
+        )
+        .values_list("month", "category", "currency")
+        .annotate(amount=Sum("total"))
+    )
+
+    amounts: Dict[Tuple[str, date], Dict[str, Decimal]] = defaultdict(dict)
+    for month, category, row_currency, amount in rows:
+        per_currency = amounts[(category or UNCATEGORIZED, month)]
+        amount = Decimal(str(amount or 0)).quantize(CENT)
+        per_currency[row_currency] = per_currency.get(row_currency, Decimal("0")) + amount
+
+    currency = fx.reportable(currency or fx.preferred_currency(user))
+    values: Dict[str, Dict[date, Decimal]] = defaultdict(dict)
+    for (category, month), per_currency in amounts.items():
+        values[category][month], _ = fx.sum_converted(per_currency, currency)
+
+    # Biggest categories first, so a chart's legend reads top-down.
+    ordered = sorted(values.items(), key=lambda item: (-sum(item[1].values()), item[0]))
+    return {
+        "labels": [f"{month:%Y-%m}" for month in buckets],
+        "currency": currency,
+        "series": [
+            {"name": category, "data": [float(by_month.get(month, 0)) for month in buckets]}
+            for category, by_month in ordered
+        ],
+    }
@@ -0,0 +1,133 @@
+"""
+Tables of running (total, entry_count) rows derived from transactions.
+
+The balance ledger and the monthly rollups are both one: a row per key,
+moved by deltas on every transaction write, and rebuilt or verified from
+the raw transactions on demand. ``RunningTotals`` holds that shared logic;
+each module only says what its key is.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, QuerySet, Sum
+
+from ..models import Transaction
+
+CENT = Decimal("0.01")
+EMPTY = (Decimal("0"), 0)
+
+Key = Tuple
+Deltas = Dict[Key, Tuple[Decimal, int]]
+
+
+class RunningTotals:
+    """
+    ``model`` rows keyed on ``fields``, each holding ``total`` and ``entry_count``.
+
+    ``key`` maps a transaction to its row key (in ``fields`` order) and
+    ``group`` turns a transaction queryset into ``.values(*fields)``, for
+    recomputing rows in SQL.
+    """
+
+    def __init__(self, model, fields: Sequence[str], key: Callable[[Transaction], Key], group: Callable[[QuerySet], QuerySet]):
+        self.model = model
+        self.fields = tuple(fields)
+        self.key = key
+        self.group = group
+
+    def apply_deltas(self, deltas: Deltas, *, create: bool = True) -> None:
+        """
+        Add (amount, count) deltas to the matching rows, creating them as
+        needed. With ``create=False`` only rows that still exist are touched.
+        """
+        for key, (amount, count) in sorted(deltas.items()):
+            if not amount and not count:
+                continue
+            lookup = dict(zip(self.fields, key))
+            rows = self.model.objects.filter(**lookup)
+            if create:
+                row, _ = self.model.objects.get_or_create(**lookup)
+                rows = self.model.objects.filter(pk=row.pk)
+            rows.update(
+                total=F("total") + amount,
+                entry_count=F("entry_count") + count,
+            )
+
+    def _deltas(self, signed: Iterable[Tuple[Transaction, int]]) -> Deltas:
+        deltas: Deltas = defaultdict(lambda: EMPTY)
+        for tx, sign in signed:
+            key = self.key(tx)
+            total, count = deltas[key]
+            deltas[key] = (total + sign * Decimal(tx.amount or 0), count + sign)
+        return deltas
+
+    def record_save(self, previous: Transaction | None, tx: Transaction) -> None:
+        """``previous`` is the stored row from ``ledger.snapshot``, or None for an insert."""
+        signed = [(tx, 1)] if previous is None else [(previous, -1), (tx, 1)]
+        self.apply_deltas(self._deltas(signed))
+
+    def record_delete(self, tx: Transaction) -> None:
+        # Never recreate a row here: when a user is deleted the cascade may
+        # already have removed their rows before their transactions.
+        self.apply_deltas(self._deltas([(tx, -1)]), create=False)
+
+    def record_bulk(self, transactions: Iterable[Transaction]) -> None:
+        """Account for rows written with ``bulk_create``, which skips ``save()``."""
+        self.apply_deltas(self._deltas((tx, 1) for tx in transactions))
+
+    def _stored(self, user_ids=None) -> QuerySet:
+        rows = self.model.objects.all()
+        if user_ids:
+            rows = rows.filter(user_id__in=user_ids)
+        return rows
+
+    def aggregate(self, user_ids=None) -> Iterator[Dict[str, object]]:
+        """Yield every row's correct values, computed from the raw transactions."""
+        qs = Transaction.objects.all()
+        if user_ids:
+            qs = qs.filter(user_id__in=user_ids)
+        rows = self.group(qs.order_by()).annotate(total=Sum("amount"), entry_count=Count("id"))
+        for row in rows.iterator(chunk_size=2000):
+            # SQLite sums decimals as floats; round back to cents.
+            row["total"] = Decimal(row["total"] or 0).quantize(CENT)
+            yield row
+
+    def rebuild(self, user_ids=None, batch_size: int = 500) -> int:
+        """Recompute the rows from the raw transactions. Returns rows written."""
+        written = 0
+        with transaction.atomic():
+            self._stored(user_ids).delete()
+            batch = []
+            for row in self.aggregate(user_ids):
+                batch.append(self.model(**row))
+                if len(batch) >= batch_size:
+                    self.model.objects.bulk_create(batch)
+                    written += len(batch)
+                    batch = []
+            self.model.objects.bulk_create(batch)
+            written += len(batch)
+        return written
+
+    def verify(self, user_ids=None) -> List[Dict[str, object]]:
+        """
+        Compare the rows against the raw transactions and list every mismatch,
+        each as its key fields plus ``expected`` and ``actual`` (total, count).
+        """
+        expected = {
+            tuple(row[field] for field in self.fields): (row["total"], row["entry_count"])
+            for row in self.aggregate(user_ids)
+        }
+        actual = {
+            tuple(values[:-2]): tuple(values[-2:])
+            for values in self._stored(user_ids).values_list(*self.fields, "total", "entry_count")
+        }
+        mismatches = []
+        for key in sorted(set(expected) | set(actual)):
+            want, have = expected.get(key, EMPTY), actual.get(key, EMPTY)
+            if want != have:
+                mismatches.append(dict(zip(self.fields, key), expected=want, actual=have))
+        return mismatches
@@ -0,0 +1,138 @@
+"""
+Sampled, in-process span timings for views and services.
+
+Finished spans go into a bounded ring buffer; nothing is written to
+stdout on the request path. ``TRACE_SAMPLE_RATE`` (0.0-1.0) picks which
+root spans are recorded, and nested spans follow their root's decision.
+"""
+from __future__ import annotations
+
+import contextvars
+import functools
+import inspect
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+
+from django.conf import settings
+from django.db import connection
+
+_current = contextvars.ContextVar("trace_span", default=None)
+_lock = threading.Lock()
+_buffer: deque = deque(maxlen=getattr(settings, "TRACE_BUFFER_SIZE", 1000))
+
+
+def sample_rate() -> float:
+    return float(getattr(settings, "TRACE_SAMPLE_RATE", 0.1))
+
+
+class span:
+    """Time a block and count the SQL queries it runs on the default connection.
+
+    With ``count_queries=False`` the span records ``queries`` as ``None``:
+    async ORM calls run on an executor thread's connection, which a span
+    opened on the event loop cannot see.
+    """
+
+    def __init__(self, name: str, count_queries: bool = True):
+        self.name = name
+        self.count_queries = count_queries
+        self.sampled = False
+        self.queries = 0
+
+    def _count_query(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self.parent = _current.get()
+        if self.parent is not None:
+            self.sampled = self.parent.sampled
+        else:
+            self.sampled = random.random() < sample_rate()
+        self._token = _current.set(self)
+        if self.sampled:
+            if self.count_queries:
+                self._wrapper = connection.execute_wrapper(self._count_query)
+                self._wrapper.__enter__()
+            self.started_at = time.time()
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        if not self.sampled:
+            return False
+        duration = time.perf_counter() - self._start
+        if self.count_queries:
+            self._wrapper.__exit__(exc_type, exc, tb)
+        with _lock:
+            _buffer.append({
+                "name": self.name,
+                "parent": self.parent.name if self.parent else None,
+                "started_at": self.started_at,
+                "duration_ms": round(duration * 1000, 3),
+                "queries": self.queries if self.count_queries else None,
+                "error": exc_type.__name__ if exc_type else None,
+            })
+        return False
+
+
+def traced(name: str | None = None):
+    """Decorator form of :class:`span`; defaults to the function's dotted name."""
+
+    def decorator(func):
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(label, count_queries=False):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def recent(limit: int | None = None) -> List[Dict[str, object]]:
+    with _lock:
+        spans = list(_buffer)
+    return spans[-limit:] if limit else spans
+
+
+def summary() -> List[Dict[str, object]]:
+    """Per-span-name count, latency percentiles and average query count."""
+    grouped: Dict[str, List[Dict[str, object]]] = {}
+    for item in recent():
+        grouped.setdefault(item["name"], []).append(item)
+
+    results = []
+    for name, items in sorted(grouped.items()):
+        durations = sorted(item["duration_ms"] for item in items)
+        results.append({
+            "name": name,
+            "count": len(items),
+            "p50_ms": durations[len(durations) // 2],
+            "p95_ms": durations[min(len(durations) - 1, int(len(durations) * 0.95))],
+            "max_ms": durations[-1],
+            "avg_queries": _average([item["queries"] for item in items if item["queries"] is not None]),
+            "errors": sum(1 for item in items if item["error"]),
+        })
+    return results
+
+
+def _average(values: List[int]) -> float | None:
+    return round(sum(values) / len(values), 2) if values else None
+
+
+def clear() -> None:
+    with _lock:
+        _buffer.clear()
@@ -0,0 +1,146 @@
+"""
+Transfer state machine and event log.
+
+``MoneyTransfer.TRANSITIONS`` lists the allowed status moves. ``move``
+applies one to a batch of locked transfers with a single ``update()``.
+When a transfer fails or is cancelled after money was posted for it, the
+same transaction posts a mirror entry for each of its transactions: the
+sender is credited back and the recipient debited. Either way a
+``TransferEvent`` is appended for every transfer.
+
+``MoneyTransfer.save`` checks the same table and refuses to fail or
+cancel a transfer itself, since only ``move`` posts the compensating
+entries. Creations and the changes save() does allow are logged by the
+post_save signal (``record_save``).
+
+``events_since`` is the read side: a primary-key range over the log, for
+reconciliation jobs and for the admin live feed (``services.live``).
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Sequence
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import MoneyTransfer, Transaction, TransferEvent
+from . import dashboard, ledger, rollups
+from .transfers import TransferError
+
+MAX_EVENTS = 1000
+REVERSING = (MoneyTransfer.FAILED, MoneyTransfer.CANCELLED)
+MIRROR_KIND = {
+    Transaction.TRANSFER_OUT: Transaction.TRANSFER_IN,
+    Transaction.TRANSFER_IN: Transaction.TRANSFER_OUT,
+    Transaction.OUTGOING: Transaction.INCOMING,
+    Transaction.INCOMING: Transaction.OUTGOING,
+}
+
+
+class InvalidTransition(TransferError):
+    """A transfer may not move to the requested status."""
+
+
+def record_save(transfer: MoneyTransfer, previous_status: str | None) -> None:
+    """Log a creation (``previous_status`` None) or a status change made by ``save()``."""
+    if previous_status == transfer.status:
+        return
+    TransferEvent.for_transfer(transfer, previous_status or "").save()
+
+
+def _compensating_entries(transfers: Sequence[MoneyTransfer]) -> List[Transaction]:
+    references = {transfer.pk: transfer.reference_number for transfer in transfers}
+    posted = Transaction.objects.filter(related_transfer_id__in=list(references)).order_by("pk")
+    now = timezone.now()
+    return [
+        Transaction(
+            user_id=tx.user_id,
+            description=f"Reversal of transfer {references[tx.related_transfer_id]}",
+            amount=tx.amount,
+            currency=tx.currency,
+            kind=MIRROR_KIND[tx.kind],
+            category=tx.category,
+            occurred_at=now,
+            related_transfer_id=tx.related_transfer_id,
+        )
+        for tx in posted
+    ]
+
+
+def _invalidate_dashboards(user_ids) -> None:
+    for user_id in user_ids:
+        dashboard.invalidate(user_id)
+
+
+def move(transfers: Sequence[MoneyTransfer], status: str, *, actor=None, reason: str = "") -> List[TransferEvent]:
+    """
+    Move ``transfers`` to ``status``. The caller must have locked them
+    (``select_for_update``) in the current transaction.
+
+    Raises ``InvalidTransition``, changing nothing, if any of them may not
+    make the move.
+    """
+    blocked = [transfer.reference_number for transfer in transfers if not transfer.can_transition_to(status)]
+    if blocked:
+        raise InvalidTransition(f"Cannot mark as {status}: {', '.join(blocked)}.")
+    if not transfers:
+        return []
+
+    with transaction.atomic():
+        pks = [transfer.pk for transfer in transfers]
+        MoneyTransfer.objects.filter(pk__in=pks).update(status=status, updated_at=timezone.now())
+
+        compensated = set()
+        if status in REVERSING:
+            entries = _compensating_entries(transfers)
+            Transaction.objects.bulk_create(entries)
+            # bulk_create skips save() and signals, so account for the rows here.
+            ledger.record_bulk(entries)
+            rollups.record_bulk(entries)
+            compensated = {entry.related_transfer_id for entry in entries}
+
+        changes = []
+        for transfer in transfers:
+            changes.append((transfer, transfer.status))
+            transfer.status = transfer._published_status = transfer._loaded_status = status
+        actor_id = actor.pk if getattr(actor, "pk", None) else None
+        events = TransferEvent.objects.bulk_create([
+            TransferEvent.for_transfer(
+                transfer, previous, actor_id=actor_id, reason=(reason or "")[:255], compensated=transfer.pk in compensated
+            )
+            for transfer, previous in changes
+        ])
+
+        user_ids = {transfer.sender_id for transfer in transfers} | {transfer.recipient_id for transfer in transfers}
+        transaction.on_commit(lambda: _invalidate_dashboards(user_ids))
+    return events
+
+
+def events_since(last_id: int = 0, limit: int = MAX_EVENTS) -> List[TransferEvent]:
+    """Up to ``limit`` events after ``last_id``, oldest first."""
+    limit = max(1, min(limit, MAX_EVENTS))
+    return list(TransferEvent.objects.filter(id__gt=last_id).order_by("id")[:limit])
+
+
+def history(transfer: MoneyTransfer) -> List[TransferEvent]:
+    return list(TransferEvent.objects.filter(transfer=transfer).order_by("id"))
+
+
+def serialize(event: TransferEvent) -> Dict[str, object]:
+    return {
+        "id": event.id,
+        "transfer_id": event.transfer_id,
+        "reference": event.reference_number,
+        "kind": event.kind,
+        "from_status": event.from_status,
+        "to_status": event.to_status,
+        "sender_id": event.sender_id,
+        "recipient_id": event.recipient_id,
+        "amount": str(event.amount),
+        "service_fee": str(event.service_fee),
+        "currency": event.currency,
+        "compensated": event.compensated,
+        "actor_id": event.actor_id,
+        "reason": event.reason,
+        "created_at": event.created_at.isoformat(),
+    }
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from decimal import Decimal, InvalidOperation
+from typing import Tuple
+
+from django.db import IntegrityError, transaction
+
+from ..models import BalanceLedger, MoneyTransfer, Transaction, UserProfile
+from . import fees, phones
+from .references import new_reference
+from .tracing import traced
+
+CENT = Decimal("0.01")
+POST_ATTEMPTS = 3
+
+
+class TransferError(Exception):
+    """A transfer was rejected; the message is safe to show to the user."""
+
+
+def parse_amount(value) -> Decimal:
+    if not value:
+        raise TransferError("Please enter an amount to transfer.")
+    try:
+        amount = Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        raise TransferError("Please enter a valid amount.")
+    if not amount.is_finite() or amount <= 0:
+        raise TransferError("Amount must be greater than 0.")
+    return amount.quantize(CENT)
+
+
+def find_existing(sender, idempotency_key: str | None) -> MoneyTransfer | None:
+    if not idempotency_key:
+        return None
+    return MoneyTransfer.objects.filter(
+        sender=sender, idempotency_key=idempotency_key
+    ).first()
+
+
+def resolve_recipient(phone: str, sender=None):
+    """
+    Find the user who owns ``phone``, however it was typed.
+
+    The number is normalized to E.164 (national numbers are read against the
+    sender's country) and probed on the unique ``phone_e164`` index, one
+    query per lookup. A number that does not normalize falls back to an
+    exact match on the stored string.
+    """
+    e164 = phones.normalize(phone)
+    if e164 is None and sender is not None:
+        e164 = phones.normalize(phone, phones.country_of(sender))
+    if e164 is None:
+        profile = UserProfile.objects.select_related("user").filter(phone_number=(phone or "").strip()).first()
+        return profile.user if profile else None
+
+    profile = UserProfile.objects.select_related("user").filter(phone_e164=e164).first()
+    return profile.user if profile else None
+
+
+def _lock_balances(sender, recipient, currency: str) -> None:
+    """Take row locks on both parties' ledger rows in a stable order."""
+    keys = [
+        (sender.pk, Transaction.TRANSFER_OUT),
+        (recipient.pk, Transaction.TRANSFER_IN),
+    ]
+    pks = []
+    for user_id, kind in keys:
+        row, _ = BalanceLedger.objects.get_or_create(
+            user_id=user_id, currency=currency, kind=kind
+        )
+        pks.append(row.pk)
+    list(BalanceLedger.objects.select_for_update().filter(pk__in=pks).order_by("pk"))
+
+
+def quote(sender, recipient, amount: Decimal, currency: str) -> fees.Quote:
+    """Price a transfer between two users from the fee schedule."""
+    return fees.quote(amount, currency, phones.country_of(sender), phones.country_of(recipient))
+
+
+def _post(sender, recipient, amount, currency, description, idempotency_key, service_fee) -> MoneyTransfer:
+    total_amount = amount + service_fee
+    # Drawn first: a new reference shard lease must commit on its own.
+    reference = new_reference()
+
+    with transaction.atomic():
+        _lock_balances(sender, recipient, currency)
+
+        transfer = MoneyTransfer.objects.create(
+            sender=sender,
+            recipient=recipient,
+            amount=amount,
+            currency=currency,
+            service_fee=service_fee,
+            total_amount=total_amount,
+            description=description,
+            reference_number=reference,
+            idempotency_key=idempotency_key or None,
+            status=MoneyTransfer.COMPLETED,  # Auto-approve for demo
+        )
+
+        Transaction.objects.create(
+            user=sender,
+            description=f"Transfer to {recipient.username}: {description}",
+            amount=total_amount,  # Include fee in sender's deduction
+            currency=currency,
+            kind=Transaction.TRANSFER_OUT,
+            category="Transfer",
+            related_transfer=transfer,
+        )
+        Transaction.objects.create(
+            user=recipient,
+            description=f"Transfer from {sender.username}: {description}",
+            amount=amount,  # Recipient gets amount without fee
+            currency=currency,
+            kind=Transaction.TRANSFER_IN,
+            category="Transfer",
+            related_transfer=transfer,
+        )
+    return transfer
+
+
+@traced()
+def send_money(
+    sender,
+    recipient_phone: str,
+    amount,
+    *,
+    currency: str = "USD",
+    description: str = "",
+    idempotency_key: str | None = None,
+) -> Tuple[MoneyTransfer, bool]:
+    """
+    Post a transfer and both ledger legs in one transaction.
+
+    Returns ``(transfer, created)``; ``created`` is False when the
+    idempotency key matched a transfer this sender already made.
+    """
+    existing = find_existing(sender, idempotency_key)
+    if existing is not None:
+        return existing, False
+
+    amount = parse_amount(amount)
+    currency = (currency or "USD").upper()
+
+    recipient = resolve_recipient(recipient_phone, sender)
+    if recipient is None:
+        raise TransferError("Recipient not found with that phone number.")
+
+    if recipient.pk == sender.pk:
+        raise TransferError("You cannot send money to yourself.")
+
+    service_fee = quote(sender, recipient, amount, currency).fee
+
+    for attempt in range(POST_ATTEMPTS):
+        try:
+            return _post(sender, recipient, amount, currency, description, idempotency_key, service_fee), True
+        except IntegrityError:
+            # A concurrent request with the same key won the race.
+            existing = find_existing(sender, idempotency_key)
+            if existing is not None:
+                return existing, False
+            # Otherwise two processes shared a reference shard; draw a new one.
+            if attempt == POST_ATTEMPTS - 1:
+                raise
@@ -6,13 +6,27 @@ from django.db.models import Count
 from ..models import UserProfile
 
 
+def _breakdown_qs():
+    return UserProfile.objects.values("membership_level").annotate(total=Count("id"))
+
+
 def category_breakdown():
-    data = UserProfile.objects.values("membership_level").annotate(total=Count("id"))
     return {
         row["membership_level"] or "Uncategorised": row["total"]
-        for row in data
+        for row in _breakdown_qs()
     }
 
 
 def total_users():
     return get_user_model().objects.count()
+
+
+async def acategory_breakdown():
+    return {
+        row["membership_level"] or "Uncategorised": row["total"]
+        async for row in _breakdown_qs()
+    }
+
+
+async def atotal_users():
+    return await get_user_model().objects.acount()
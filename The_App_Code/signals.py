@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import Donation, FeeRule, MoneyTransfer, Promotion, SavingGoal, Transaction
+from .services import dashboard, donation_stats, fees, ledger, notifications, registration, rollups, transfer_states
+
+
+@receiver(post_delete, sender=Transaction)
+def transaction_deleted(sender, instance, **kwargs):
+    # Deletes run through the collector's atomic block, so this commits
+    # together with the removed row for both Model.delete and QuerySet.delete.
+    ledger.record_delete(instance)
+    rollups.record_delete(instance)
+
+
+@receiver(post_delete, sender=Donation)
+def donation_deleted(sender, instance, **kwargs):
+    donation_stats.record_delete(instance)
+
+
+@receiver(post_save, sender=get_user_model())
+def user_created(sender, instance, created, raw=False, **kwargs):
+    # Global notifications sent before the account existed are not for it.
+    if created and not raw:
+        notifications.start_watermark(instance)
+
+
+@receiver(post_save, sender=get_user_model())
+def user_email_changed(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # A new account's profile is created after the user and takes the address itself.
+    if created or raw or (update_fields is not None and "email" not in update_fields):
+        return
+    registration.sync_email(instance)
+
+
+def _invalidate_dashboards(*user_ids):
+    user_ids = {user_id for user_id in user_ids if user_id}
+
+    def invalidate():
+        for user_id in user_ids:
+            dashboard.invalidate(user_id)
+
+    # Wait for commit so a concurrent reader cannot re-cache the old rows.
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_save, sender=SavingGoal)
+@receiver(post_delete, sender=SavingGoal)
+def user_rows_changed(sender, instance, **kwargs):
+    _invalidate_dashboards(instance.user_id)
+
+
+@receiver(post_save, sender=MoneyTransfer)
+@receiver(post_delete, sender=MoneyTransfer)
+def transfer_changed(sender, instance, **kwargs):
+    _invalidate_dashboards(instance.sender_id, instance.recipient_id)
+
+
+@receiver(post_init, sender=MoneyTransfer)
+def transfer_loaded(sender, instance, **kwargs):
+    # Remember the status as loaded so a save can tell it changed.
+    instance._published_status = instance.status if instance.pk else None
+
+
+@receiver(post_save, sender=MoneyTransfer)
+def transfer_published(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = None if created else instance._published_status
+    instance._published_status = instance.status
+    # Logged in the saving transaction, so the event commits or rolls back
+    # with the row; the admin live feed reads it from there.
+    transfer_states.record_save(instance, previous)
+
+
+@receiver(post_save, sender=Donation)
+@receiver(post_delete, sender=Donation)
+def donation_changed(sender, instance, **kwargs):
+    # Dashboards also count pledges made under the user's email address.
+    email_owners = get_user_model().objects.filter(email=instance.email).values_list("pk", flat=True)
+    _invalidate_dashboards(instance.donor_id, *email_owners)
+
+
+@receiver(post_save, sender=FeeRule)
+@receiver(post_delete, sender=FeeRule)
+@receiver(post_save, sender=Promotion)
+@receiver(post_delete, sender=Promotion)
+def fee_schedule_changed(sender, instance, **kwargs):
+    # Promotions switch their fee rules on and off, so they recompile it too.
+    transaction.on_commit(fees.invalidate)
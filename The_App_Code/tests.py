@@ -1,3 +1,1332 @@
-from django.test import TestCase
+import asyncio
+import csv
+import importlib
+import io
+import json
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Q
+from django.core import mail as outbox
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .models import (
+    AdminAuditLog, AdminNotification, BalanceLedger, BudgetEntry, Donation, DonationStats, DonorEmail, ExchangeRate, FeeRule, Job, MoneyTransfer,
+    NotificationDelivery, NotificationWatermark, OutboxEmail, Promotion, ReferenceShard, SavingGoal, Transaction, TransactionRollup, TransferEvent, UserProfile,
+    first_day_of_current_month,
+)
+from .services import (
+    admin_metrics, bulk_admin, dashboard, donate, donation_stats, fees, fx, imports, jobs, ledger, mail, notifications,
+    phones, promotions, live, ratelimit, recipients, references, registration, rollups, tracing, transfer_states, users,
+)
+from .services import transfers as transfer_service
+
+
+def make_user(username, phone_number):
+    user = User.objects.create_user(username, f"{username}@example.com", "pass-12345")
+    UserProfile.objects.create(user=user, phone_number=phone_number)
+    return user
+
+
+class TransferServiceTests(TestCase):
+    def setUp(self):
+        self.sender = make_user("sender", "+254700000001")
+        self.recipient = make_user("recipient", "+254700000002")
+
+    def test_posts_transfer_and_both_legs(self):
+        transfer, created = transfer_service.send_money(
+            self.sender, "+254700000002", "100", currency="kes"
+        )
+
+        self.assertTrue(created)
+        self.assertEqual(transfer.service_fee, Decimal("2.00"))
+        self.assertEqual(transfer.currency, "KES")
+        legs = Transaction.objects.filter(related_transfer=transfer)
+        self.assertEqual(
+            sorted(legs.values_list("kind", "amount")),
+            [(Transaction.TRANSFER_IN, Decimal("100.00")), (Transaction.TRANSFER_OUT, Decimal("102.00"))],
+        )
+        self.assertEqual(ledger.verify(), [])
+
+    def test_deleting_a_user_with_history_cascades_cleanly(self):
+        for amount in ("1", "2", "3"):
+            Transaction.objects.create(user=self.sender, description="Lunch", amount=Decimal(amount))
+
+        self.sender.delete()
+
+        self.assertFalse(BalanceLedger.objects.filter(user_id=self.sender.pk).exists())
+        self.assertFalse(TransactionRollup.objects.filter(user_id=self.sender.pk).exists())
+        self.assertEqual(ledger.verify(), [])
+        self.assertEqual(rollups.verify(), [])
+
+    def test_rebuild_ledger_reports_and_repairs_drift(self):
+        Transaction.objects.create(user=self.sender, description="Lunch", amount=Decimal("7"))
+        BalanceLedger.objects.filter(user=self.sender, kind=Transaction.OUTGOING).update(total=Decimal("999"))
+
+        out = io.StringIO()
+        with self.assertRaisesMessage(CommandError, "1 ledger row(s) out of sync."):
+            call_command("rebuild_ledger", "--verify", stdout=out)
+        self.assertIn(f"user={self.sender.pk} currency=", out.getvalue())
+        self.assertIn("expected=(Decimal('7.00'), 1) actual=(Decimal('999.00'), 1)", out.getvalue())
+
+        call_command("rebuild_ledger", "--user", str(self.sender.pk), stdout=io.StringIO())
+        self.assertEqual(ledger.verify(), [])
+        call_command("rebuild_ledger", "--verify", stdout=io.StringIO())
+
+    def test_repeated_idempotency_key_returns_first_transfer(self):
+        first, _ = transfer_service.send_money(
+            self.sender, "+254700000002", "10", idempotency_key="abc"
+        )
+        again, created = transfer_service.send_money(
+            self.sender, "+254700000002", "10", idempotency_key="abc"
+        )
+
+        self.assertFalse(created)
+        self.assertEqual(again.pk, first.pk)
+        self.assertEqual(MoneyTransfer.objects.count(), 1)
+        self.assertEqual(Transaction.objects.count(), 2)
+
+    def test_rejects_unknown_recipient(self):
+        with self.assertRaises(transfer_service.TransferError):
+            transfer_service.send_money(self.sender, "+10000000000", "10")
+        self.assertFalse(MoneyTransfer.objects.exists())
+
+
+class StatementImportTests(TestCase):
+    CSV = (
+        "Date,Description,Amount,Currency,Category\n"
+        "2024-01-05 12:00,Grocer,-150.00,USD,Food\n"
+        "2024-01-06,Salary,2000,USD,Work\n"
+        "not-a-date,Broken,abc,USD,\n"
+    )
+
+    def test_import_is_validated_deduplicated_and_ledgered(self):
+        user = make_user("importer", "+254700000003")
+
+        report = imports.import_file(user, io.BytesIO(self.CSV.encode()))
+        again = imports.import_file(user, io.BytesIO(self.CSV.encode()))
+
+        self.assertEqual((report.created, report.duplicates, report.error_count), (2, 0, 1))
+        self.assertEqual((again.created, again.duplicates), (0, 2))
+        self.assertEqual(
+            sorted(Transaction.objects.filter(user=user).values_list("kind", "amount")),
+            [(Transaction.INCOMING, Decimal("2000.00")), (Transaction.OUTGOING, Decimal("150.00"))],
+        )
+        self.assertEqual(ledger.verify(), [])
+
+    def test_unreadable_file_is_reported_and_earlier_rows_kept(self):
+        user = make_user("garbled", "+254700000004")
+        oversized = "x" * (csv.field_size_limit() + 1)
+        body = self.CSV.encode() + f'2024-01-07,"{oversized}",-5,USD,\n'.encode()
+
+        report = imports.import_file(user, io.BytesIO(body))
+        self.assertEqual((report.created, report.error_count), (2, 2))
+        self.assertIn("could not be read", report.errors[-1][1])
+
+        strict = io.TextIOWrapper(io.BytesIO(b"date,amount\n\xff\xfe,1\n"), encoding="utf-8")
+        report = imports.import_file(user, strict)
+        self.assertEqual(report.created, 0)
+        self.assertIn("could not be read", report.errors[-1][1])
+
+    def test_identical_lines_without_an_id_are_separate_transactions(self):
+        user = make_user("coffee", "+254700000006")
+        body = self.CSV + "2024-01-06,Coffee,-3.50,USD,Food\n" * 2
+
+        report = imports.import_file(user, io.BytesIO(body.encode()))
+        again = imports.import_file(user, io.BytesIO(body.encode()))
+
+        self.assertEqual((report.created, report.duplicates), (4, 0))
+        self.assertEqual((again.created, again.duplicates), (0, 4))
+        self.assertEqual(Transaction.objects.filter(user=user, description="Coffee").count(), 2)
+
+    def test_rows_claimed_by_a_concurrent_import_are_reported(self):
+        user = make_user("racer", "+254700000005")
+        bulk_create = Transaction.objects.bulk_create
+
+        def rival_inserts_first(rows, *args, **kwargs):
+            # The other import writes the first line after this batch's duplicate probe.
+            first = rows[0]
+            Transaction.objects.create(
+                user=user, description=first.description, amount=first.amount, currency=first.currency,
+                kind=first.kind, occurred_at=first.occurred_at, import_hash=first.import_hash,
+            )
+            return bulk_create(rows, *args, **kwargs)
+
+        with mock.patch.object(Transaction.objects, "bulk_create", side_effect=rival_inserts_first):
+            report = imports.import_file(user, io.BytesIO(self.CSV.encode()))
+
+        self.assertEqual((report.created, report.error_count), (0, 3))
+        self.assertIn("import the file again", report.errors[-1][1])
+        self.assertEqual(ledger.verify(), [])
+
+
+class StatementExportTests(TestCase):
+    def setUp(self):
+        self.user = make_user("exporter", "+254700000004")
+        make_user("payee", "+254700000005")
+        self.client.force_login(self.user)
+
+    def test_streams_filtered_transactions_as_csv(self):
+        Transaction.objects.create(user=self.user, description="Rent", amount="500", kind=Transaction.OUTGOING)
+        Transaction.objects.create(user=self.user, description="Pay", amount="900", kind=Transaction.INCOMING)
+
+        response = self.client.get("/transactions/export/", {"kind": Transaction.OUTGOING})
+
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["occurred_at", "description", "amount"])
+        self.assertEqual([line.split(",")[1] for line in lines[1:]], ["Rent"])
+
+    def test_streams_both_sides_of_transfers_as_ndjson(self):
+        transfer_service.send_money(self.user, "+254700000005", "20")
+        payee = User.objects.get(username="payee")
+        transfer_service.send_money(payee, "+254700000004", "5")
+
+        response = self.client.get("/transactions/export/", {"source": "transfers", "format": "ndjson"})
+
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual([row["direction"] for row in rows], ["received", "sent"])
+        self.assertEqual(rows[1]["total_amount"], "20.40")
+
+    def test_other_users_require_admin(self):
+        response = self.client.get("/transactions/export/", {"user": self.user.pk})
+        self.assertEqual(response.status_code, 403)
+
+    def test_user_must_be_a_numeric_id(self):
+        self.user.profile.role = UserProfile.ADMIN
+        self.user.profile.save()
+        for bad in ("abc", "1.5", "-2", "١"):
+            with self.subTest(bad):
+                self.assertEqual(self.client.get("/transactions/export/", {"user": bad}).status_code, 400)
+        self.assertEqual(self.client.get("/transactions/export/", {"user": "999999"}).status_code, 404)
+
+
+class NotificationTests(TransactionTestCase):
+    def setUp(self):
+        self.admin = make_user("admin", "+254700000006")
+        self.reader = make_user("reader", "+254700000007")
+
+    def test_global_notifications_are_read_time_only(self):
+        notifications.send(self.admin, "Maintenance", "Down at 2am", is_global=True)
+        late = make_user("late", "+254700000008")
+
+        self.assertFalse(NotificationDelivery.objects.exists())
+        self.assertEqual(notifications.unread_count(self.reader), 1)
+        self.assertEqual(notifications.unread_count(late), 0)
+
+        notifications.mark_seen(self.reader)
+        self.assertEqual(notifications.unread_count(self.reader), 0)
+        self.assertEqual([row["unread"] for row in notifications.recent(self.reader)], [False])
+
+    def test_targeted_notifications_are_delivered_by_a_job(self):
+        notifications.send(self.admin, "Hello", "Just you", recipient_ids=[self.reader.pk])
+        self.assertEqual(notifications.unread_count(self.reader), 0)
+        jobs.run_pending()
+
+        self.assertEqual(notifications.unread_count(self.reader), 1)
+        self.assertEqual(notifications.unread_count(self.admin), 0)
+        AdminNotification.objects.update(is_active=False)
+        self.assertEqual(notifications.unread_count(self.reader), 0)
+
+    def test_marking_seen_stops_before_an_undelivered_notification(self):
+        targeted = notifications.send(self.admin, "Hello", "Just you", recipient_ids=[self.reader.pk])
+        notifications.send(self.admin, "Maintenance", "Down at 2am", is_global=True)
+
+        notifications.mark_seen(self.reader)
+        self.assertEqual(notifications.last_seen(self.reader), targeted.pk - 1)
+        self.assertEqual(notifications.unread_count(self.reader), 1)
+
+        jobs.run_pending()
+        self.assertEqual(notifications.unread_count(self.reader), 2)
+        notifications.mark_seen(self.reader)
+        self.assertEqual(notifications.unread_count(self.reader), 0)
+
+    def test_migration_counts_earlier_notifications_as_seen(self):
+        sent = notifications.send(self.admin, "Old news", "Sent before read-time delivery", is_global=True)
+        NotificationWatermark.objects.all().delete()  # as before migration 0011
+        self.assertEqual(notifications.unread_count(self.reader), 1)
+
+        migration = importlib.import_module("The_App_Code.migrations.0011_notification_read_time")
+        migration.backfill_watermarks(apps, None)
+
+        self.assertEqual(notifications.unread_count(self.reader), 0)
+        self.assertEqual(NotificationWatermark.objects.get(user=self.reader).last_seen_id, sent.pk)
+
+
+job_calls = []
+job_calls_lock = threading.Lock()
+
+
+@jobs.handler("tests.record")
+def record_job(value, fail_first=False):
+    with job_calls_lock:
+        job_calls.append(value)
+        if fail_first and job_calls.count(value) == 1:
+            raise RuntimeError("transient failure")
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        job_calls.clear()
+
+    def test_failed_job_is_retried_with_backoff(self):
+        job = jobs.enqueue("tests.record", {"value": 1, "fail_first": True})
+
+        self.assertEqual(jobs.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertIn("transient failure", job.last_error)
+        self.assertEqual(jobs.run_pending(), 0)  # still backing off
+
+        Job.objects.filter(pk=job.pk).update(run_at=job.created_at)
+        self.assertEqual(jobs.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.DONE, 2))
+
+    def test_a_reclaimed_job_keeps_its_new_holders_state(self):
+        for fail_first in (False, True):
+            jobs.enqueue("tests.record", {"value": 1, "fail_first": fail_first})
+            [job] = jobs.claim("stale-worker")
+            # The lock went stale and another worker took the job over.
+            Job.objects.filter(pk=job.pk).update(locked_by="new-worker")
+
+            self.assertFalse(jobs.run(job))
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.locked_by, job.attempts), (Job.RUNNING, "new-worker", 0))
+
+    def test_password_reset_mail_is_queued(self):
+        make_user("forgetful", "+254700000010")
+
+        self.client.post("/password-reset/", {"email": "forgetful@example.com"})
+        self.assertEqual(len(outbox.outbox), 0)
+
+        jobs.run_pending()
+        self.assertEqual(outbox.outbox[0].to, ["forgetful@example.com"])
+
+
+class BouncingBackend(LocmemBackend):
+    """Locmem backend that rejects one address and counts opened connections."""
+
+    opened = 0
+
+    def open(self):
+        type(self).opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if any("bounce@" in address for message in messages for address in message.to):
+            raise ConnectionError("mailbox unavailable")
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND="The_App_Code.tests.BouncingBackend", MAIL_RATE_LIMIT=0, MAIL_MAX_ATTEMPTS=2
+)
+class OutboxTests(TestCase):
+    def test_batch_is_sent_over_one_connection_and_failures_retry(self):
+        BouncingBackend.opened = 0
+        for address in ["a@example.com", "bounce@example.com", "b@example.com"]:
+            mail.queue("Hi", "Body", [address])
+
+        self.assertEqual(Job.objects.filter(name=mail.FLUSH_JOB).count(), 1)
+        jobs.run_pending()
+
+        self.assertEqual(BouncingBackend.opened, 1)
+        self.assertEqual(sorted(message.to[0] for message in outbox.outbox), ["a@example.com", "b@example.com"])
+        bounced = OutboxEmail.objects.get(to=["bounce@example.com"])
+        self.assertEqual((bounced.status, bounced.attempts), (OutboxEmail.PENDING, 1))
+        self.assertTrue(Job.objects.filter(name=mail.FLUSH_JOB, status=Job.QUEUED).exists())
+
+        OutboxEmail.objects.filter(pk=bounced.pk).update(next_attempt_at=bounced.created_at)
+        mail.flush()
+        bounced.refresh_from_db()
+        self.assertEqual(bounced.status, OutboxEmail.FAILED)
+
+
+class PasswordResetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user("resetter", "+254700000011")
+
+    def reset_link(self):
+        self.client.post("/password-reset/", {"email": self.user.email})
+        return re.search(r"https?://[^/]+(/password-reset/\S+/)", OutboxEmail.objects.get().body).group(1)
+
+    def test_emailed_link_resets_the_password_once(self):
+        link = self.reset_link()
+        self.assertEqual(self.client.get(link).status_code, 200)
+
+        response = self.client.post(link, {"password1": "new-pass-12345", "password2": "new-pass-12345"})
+
+        self.assertRedirects(response, "/login/", fetch_redirect_response=False)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("new-pass-12345"))
+        self.assertRedirects(self.client.get(link), "/login/", fetch_redirect_response=False)
+
+    def test_forged_and_expired_links_are_rejected(self):
+        link = self.reset_link()
+        uidb64 = link.split("/")[2]
+        for bad in [f"/password-reset/{uidb64}/forged-token/", "/password-reset/not-base64/forged-token/"]:
+            with self.subTest(bad):
+                self.assertRedirects(self.client.get(bad), "/login/", fetch_redirect_response=False)
+        with self.settings(PASSWORD_RESET_TIMEOUT=-1):
+            self.assertRedirects(self.client.get(link), "/login/", fetch_redirect_response=False)
+
+
+@override_settings(RATE_LIMITS={"login:username": (2, 300), "register:ip": (1, 3600)})
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        ratelimit.reset()
+        make_user("target", "+254700000012")
+
+    def test_login_is_throttled_before_hashing(self):
+        for _ in range(3):
+            response = self.client.post("/login/", {"username": "target", "password": "wrong"})
+
+        self.assertContains(response, "Too many login attempts", status_code=429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+        stats = ratelimit.metrics()["login"]
+        self.assertEqual((stats["allowed"], stats["rejected"], stats["hashes"]), (2, 1, 2))
+        self.assertGreater(stats["hash_seconds_saved"], 0)
+
+    def test_registration_is_throttled_per_ip(self):
+        self.client.post("/register/", {"username": "a"})
+        response = self.client.post("/register/", {"username": "b"})
+
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+
+    def test_limits_come_from_settings_only(self):
+        with self.settings(RATE_LIMITS={}):
+            self.assertTrue(all(ratelimit.hit("login", username="target").allowed for _ in range(20)))
+
+    def test_falls_back_to_process_counters_when_cache_fails(self):
+        with mock.patch.object(ratelimit, "_cache", side_effect=ConnectionError), \
+                self.assertLogs(ratelimit.logger, "WARNING"):
+            decisions = [ratelimit.hit("login", username="someone").allowed for _ in range(3)]
+        self.assertEqual(decisions, [True, True, False])
+
+
+class RegistrationTests(TestCase):
+    def setUp(self):
+        registration.register(
+            username="first", email="Taken@Example.com", password="pass-12345", phone_number="+254700000013"
+        )
+
+    def test_conflicts_are_found_in_one_query(self):
+        with self.assertNumQueries(1):
+            errors = registration.conflicts("first", "taken@example.COM", "+254700000013")
+        self.assertEqual(set(errors), {"username", "email", "phone_number"})
+
+    def test_lost_race_is_reported_as_field_error(self):
+        with mock.patch.object(registration, "conflicts", side_effect=[{}, {"email": "Email already registered."}]):
+            with self.assertRaises(registration.RegistrationError) as raised:
+                registration.register(
+                    username="second", email="TAKEN@example.com", password="pass-12345",
+                    phone_number="+254700000014",
+                )
+        self.assertEqual(list(raised.exception.errors), ["email"])
+        self.assertFalse(User.objects.filter(username="second").exists())
+
+    def test_signup_logs_in(self):
+        response = self.client.post("/register/", {
+            "username": "newbie", "email": "new@example.com", "password1": "pass-12345",
+            "password2": "pass-12345", "phone_number": "+254700000015",
+        })
+        self.assertRedirects(response, "/dashboard/", fetch_redirect_response=False)
+        self.assertEqual(UserProfile.objects.get(user__username="newbie").email_normalized, "new@example.com")
+
+    def test_email_changes_follow_into_the_profile(self):
+        first = User.objects.get(username="first")
+        first.email = "Moved@Example.com"
+        first.save()
+        self.assertEqual(UserProfile.objects.get(user=first).email_normalized, "moved@example.com")
+        self.assertEqual(registration.conflicts("third", "taken@example.com", "+254700000099"), {})
+
+        # Another account's address is not claimed twice; the change still saves.
+        second = registration.register(
+            username="second", email="second@example.com", password="pass-12345", phone_number="+254700000016"
+        )
+        second.email = "MOVED@example.com"
+        second.save(update_fields=["email"])
+        self.assertIsNone(UserProfile.objects.get(user=second).email_normalized)
+        self.assertEqual(UserProfile.objects.get(user=first).email_normalized, "moved@example.com")
+
+    def test_profiles_made_outside_signup_take_the_address(self):
+        user = User.objects.create_user("staff", "Staff@Example.com", "pass-12345")
+        profile, _ = UserProfile.objects.get_or_create(user=user)
+        self.assertEqual(profile.email_normalized, "staff@example.com")
+
+
+heartbeat_checks = []
+
+
+@jobs.handler("tests.slow")
+def slow_job(seconds):
+    started = Job.objects.get(name="tests.slow").locked_at
+    time.sleep(seconds)
+    # A recovery pass by another worker must leave the running job alone.
+    heartbeat_checks.append((Job.objects.get(name="tests.slow").locked_at > started, jobs.claim("thief")))
+
+
+class ParallelJobWorkerTests(TransactionTestCase):
+    def test_workers_drain_queue_without_running_a_job_twice(self):
+        job_calls.clear()
+        for value in range(40):
+            jobs.enqueue("tests.record", {"value": value})
+
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            counts = list(pool.map(
+                lambda index: jobs.work(f"test-{index}", stop, drain=True), range(4)
+            ))
+
+        self.assertEqual(sum(counts), 40)
+        self.assertEqual(sorted(job_calls), list(range(40)))
+        self.assertFalse(Job.objects.exclude(status=Job.DONE).exists())
+
+    @override_settings(JOB_LOCK_TIMEOUT=0.3, JOB_HEARTBEAT_INTERVAL=0.05)
+    def test_heartbeat_keeps_a_long_job_from_being_requeued(self):
+        heartbeat_checks.clear()
+        job = jobs.enqueue("tests.slow", {"seconds": 0.6})
+
+        self.assertEqual(jobs.run_pending(), 1)
+
+        self.assertEqual(heartbeat_checks, [(True, [])])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.DONE, 1))
+
+
+class PhoneLookupTests(TestCase):
+    def setUp(self):
+        self.sender = make_user("kenyan", "+254700000020")
+        self.sender.profile.country = "Kenya"
+        self.sender.profile.save()
+        self.recipient = make_user("friend", "+254 700-000-021")
+
+    def test_recipient_is_found_however_the_number_is_typed(self):
+        for typed in ["+254700000021", "00254 700 000 021", "0700 000 021", "700000021"]:
+            with self.subTest(typed):
+                self.assertEqual(transfer_service.resolve_recipient(typed, self.sender), self.recipient)
+        self.assertIsNone(transfer_service.resolve_recipient("0700 000 099", self.sender))
+
+    def test_national_numbers_that_start_with_the_calling_code(self):
+        self.assertEqual(phones.normalize("9123456789", "India"), "+919123456789")
+        self.assertEqual(phones.normalize("91 91234 56789", "India"), "+919123456789")
+        self.assertEqual(phones.normalize("254700000021", "Kenya"), "+254700000021")
+        self.assertEqual(phones.normalize("9123456789", "India", partial=True), "+919123456789")
+        self.assertEqual(phones.normalize("2547", "Kenya", partial=True), "+2547")
+
+    def test_lookup_follows_a_changed_number(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(transfer_service.resolve_recipient("+254700000021"), self.recipient)
+
+        profile = self.recipient.profile
+        profile.phone_number = "+254700000022"
+        profile.save(update_fields=["phone_number"])
+
+        self.assertIsNone(transfer_service.resolve_recipient("+254700000021"))
+        self.assertEqual(transfer_service.resolve_recipient("0700000022", self.sender), self.recipient)
+
+    def test_saving_a_backfilled_duplicate_leaves_it_unclaimed(self):
+        # As migration 0015 leaves it: the same number as the recipient's, with no E.164.
+        twin = make_user("twin", "0700000021")
+        UserProfile.objects.filter(user=twin).update(country="Kenya", phone_e164=None)
+
+        profile = UserProfile.objects.get(user=twin)
+        profile.is_active = False
+        profile.save()
+        profile.display_name = "Twin"
+        profile.save(update_fields=["display_name"])
+
+        profile.refresh_from_db()
+        self.assertIsNone(profile.phone_e164)
+        self.assertEqual(transfer_service.resolve_recipient("0700000021", self.sender), self.recipient)
+
+
+class ExchangeRateTests(TestCase):
+    FEED = (
+        b"currency,rate,effective_at\n"
+        b"EUR,0.90,2026-01-01\n"
+        b"EUR,0.80,2026-06-01\n"
+        b"KES,130,2026-01-01\n"
+    )
+
+    def setUp(self):
+        fx.reset()
+        self.addCleanup(fx.reset)
+        with self.captureOnCommitCallbacks(execute=True):
+            fx.load(fx.parse_feed(io.BytesIO(self.FEED), fx.CSV), source="test")
+
+    def test_rates_are_effective_dated(self):
+        march = datetime(2026, 3, 1, tzinfo=dt_timezone.utc)
+        self.assertEqual(fx.rate("EUR", march), Decimal("0.9"))
+        self.assertEqual(fx.rate("EUR"), Decimal("0.8"))
+        self.assertEqual(fx.convert("130", "KES", "EUR"), Decimal("0.80"))
+        with self.assertRaises(fx.RateNotFound):
+            fx.rate("EUR", march.replace(year=2025))
+
+    def test_reload_replaces_cached_table(self):
+        self.assertEqual(fx.rate("KES"), Decimal("130"))
+        with self.captureOnCommitCallbacks(execute=True):
+            fx.load([("KES", Decimal("125"), timezone.now())])
+        self.assertEqual(fx.rate("KES"), Decimal("125"))
+
+    @override_settings(FX_RATE_CACHE_TTL=0)
+    def test_rates_loaded_by_another_process_are_picked_up(self):
+        self.assertEqual(fx.rate("KES"), Decimal("130"))
+        with self.assertNumQueries(1):  # only the version stamp
+            self.assertEqual(fx.rate("KES"), Decimal("130"))
+        # A load from another process: nothing here is told about it.
+        ExchangeRate.objects.create(currency="KES", rate=Decimal("125"), effective_at=timezone.now())
+        self.assertEqual(fx.rate("KES"), Decimal("125"))
+
+    def test_dashboard_totals_are_in_preferred_currency(self):
+        user = make_user("traveller", "+254700000030")
+        user.profile.preferred_currency = "EUR"
+        user.profile.save()
+        for amount, currency in [("100", "USD"), ("13000", "KES"), ("5", "GBP")]:
+            Transaction.objects.create(
+                user=user, description="pay", amount=Decimal(amount), currency=currency,
+                kind=Transaction.INCOMING,
+            )
+
+        fx.rate("EUR")  # warm this process's table
+        with self.assertNumQueries(0):
+            total, missing = fx.sum_converted({"USD": Decimal("100"), "KES": Decimal("13000")}, "EUR")
+        self.assertEqual((total, missing), (Decimal("160.00"), set()))
+
+        metrics = dashboard.snapshot(User.objects.select_related("profile").get(pk=user.pk))
+        self.assertEqual(metrics["currency"], "EUR")
+        self.assertEqual(metrics["incoming_total"], Decimal("160.00"))
+        self.assertEqual(metrics["unconverted_currencies"], ["GBP"])
+        self.assertEqual(
+            fx.queryset_total(Transaction.objects.filter(user=user), "USD"),
+            (Decimal("200.00"), {"GBP"}),
+        )
+
+
+class FeeScheduleTests(TestCase):
+    def setUp(self):
+        self.sender = make_user("payer", "+447700900001")
+        self.sender.profile.country = "United Kingdom"
+        self.sender.profile.save()
+        self.recipient = make_user("payee", "+254700000040")
+        self.recipient.profile.country = "Kenya"
+        self.recipient.profile.save()
+        # Rules rolled back with the test must not stay compiled for the next one.
+        self.addCleanup(fees.invalidate)
+        with self.captureOnCommitCallbacks(execute=True):
+            FeeRule.objects.create(name="Base", rate=Decimal("0.03"), min_fee=Decimal("1"))
+            FeeRule.objects.create(
+                name="UK-Kenya", sender_country="United Kingdom", recipient_country="Kenya",
+                max_amount=Decimal("500"), rate=Decimal("0.01"),
+            )
+            FeeRule.objects.create(
+                name="UK-Kenya large", sender_country="United Kingdom", recipient_country="Kenya",
+                min_amount=Decimal("500"), flat_fee=Decimal("4"),
+            )
+
+    def test_quotes_pick_corridor_band_or_fallback(self):
+        def fee(amount, sender="United Kingdom", recipient="Kenya"):
+            return fees.quote(Decimal(amount), "USD", sender, recipient).fee
+
+        fees.quote(Decimal("1"), "USD")  # compile the schedule
+        with self.assertNumQueries(0):
+            self.assertEqual(fee("100"), Decimal("1.00"))
+            self.assertEqual(fee("500"), Decimal("4.00"))
+            self.assertEqual(fee("100", recipient="Ghana"), Decimal("3.00"))
+            self.assertEqual(fee("10", sender="France"), Decimal("1.00"))
+
+    def test_running_promotion_overrides_schedule(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            promo = Promotion.objects.create(title="Fee-free May", description="No fees")
+            FeeRule.objects.create(name="Promo", promotion=promo)
+        self.assertEqual(fees.quote(Decimal("100"), "USD", "United Kingdom", "Kenya").fee, Decimal("0.00"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            promo.is_active = False
+            promo.save()
+        transfer, _ = transfer_service.send_money(self.sender, "+254700000040", "100")
+        self.assertEqual((transfer.service_fee, transfer.total_amount), (Decimal("1.00"), Decimal("101.00")))
+
+    @override_settings(FEE_SCHEDULE_CACHE_TTL=0)
+    def test_rule_edits_from_another_process_are_picked_up(self):
+        self.assertEqual(fees.quote(Decimal("100"), "USD", "United Kingdom", "Kenya").fee, Decimal("1.00"))
+        # An edit saved elsewhere: update() fires no signal in this process.
+        FeeRule.objects.filter(name="UK-Kenya").update(rate=Decimal("0.02"), updated_at=timezone.now())
+        self.assertEqual(fees.quote(Decimal("100"), "USD", "United Kingdom", "Kenya").fee, Decimal("2.00"))
+
+    def test_quote_endpoint(self):
+        self.client.force_login(self.sender)
+        response = self.client.get("/api/fees/quote/", {"amount": "50", "recipient": "+254700000040"})
+        self.assertEqual(response.json()["fee"], "0.50")
+        self.assertEqual(response.json()["rule"], "UK-Kenya")
+        self.assertEqual(self.client.get("/api/fees/quote/", {"amount": "-1"}).status_code, 400)
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.user = make_user("saver", "+254700000050")
+
+    def spend(self, amount, category, month, **fields):
+        return Transaction.objects.create(
+            user=self.user, description=category, amount=Decimal(amount), category=category,
+            occurred_at=datetime(2026, month, 15, tzinfo=dt_timezone.utc), **fields,
+        )
+
+    def test_rollups_follow_writes_and_feed_series(self):
+        rent = self.spend("500", "Rent", 3)
+        self.spend("40", "Food", 3)
+        food = self.spend("60", "Food", 4)
+        self.spend("900", "Salary", 4, kind=Transaction.INCOMING)
+
+        food.occurred_at = datetime(2026, 5, 2, tzinfo=dt_timezone.utc)
+        food.save()
+        rent.delete()
+        self.assertEqual(rollups.verify(), [])
+
+        with self.assertNumQueries(1):
+            trend = rollups.series(self.user, months=3, until=datetime(2026, 5, 1).date())
+        self.assertEqual(trend["labels"], ["2026-03", "2026-04", "2026-05"])
+        self.assertEqual(trend["series"], [
+            {"name": "Food", "data": [40.0, 0.0, 60.0]},
+        ])
+
+    def test_rebuild_matches_incremental_rows(self):
+        self.spend("12.50", "", 1)
+        imports.import_file(
+            self.user,
+            io.BytesIO(b"Date,Description,Amount,Currency,Category\n2026-01-20,Bus,-2.50,USD,\n"),
+        )
+        before = sorted(TransactionRollup.objects.values_list("month", "category", "total", "entry_count"))
+        self.assertEqual(rollups.rebuild(), 1)
+        after = sorted(TransactionRollup.objects.values_list("month", "category", "total", "entry_count"))
+        self.assertEqual(before, after)
+        self.assertEqual(after[0][2:], (Decimal("15.00"), 2))
+
+    def test_rebuild_rollups_reports_and_repairs_drift(self):
+        self.spend("40", "Food", 3)
+        TransactionRollup.objects.filter(user=self.user).delete()
+        self.spend("60", "Rent", 4)
+
+        out = io.StringIO()
+        with self.assertRaisesMessage(CommandError, "1 rollup row(s) out of sync."):
+            call_command("rebuild_rollups", "--verify", stdout=out)
+        self.assertIn(f"user={self.user.pk} month=2026-03 category='Food'", out.getvalue())
+        self.assertIn("actual=(Decimal('0'), 0)", out.getvalue())
+
+        call_command("rebuild_rollups", stdout=io.StringIO())
+        self.assertEqual(rollups.verify(), [])
+        call_command("rebuild_rollups", "--verify", stdout=io.StringIO())
+
+
+class AdminMetricsTests(TestCase):
+    def setUp(self):
+        cache.delete(admin_metrics.CACHE_KEY)
+        self.admin = make_user("boss", "+254700000060")
+        self.admin.profile.role = UserProfile.ADMIN
+        self.admin.profile.save()
+        other = make_user("client", "+254700000061")
+        for status, fee in [("completed", "2"), ("completed", "3"), ("pending", "1"), ("failed", "4")]:
+            MoneyTransfer.objects.create(
+                sender=self.admin, recipient=other, amount=Decimal("10"), service_fee=Decimal(fee),
+                total_amount=Decimal("10") + Decimal(fee), status=status, reference_number=references.new_reference(),
+            )
+
+    def test_kpis_come_from_one_grouped_pass(self):
+        with self.assertNumQueries(2):  # transfers grouped by status, user count
+            metrics = admin_metrics.compute()
+        self.assertEqual(metrics["total_users"], 2)
+        self.assertEqual(metrics["active_transfers"], 1)
+        self.assertEqual(metrics["total_earnings"], Decimal("5.00"))
+        self.assertEqual(metrics["success_rate"], 50)
+
+    def test_stale_kpis_are_recomputed_by_one_request(self):
+        self.client.force_login(self.admin)
+        self.assertContains(self.client.get("/admin-dashboard/"), "$5.00")
+
+        MoneyTransfer.objects.filter(status="pending").update(status="completed")
+        self.assertEqual(admin_metrics.kpis()["total_earnings"], Decimal("5.00"))  # still fresh
+        entry = cache.get(admin_metrics.CACHE_KEY)
+        entry["computed_at"] -= 3600
+        cache.set(admin_metrics.CACHE_KEY, entry)
+
+        # Another request holds the refresh lock: serve the stale figures.
+        cache.add(admin_metrics.REFRESH_LOCK_KEY, True)
+        with self.assertNumQueries(0):
+            self.assertEqual(admin_metrics.kpis()["total_earnings"], Decimal("5.00"))
+        cache.delete(admin_metrics.REFRESH_LOCK_KEY)
+
+        self.assertEqual(admin_metrics.kpis()["total_earnings"], Decimal("6.00"))
+        self.assertIsNone(cache.get(admin_metrics.REFRESH_LOCK_KEY))
+
+
+class LiveFeedTests(TestCase):
+    def test_feed_replays_the_transfer_event_log(self):
+        sender = make_user("streamer", "+254700000070")
+        make_user("watcher", "+254700000071")
+        start = live.latest_id()
+
+        transfer = MoneyTransfer.objects.create(
+            sender=sender, recipient=User.objects.get(username="watcher"), amount=Decimal("10"),
+            service_fee=Decimal("0.20"), total_amount=Decimal("10.20"), reference_number=references.new_reference(),
+        )
+        transfer.description = "edited"
+        transfer.save()  # no status change, no event
+        transfer = MoneyTransfer.objects.get(pk=transfer.pk)
+        transfer.status = MoneyTransfer.COMPLETED
+        transfer.save()
+        # save() only makes moves that need no compensating entries.
+        for status in (MoneyTransfer.PENDING, MoneyTransfer.CANCELLED):
+            transfer.status = status
+            with self.subTest(status), self.assertRaises(ValidationError):
+                transfer.save()
+
+        admin = make_user("console", "+254700000072")
+        admin.profile.role = UserProfile.ADMIN
+        admin.profile.save()
+        self.client.force_login(admin)
+        # Under WSGI the endpoint replays what was missed instead of streaming.
+        response = self.client.get("/admin-dashboard/events/", headers={"last-event-id": str(start)})
+        body = response.content.decode()
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(body.count("event: "), 2)
+        self.assertIn(f"id: {start + 2}\nevent: transfer.status", body)
+        self.assertIn('"sender": "streamer"', body)
+        self.assertIn('"kpi": {"transfers": 0, "pending": -1, "completed": 1, "earnings": "0.20"}', body)
+        # Without a usable id the console starts from the end of the log.
+        fresh = self.client.get("/admin-dashboard/events/", headers={"last-event-id": "garbled"})
+        self.assertEqual(fresh.content.decode(), live.preamble(start + 2))
+
+    async def test_stream_tails_writes_from_anywhere(self):
+        sender, recipient = await sync_to_async(lambda: (
+            make_user("tailer", "+254700000073"), make_user("tailed", "+254700000074"),
+        ))()
+        frames = live.stream(heartbeat=0.05, poll=0.01)
+        self.assertTrue((await anext(frames)).startswith("retry: "))
+        transfer = await MoneyTransfer.objects.acreate(
+            sender=sender, recipient=recipient, amount=Decimal("1"), service_fee=Decimal("0"),
+            total_amount=Decimal("1"), reference_number=references.new_reference(),
+        )
+        frame = await anext(frames)
+        while frame.startswith(":"):  # heartbeat
+            frame = await anext(frames)
+        self.assertIn(f'event: transfer.created\ndata: {{"id": {transfer.pk}', frame)
+        await frames.aclose()
+
+    def test_an_event_committed_after_a_higher_id_is_still_sent(self):
+        transfer = transfer_service.send_money(
+            make_user("early", "+254700000075"), make_user("late", "+254700000076").profile.phone_number, "5",
+        )[0]
+        start = live.latest_id()
+        sent = set(range(start - live.LOOKBACK + 1, start + 1))
+        # Id start + 2 commits first; start + 1 was taken earlier but commits after it.
+        TransferEvent.for_transfer(transfer, id=start + 2).save(force_insert=True)
+        last_id, frames = live._next_batch(start, sent)
+        self.assertEqual((last_id, frames.count("event: ")), (start + 2, 1))
+
+        TransferEvent.for_transfer(transfer, id=start + 1).save(force_insert=True)
+        last_id, frames = live._next_batch(last_id, sent)
+        self.assertEqual(last_id, start + 2)
+        self.assertIn(f"id: {start + 1}\nevent: transfer.created", frames)
+        self.assertTrue(frames.endswith(f"id: {start + 2}\n\n"))
+        self.assertEqual(live._next_batch(last_id, sent), (start + 2, ""))
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(fx.reset)
+        self.user = make_user("saver", "+254700000071")
+        self.other = make_user("friend", "+254700000072")
+
+    def assertRetiredOnCommit(self, change):
+        dashboard.snapshot(self.user)
+        key = dashboard._snapshot_key(self.user.pk)
+        with self.captureOnCommitCallbacks() as callbacks:
+            change()
+        # Until the write commits, readers keep the old snapshot.
+        self.assertIsNotNone(cache.get(key))
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(dashboard._snapshot_key(self.user.pk), key)
+
+    def test_repeat_snapshot_is_served_from_cache(self):
+        Transaction.objects.create(user=self.user, description="Salary", amount=Decimal("50"), kind=Transaction.INCOMING)
+        first = dashboard.snapshot(self.user)
+        with self.assertNumQueries(0):
+            again = dashboard.snapshot(self.user)
+        self.assertEqual(again, first)
+        self.assertEqual(again["incoming_total"], Decimal("50.00"))
+
+    def test_writes_retire_the_snapshot_after_commit(self):
+        entry = Transaction.objects.create(user=self.user, description="Rent", amount=Decimal("10"))
+        goal = SavingGoal.objects.create(user=self.user, name="Bike", target_amount=Decimal("300"))
+        pledge = Donation.objects.create(name="Saver", email=self.user.email, country="Kenya", quantity=1)
+        transfer, _ = transfer_service.send_money(self.other, "+254700000071", "20")
+
+        self.assertRetiredOnCommit(
+            lambda: Transaction.objects.create(user=self.user, description="Lunch", amount=Decimal("5"))
+        )
+        self.assertRetiredOnCommit(entry.delete)
+        self.assertRetiredOnCommit(
+            lambda: SavingGoal.objects.create(user=self.user, name="Trip", target_amount=Decimal("900"))
+        )
+        self.assertRetiredOnCommit(goal.delete)
+        self.assertRetiredOnCommit(
+            lambda: Donation.objects.create(name="Saver", email=self.user.email, country="Kenya", quantity=2)
+        )
+        self.assertRetiredOnCommit(pledge.delete)
+        self.assertRetiredOnCommit(transfer.save)
+        self.assertRetiredOnCommit(transfer.delete)
+
+
+class RecipientSearchTests(TestCase):
+    def setUp(self):
+        self.user = make_user("searcher", "+254711000000")
+        for index, name in enumerate(["Alice", "Alan", "Albert", "Alma", "Alvin", "Bob"], start=1):
+            profile = make_user(name.lower(), f"+25471100000{index}").profile
+            profile.display_name = name
+            profile.save()
+        suspended = make_user("alina", "+254722000000").profile
+        suspended.display_name, suspended.is_active = "Alina", False
+        suspended.save()
+
+    def names(self, query, **kwargs):
+        results, _ = recipients.search(self.user, query, **kwargs)
+        return sorted(row["display_name"] for row in results)
+
+    def test_matches_name_and_phone_prefixes_of_active_users(self):
+        self.assertEqual(self.names("al"), ["Alan", "Albert", "Alice", "Alma", "Alvin"])
+        self.assertEqual(self.names("ALI"), ["Alice"])
+        self.assertEqual(self.names("+254711000006"), ["Bob"])
+        self.assertEqual(self.names("+2547220"), [])
+
+    def test_never_offers_the_searching_user(self):
+        self.assertNotIn("searcher", self.names("+254711"))
+        self.assertEqual(len(self.names("+254711")), 6)
+
+    def test_pages_continue_from_the_cursor_without_repeats(self):
+        self.client.force_login(self.user)
+        seen, cursor = [], None
+        while True:
+            params = {"q": "al", "limit": 2, **({"after": cursor} if cursor else {})}
+            page = self.client.get("/api/recipients/", params).json()
+            self.assertLessEqual(len(page["results"]), 2)
+            seen += [row["display_name"] for row in page["results"]]
+            cursor = page["next"]
+            if cursor is None:
+                break
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(sorted(seen), ["Alan", "Albert", "Alice", "Alma", "Alvin"])
+
+    def test_requires_login(self):
+        response = self.client.get("/api/recipients/", {"q": "al"})
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response["Location"].startswith("/login/"))
+
+
+class TracingTests(TestCase):
+    def setUp(self):
+        tracing.clear()
+        self.addCleanup(tracing.clear)
+
+    def test_sampling_is_decided_at_the_root_and_inherited(self):
+        with override_settings(TRACE_SAMPLE_RATE=0.0):
+            with tracing.span("skipped"):
+                with tracing.span("skipped.child"):
+                    User.objects.count()
+        self.assertEqual(tracing.recent(), [])
+
+        with override_settings(TRACE_SAMPLE_RATE=1.0):
+            with tracing.span("kept"):
+                with override_settings(TRACE_SAMPLE_RATE=0.0):
+                    with tracing.span("kept.child"):
+                        pass
+        self.assertEqual([(item["name"], item["parent"]) for item in tracing.recent()], [
+            ("kept.child", "kept"), ("kept", None),
+        ])
+
+    @override_settings(TRACE_SAMPLE_RATE=1.0)
+    def test_each_span_counts_the_queries_run_inside_it(self):
+        @tracing.traced("count.users")
+        def count_users():
+            return User.objects.count()
+
+        with tracing.span("outer"):
+            User.objects.exists()
+            count_users()
+            count_users()
+
+        queries = {item["name"]: item["queries"] for item in tracing.recent()}
+        self.assertEqual(queries, {"count.users": 1, "outer": 3})
+
+    @override_settings(TRACE_SAMPLE_RATE=1.0)
+    def test_buffer_keeps_only_the_latest_spans(self):
+        with mock.patch.object(tracing, "_buffer", deque(maxlen=3)):
+            for index in range(5):
+                with tracing.span(f"span-{index}"):
+                    pass
+            self.assertEqual([item["name"] for item in tracing.recent()], ["span-2", "span-3", "span-4"])
+            self.assertEqual([item["name"] for item in tracing.recent(1)], ["span-4"])
+
+    @override_settings(TRACE_SAMPLE_RATE=1.0)
+    async def test_coroutine_spans_time_without_counting_queries(self):
+        @tracing.traced("count.async")
+        async def fetch():
+            return await User.objects.acount()
+
+        self.assertEqual(await fetch(), 0)
+        span = tracing.recent()[-1]
+        self.assertEqual((span["name"], span["queries"]), ("count.async", None))
+        summary = {item["name"]: item for item in tracing.summary()}
+        self.assertIsNone(summary["count.async"]["avg_queries"])
+
+    def test_trace_export_is_for_administrators_only(self):
+        self.client.force_login(make_user("nosy", "+254700000061"))
+        response = self.client.get("/admin-dashboard/traces/")
+        self.assertEqual(response.status_code, 403)
+
+        admin = make_user("operator", "+254700000062")
+        admin.profile.role = UserProfile.ADMIN
+        admin.profile.save()
+        self.client.force_login(admin)
+        self.assertIn("summary", self.client.get("/admin-dashboard/traces/").json())
+
+
+class DonationStatsTests(TestCase):
+    def pledge(self, email, quantity):
+        return Donation.objects.create(name="Donor", email=email, country="Kenya", quantity=quantity)
+
+    def assertStats(self, packs, donations, donors, emails):
+        stats = donation_stats.current()
+        self.assertEqual((stats.total_packs, stats.donation_count, stats.donor_count), (packs, donations, donors))
+        self.assertEqual(dict(DonorEmail.objects.values_list("email", "donation_count")), emails)
+        self.assertEqual(donation_stats.check(), {})
+
+    def test_counters_follow_create_edit_and_delete(self):
+        first = self.pledge("a@example.com", 3)
+        self.pledge("a@example.com", 2)
+        other = self.pledge("b@example.com", 5)
+        self.assertStats(10, 3, 2, {"a@example.com": 2, "b@example.com": 1})
+
+        first.email, first.quantity = "c@example.com", 4
+        first.save()
+        self.assertStats(11, 3, 3, {"a@example.com": 1, "b@example.com": 1, "c@example.com": 1})
+
+        other.email = "a@example.com"  # b's only pledge moves to an existing donor
+        other.save()
+        self.assertStats(11, 3, 2, {"a@example.com": 2, "c@example.com": 1})
+
+        first.delete()
+        self.assertStats(7, 2, 1, {"a@example.com": 2})
+
+    def test_check_and_reconcile_repair_drift(self):
+        self.pledge("a@example.com", 3)
+        self.pledge("b@example.com", 1)
+        DonationStats.objects.update(total_packs=999)
+        DonorEmail.objects.filter(email="b@example.com").delete()
+
+        drift = donation_stats.check()
+        self.assertEqual(drift["total_packs"], (4, 999))
+        self.assertEqual(drift["donor_emails"], (2, 1))
+        with self.assertRaises(CommandError):
+            call_command("reconcile_donation_stats", "--check", stdout=io.StringIO())
+
+        call_command("reconcile_donation_stats", stdout=io.StringIO())
+        self.assertStats(4, 2, 2, {"a@example.com": 1, "b@example.com": 1})
+
+
+class AsyncPageTests(TestCase):
+    async def test_async_services_match_sync(self):
+        await sync_to_async(make_user)("reader", "+254700000080")
+        self.assertEqual(await users.atotal_users(), await sync_to_async(users.total_users)())
+        self.assertEqual(await users.acategory_breakdown(), await sync_to_async(users.category_breakdown)())
+        self.assertEqual(await promotions.alist_promotions(), await sync_to_async(list)(promotions.list_promotions()))
+        context = await donate.abuild_context(None)
+        self.assertEqual(context["donation_total_packs"], 0)
+        self.assertEqual(context["recent_donations"], [])
+
+    def test_wsgi_requests_use_the_sync_views(self):
+        for path in ("/promotions/", "/learning/", "/users/", "/donate/"):
+            with self.subTest(path):
+                response = self.client.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(asyncio.iscoroutinefunction(response.resolver_match.func))
+
+    async def test_asgi_requests_use_the_async_views(self):
+        for path in ("/promotions/", "/learning/", "/users/", "/donate/"):
+            with self.subTest(path):
+                response = await self.async_client.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(asyncio.iscoroutinefunction(response.resolver_match.func))
+
+    async def test_async_donate_saves_a_pledge(self):
+        response = await self.async_client.post("/donate/", {
+            "donation-country": "Kenya", "donation-quantity": 3, "donation-frequency": Donation.ONE_TIME,
+            "donation-name": "Wanjiru", "donation-email": "w@example.com",
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(await Donation.objects.acount(), 1)
+
+    @override_settings(TRACE_SAMPLE_RATE=1.0)
+    def test_traced_context_counts_its_queries(self):
+        tracing.clear()
+        self.addCleanup(tracing.clear)
+        with self.assertNumQueries(2):
+            context = donate.build_context(None)
+            list(context["recent_donations"])
+        # The lazy recent-donations query runs after the span closes.
+        self.assertEqual([item["queries"] for item in tracing.recent()], [1])
+
+
+class BulkAdminTests(TestCase):
+    def setUp(self):
+        self.admin = make_user("oncall", "+254700000090")
+        self.admin.profile.role = UserProfile.ADMIN
+        self.admin.profile.save()
+        self.sender = make_user("incident", "+254700000091")
+        self.transfers = [
+            MoneyTransfer.objects.create(
+                sender=self.sender, recipient=self.admin, amount=Decimal("5"), service_fee=Decimal("0.10"),
+                total_amount=Decimal("5.10"), reference_number=references.new_reference(), status=status,
+            )
+            for status in [MoneyTransfer.PENDING] * 5 + [MoneyTransfer.COMPLETED]
+        ]
+
+    def test_bulk_status_update_is_one_statement_with_audit_and_events(self):
+        start = live.latest_id()
+        with self.captureOnCommitCallbacks(execute=True):
+            # Same count for any number of rows: count, locked read, update,
+            # posted-entry read, event insert, audit insert, two savepoint pairs.
+            with self.assertNumQueries(10):
+                result = bulk_admin.update_transfer_status(
+                    self.admin, MoneyTransfer.FAILED, filters={"sender": "incident"}, reason="gateway outage"
+                )
+
+        self.assertEqual((result.matched, result.updated, result.skipped), (6, 5, 1))
+        self.assertEqual(MoneyTransfer.objects.filter(status=MoneyTransfer.FAILED).count(), 5)
+        self.assertEqual(MoneyTransfer.objects.filter(status=MoneyTransfer.COMPLETED).count(), 1)
+        audit = AdminAuditLog.objects.get(pk=result.audit_id)
+        self.assertEqual((audit.actor, audit.affected, audit.changes), (self.admin, 5, {"status": "failed"}))
+        self.assertEqual(sorted(audit.object_ids), sorted(t.pk for t in self.transfers[:5]))
+
+        events = transfer_states.events_since(start)
+        self.assertEqual([(event.from_status, event.to_status) for event in events], [("pending", "failed")] * 5)
+        self.assertEqual({event.actor_id for event in events}, {self.admin.pk})
+
+    def test_bulk_endpoints_validate_requests(self):
+        self.client.force_login(self.admin)
+        url = "/admin-dashboard/bulk/transfers/"
+        post = lambda url, body: self.client.post(url, json.dumps(body), content_type="application/json")
+
+        self.assertEqual(post(url, {"status": "failed"}).status_code, 400)  # no selection
+        self.assertEqual(post(url, {"status": "failed", "filters": {"amount": 5}}).status_code, 400)
+        self.assertEqual(post(url, {"status": "refunded", "ids": [1]}).status_code, 400)
+        dry = post(url, {"status": "cancelled", "filters": {"status": "pending"}, "dry_run": True}).json()
+        self.assertEqual((dry["matched"], dry["updated"], dry["audit_id"]), (5, 5, None))
+        self.assertFalse(AdminAuditLog.objects.exists())
+
+        users = post("/admin-dashboard/bulk/users/", {"active": False, "filters": {"is_active": True}}).json()
+        self.assertEqual(users["updated"], 1)  # the acting admin is never suspended
+        self.assertFalse(UserProfile.objects.get(user=self.sender).is_active)
+        self.assertTrue(UserProfile.objects.get(user=self.admin).is_active)
+
+        self.client.force_login(self.sender)
+        self.assertEqual(post(url, {"status": "failed", "ids": [1]}).status_code, 403)
+
+
+class TransferStateTests(TestCase):
+    def setUp(self):
+        self.sender = make_user("payer", "+254700000095")
+        self.recipient = make_user("payee", "+254700000096")
+        self.transfer, _ = transfer_service.send_money(self.sender, "+254700000096", "100")
+
+    def _move(self, status):
+        with transaction.atomic():
+            rows = list(MoneyTransfer.objects.select_for_update().filter(pk=self.transfer.pk))
+            return transfer_states.move(rows, status, actor=self.recipient, reason="chargeback")
+
+    def test_cancelling_a_completed_transfer_posts_compensating_entries(self):
+        with self.assertRaises(transfer_states.InvalidTransition):
+            self._move(MoneyTransfer.FAILED)
+
+        self._move(MoneyTransfer.CANCELLED)
+
+        for user in (self.sender, self.recipient):
+            totals = ledger.totals_by_kind(user)
+            self.assertEqual(totals[Transaction.TRANSFER_IN], totals[Transaction.TRANSFER_OUT])
+        self.assertEqual(ledger.verify(), [])
+        self.assertEqual(rollups.verify(), [])
+        history = [(e.kind, e.from_status, e.to_status, e.compensated) for e in transfer_states.history(self.transfer)]
+        self.assertEqual(history, [
+            (TransferEvent.CREATED, "", MoneyTransfer.COMPLETED, False),
+            (TransferEvent.STATUS_CHANGED, MoneyTransfer.COMPLETED, MoneyTransfer.CANCELLED, True),
+        ])
+        with self.assertRaises(transfer_states.InvalidTransition):
+            self._move(MoneyTransfer.COMPLETED)
+
+    def test_event_log_is_append_only_and_pages_by_id(self):
+        first = TransferEvent.objects.get()
+        with self.assertRaises(TypeError):
+            first.save()
+        with self.assertRaises(TypeError):
+            TransferEvent.objects.all().delete()
+
+        self._move(MoneyTransfer.CANCELLED)
+        admin = make_user("auditor", "+254700000097")
+        admin.profile.role = UserProfile.ADMIN
+        admin.profile.save()
+        self.client.force_login(admin)
+        page = self.client.get("/admin-dashboard/transfer-events/", {"after": first.id}).json()
+        self.assertEqual([event["to_status"] for event in page["events"]], [MoneyTransfer.CANCELLED])
+        self.assertEqual(page["last_id"], page["events"][0]["id"])
+
+
+class ReferenceNumberTests(TestCase):
+    def test_references_are_unique_ordered_and_checksummed(self):
+        generated = [references.new_reference() for _ in range(1000)]
+
+        self.assertEqual(len(set(generated)), len(generated))
+        self.assertEqual(generated, sorted(generated))
+        self.assertTrue(all(len(ref) == 13 and references.is_valid(ref) for ref in generated))
+
+    def test_detects_mistyped_reference(self):
+        reference = references.new_reference()
+        typo = reference[:3] + ("1" if reference[3] != "1" else "2") + reference[4:]
+        self.assertFalse(references.is_valid(typo))
+
+    def test_shard_comes_from_settings_and_must_fit(self):
+        # pid=None makes the next reference re-read the shard, as in a new process.
+        with mock.patch.dict(references._state, pid=None), self.settings(TRANSFER_REFERENCE_SHARD="7"):
+            references.new_reference()
+            self.assertEqual(references._state["shard"], 7)
+        for bad in ("1024", "-1", "worker-3"):
+            with self.subTest(bad), mock.patch.dict(references._state, pid=None), self.settings(TRANSFER_REFERENCE_SHARD=bad):
+                with self.assertRaises(ImproperlyConfigured):
+                    references.new_reference()
+
+    def test_each_process_leases_its_own_shard(self):
+        with mock.patch.dict(references._state, pid=None):
+            references.new_reference()
+            mine = references._state["shard"]
+            theirs = references._claim_shard("elsewhere:42")
+
+        self.assertNotEqual(mine, theirs)
+        self.assertEqual(ReferenceShard.objects.get(shard=theirs).holder, "elsewhere:42")
+        self.assertGreater(ReferenceShard.objects.get(shard=mine).leased_until, timezone.now())
+
+    def test_a_shard_taken_over_after_its_lease_expired_is_replaced(self):
+        with mock.patch.dict(references._state, pid=None):
+            references.new_reference()
+            mine = references._state["shard"]
+            ReferenceShard.objects.filter(shard=mine).update(leased_until=timezone.now() - timedelta(seconds=1))
+            self.assertEqual(references._claim_shard("elsewhere:42"), mine)
+
+            references._state["renew_at"] = 0.0
+            references.new_reference()
+            self.assertNotEqual(references._state["shard"], mine)
+        self.assertEqual(ReferenceShard.objects.get(shard=mine).holder, "elsewhere:42")
+
+    def test_a_held_lease_is_renewed(self):
+        with mock.patch.dict(references._state, pid=None):
+            references.new_reference()
+            mine = references._state["shard"]
+            ReferenceShard.objects.filter(shard=mine).update(leased_until=timezone.now())
+
+            references._state["renew_at"] = 0.0
+            references.new_reference()
+            self.assertEqual(references._state["shard"], mine)
+        self.assertGreater(ReferenceShard.objects.get(shard=mine).leased_until, timezone.now())
+
+
+class QueryPlanTests(TestCase):
+    """Hot service queries must be answered from an index, never a full table scan."""
+
+    FULL_SCAN = re.compile(r"(\bSCAN \S+$)|(Seq Scan on)")
+
+    def assertUsesIndex(self, queryset):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+        for line in plan.splitlines():
+            self.assertIsNone(self.FULL_SCAN.search(line.strip()), plan)
+
+    def test_hot_queries_use_indexes(self):
+        user = make_user("planner", "+254700000009")
+        queries = {
+            "recent transactions": Transaction.objects.filter(user=user).order_by("-created_at")[:10],
+            "transactions by kind": Transaction.objects.filter(
+                user=user, kind__in=[Transaction.INCOMING, Transaction.TRANSFER_IN]
+            ),
+            "pending transfers": MoneyTransfer.objects.filter(
+                status=MoneyTransfer.PENDING
+            ).order_by("-created_at"),
+            "recent transfers": MoneyTransfer.objects.order_by("-created_at")[:10],
+            "sent transfers export": MoneyTransfer.objects.filter(sender=user).order_by("-created_at", "-pk"),
+            "live promotions": promotions.list_promotions(),
+            "budget month": BudgetEntry.objects.filter(user=user, month=first_day_of_current_month()),
+            "user donations": Donation.objects.filter(Q(donor=user) | Q(email=user.email)),
+            "recent donations": Donation.objects.order_by("-created_at")[:5],
+            "unread global notifications": AdminNotification.objects.filter(
+                is_global=True, is_active=True, pk__gt=0
+            ).order_by("pk"),
+            "unread targeted notifications": NotificationDelivery.objects.filter(
+                user=user, adminnotification_id__gt=0
+            ),
+        }
+        for name, queryset in queries.items():
+            with self.subTest(name):
+                self.assertUsesIndex(queryset)
+
+
+class ConcurrentTransferLoadTests(TransactionTestCase):
+    THREADS = 8
+    TRANSFERS_PER_THREAD = 10
+
+    def test_concurrent_transfers_keep_ledger_consistent(self):
+        recipient = make_user("recipient", "+254700000000")
+        senders = [
+            make_user(f"sender{i}", f"+25471000000{i}") for i in range(self.THREADS)
+        ]
+
+        def run(sender):
+            try:
+                for i in range(self.TRANSFERS_PER_THREAD):
+                    key = f"{sender.pk}-{i}"
+                    transfer_service.send_money(sender, "+254700000000", "1.00", idempotency_key=key)
+                    # A retried submit must not post a second time.
+                    transfer_service.send_money(sender, "+254700000000", "1.00", idempotency_key=key)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as pool:
+            list(pool.map(run, senders))
+
+        expected = self.THREADS * self.TRANSFERS_PER_THREAD
+        self.assertEqual(MoneyTransfer.objects.count(), expected)
+        received = BalanceLedger.objects.get(
+            user=recipient, currency="USD", kind=Transaction.TRANSFER_IN
+        )
+        self.assertEqual(received.total, Decimal(expected))
+        self.assertEqual(received.entry_count, expected)
+        self.assertEqual(ledger.verify(), [])
@@ -11,7 +11,14 @@ from .views.profile_view import profile_view
 from .views.ForLearning_views import learning_view
 from .views.users_views import users_view
 from .views.chatbot_views import chatbot_api
-from .views.admin_views import admin_dashboard
+from .views.recipients_views import recipient_search
+from .views.fees_views import fee_quote
+from .views.import_views import transaction_import
+from .views.export_views import statement_export
+from .views.notifications_views import notification_feed
+from .views.admin_views import (
+    admin_dashboard, admin_events, bulk_transfer_status, bulk_user_active, trace_export, transfer_events,
+)
 from .views.auth_views import register_view
 from .views.password_reset_views import password_reset_request, password_reset_confirm
 
@@ -27,7 +34,7 @@ urlpatterns = [
     
     # Password Reset
     path('password-reset/', password_reset_request, name='password_reset_request'),
-    path('password-reset/<str:token>/', password_reset_confirm, name='password_reset_confirm'),
+    path('password-reset/<uidb64>/<token>/', password_reset_confirm, name='password_reset_confirm'),
 
     path('promotions/', promotions_view, name='promotions'),
     path('budget/', budget_view, name='budget'),
@@ -39,9 +46,19 @@ urlpatterns = [
 
     path('users/', users_view, name='users'),
     path('chatbot/api/', chatbot_api, name='chatbot_api'),
+    path('api/recipients/', recipient_search, name='recipient_search'),
+    path('api/fees/quote/', fee_quote, name='fee_quote'),
+    path('transactions/import/', transaction_import, name='transaction_import'),
+    path('transactions/export/', statement_export, name='statement_export'),
+    path('api/notifications/', notification_feed, name='notification_feed'),
 
     # Admin dashboard
     path('admin-dashboard/', admin_dashboard, name='admin_dashboard'),
+    path('admin-dashboard/traces/', trace_export, name='admin_traces'),
+    path('admin-dashboard/events/', admin_events, name='admin_events'),
+    path('admin-dashboard/bulk/transfers/', bulk_transfer_status, name='admin_bulk_transfers'),
+    path('admin-dashboard/bulk/users/', bulk_user_active, name='admin_bulk_users'),
+    path('admin-dashboard/transfer-events/', transfer_events, name='admin_transfer_events'),
 
     # Legacy .html routes (redirect to clean URLs)
     path('dashboard.html', dashboard_view),
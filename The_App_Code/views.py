@@ -14,6 +14,8 @@ from .models import (
     Donation, LearningResource, MoneyTransfer, AdminNotification
 )
 from .forms import TransactionForm, SavingGoalForm
+from .services import ledger, notifications
+from .services import transfers as transfer_service
 
 
 def render_page(request, template_name, active_page, extra_context=None):
@@ -91,13 +93,9 @@ def dashboard(request):
         incoming_kinds = ['incoming']
         outgoing_kinds = ['outgoing']
     
-    incoming_total = transactions.filter(
-        kind__in=incoming_kinds
-    ).aggregate(total=Sum("amount"))["total"] or 0
-    
-    outgoing_total = transactions.filter(
-        kind__in=outgoing_kinds
-    ).aggregate(total=Sum("amount"))["total"] or 0
+    totals = ledger.totals_by_kind(user)
+    incoming_total = sum(totals.get(kind, 0) for kind in incoming_kinds)
+    outgoing_total = sum(totals.get(kind, 0) for kind in outgoing_kinds)
     
     net_flow = incoming_total - outgoing_total
     
@@ -106,12 +104,6 @@ def dashboard(request):
         total=Sum("quantity")
     )["total"] or 0
     
-    # Get available recipients (users with phone numbers, excluding current user)
-    available_recipients = UserProfile.objects.filter(
-        phone_number__isnull=False,
-        is_active=True
-    ).exclude(user=user).select_related('user')
-    
     context = {
         "recent_transactions": transactions,
         "goals": goals,
@@ -119,9 +111,9 @@ def dashboard(request):
         "outgoing_total": outgoing_total,
         "net_flow": net_flow,
         "donation_total_packs": donation_total_packs,
-        "available_recipients": available_recipients,
         "transaction_form": TransactionForm(),
         "goal_form": SavingGoalForm(),
+        "transfer_idempotency_key": uuid.uuid4().hex,
         "now": timezone.now(),
     }
     
@@ -130,69 +122,29 @@ def dashboard(request):
 
 def handle_money_transfer(request):
     """Handle money transfer between users."""
-    recipient_phone = request.POST.get("recipient_phone")
-    amount = request.POST.get("amount")
-    currency = request.POST.get("currency", "USD")
-    description = request.POST.get("description", "")
-    
     try:
-        amount = Decimal(amount)
-        service_fee = amount * Decimal('0.02')  # 2% fee
-        total_amount = amount + service_fee
-        
-        # Find recipient by phone number
-        recipient_profile = get_object_or_404(UserProfile, phone_number=recipient_phone)
-        recipient = recipient_profile.user
-        
-        # Check if user has enough balance (simplified - you may want to implement wallet balance)
-        sender_profile, created = UserProfile.objects.get_or_create(user=request.user)
-        
-        # Create money transfer record
-        transfer = MoneyTransfer.objects.create(
-            sender=request.user,
-            recipient=recipient,
-            amount=amount,
-            currency=currency,
-            service_fee=service_fee,
-            total_amount=total_amount,
-            description=description,
-            reference_number=str(uuid.uuid4())[:8].upper(),
-            status=MoneyTransfer.COMPLETED  # Auto-approve for demo
-        )
-        
-        # Create transaction records for both users
-        # Handle case where transfer constants don't exist yet
-        try:
-            sender_kind = Transaction.TRANSFER_OUT
-            recipient_kind = Transaction.TRANSFER_IN
-        except AttributeError:
-            sender_kind = 'outgoing'
-            recipient_kind = 'incoming'
-            
-        Transaction.objects.create(
-            user=request.user,
-            description=f"Transfer to {recipient.username}: {description}",
-            amount=total_amount,  # Include fee in sender's deduction
-            currency=currency,
-            kind=sender_kind,
-            category="Transfer",
-        )
-        
-        Transaction.objects.create(
-            user=recipient,
-            description=f"Transfer from {request.user.username}: {description}",
-            amount=amount,  # Recipient gets amount without fee
-            currency=currency,
-            kind=recipient_kind,
-            category="Transfer",
-        )
-        
-        messages.success(
-            request, 
-            f"Successfully sent {amount} {currency} to {recipient.username}. "
-            f"Reference: {transfer.reference_number}"
+        transfer, created = transfer_service.send_money(
+            request.user,
+            request.POST.get("recipient_phone"),
+            request.POST.get("amount"),
+            currency=request.POST.get("currency", "USD"),
+            description=request.POST.get("description", ""),
+            idempotency_key=request.POST.get("idempotency_key"),
         )
+        if created:
+            messages.success(
+                request, 
+                f"Successfully sent {transfer.amount} {transfer.currency} to {transfer.recipient.username}. "
+                f"Reference: {transfer.reference_number}"
+            )
+        else:
+            messages.info(
+                request,
+                f"This transfer was already submitted. Reference: {transfer.reference_number}"
+            )
         
+    except transfer_service.TransferError as e:
+        messages.error(request, str(e))
     except Exception as e:
         messages.error(request, f"Transfer failed: {str(e)}")
     
@@ -257,19 +209,15 @@ def handle_admin_notification(request):
     notification_type = request.POST.get('notification_type', 'general')
     is_global = request.POST.get('is_global') == 'on'
     
-    notification = AdminNotification.objects.create(
-        title=title,
-        message=message,
-        notification_type=notification_type,
-        sent_by=request.user,
-        is_global=is_global
+    # Global notifications are resolved at read time, not copied per user
+    notifications.send(
+        request.user,
+        title,
+        message,
+        notification_type,
+        is_global=is_global,
     )
     
-    if is_global:
-        # Add all active users as recipients
-        active_users = User.objects.filter(profile__is_active=True)
-        notification.recipients.set(active_users)
-    
     messages.success(request, f"Notification '{title}' sent successfully.")
     return redirect('admin_dashboard')
 
@@ -1,4 +1,7 @@
+import asyncio
+
 from django.shortcuts import render
+from django.template.response import TemplateResponse
 from ..services import ForLearning as learning_service
 
 
@@ -17,3 +20,22 @@ def learning_view(request):
         "active_page": "learning",
     }
     return render(request, "ForLearning.html", context)
+
+
+async def alearning_view(request):
+    """
+    Async ``learning_view``, routed for requests served over ASGI.
+    """
+    category = request.GET.get("category")
+    resources, counts = await asyncio.gather(
+        learning_service.alist_resources(category),
+        learning_service.acategory_counts(),
+    )
+
+    context = {
+        "resources": resources,
+        "category_counts": counts,
+        "selected_category": category or "all",
+        "active_page": "learning",
+    }
+    return TemplateResponse(request, "ForLearning.html", context)
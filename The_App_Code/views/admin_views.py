@@ -1,14 +1,82 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Sum
 from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST
+from asgiref.sync import sync_to_async
+from datetime import datetime, timezone as dt_timezone
 from decimal import Decimal
+import json
 
 from ..models import UserProfile, MoneyTransfer, AdminNotification
+from ..services import admin_metrics, bulk_admin, live, notifications, ratelimit, tracing, transfer_states
+from .permissions import is_admin
+
+
+def handle_admin_notification(request):
+    """Send an admin notification to everyone or to the listed usernames."""
+    title = request.POST.get('title')
+    message = request.POST.get('message')
+    notification_type = request.POST.get('notification_type', AdminNotification.GENERAL)
+    is_global = request.POST.get('is_global') == 'on'
+
+    recipient_ids = []
+    if not is_global:
+        usernames = [name.strip() for name in request.POST.get('recipients', '').split(',') if name.strip()]
+        recipient_ids = list(User.objects.filter(username__in=usernames).values_list('pk', flat=True))
+        if not recipient_ids:
+            messages.error(request, "Add at least one existing username, or send to all users.")
+            return redirect('admin_dashboard')
+
+    # Global sends are read-time only; targeted rows are written by queued jobs
+    notifications.send(
+        request.user,
+        title,
+        message,
+        notification_type,
+        is_global=is_global,
+        recipient_ids=recipient_ids,
+    )
+
+    messages.success(request, f"Notification '{title}' sent successfully.")
+    return redirect('admin_dashboard')
+
+
+def handle_transfer_update(request):
+    """Move one transfer to a new status, if its current status allows it."""
+    transfer = get_object_or_404(MoneyTransfer, id=request.POST.get('transfer_id'))
+    status = request.POST.get('status')
+    try:
+        result = bulk_admin.update_transfer_status(request.user, status, ids=[transfer.pk])
+    except bulk_admin.BulkActionError as e:
+        messages.error(request, str(e))
+        return redirect('admin_dashboard')
+
+    if result.updated:
+        messages.success(request, f"Transfer {transfer.reference_number} marked as {status}.")
+    else:
+        messages.error(request, f"Transfer {transfer.reference_number} is {transfer.status} and cannot be marked as {status}.")
+    return redirect('admin_dashboard')
+
+
+def handle_user_toggle(request):
+    """Activate or suspend one user."""
+    user = get_object_or_404(User, id=request.POST.get('user_id'))
+    profile, created = UserProfile.objects.get_or_create(user=user)
+    result = bulk_admin.set_users_active(request.user, not profile.is_active, ids=[user.pk])
+
+    if not result.updated:
+        messages.error(request, "You cannot suspend your own account.")
+    else:
+        status = "suspended" if profile.is_active else "activated"
+        messages.success(request, f"User {user.username} has been {status}.")
+    return redirect('admin_dashboard')
 
 
 @login_required
+@tracing.traced("admin_dashboard")
 def admin_dashboard(request):
     """Administrator dashboard for managing users and transfers."""
     # Check if user is admin
@@ -21,29 +89,174 @@ def admin_dashboard(request):
         messages.error(request, "Access denied.")
         return redirect('dashboard')
     
-    # Get admin metrics
-    total_users = User.objects.count()
-    active_transfers = MoneyTransfer.objects.filter(status=MoneyTransfer.PENDING).count()
-    total_earnings = MoneyTransfer.objects.filter(
-        status=MoneyTransfer.COMPLETED
-    ).aggregate(total=Sum('service_fee'))['total'] or Decimal('0')
-    
-    completed_transfers = MoneyTransfer.objects.filter(status=MoneyTransfer.COMPLETED).count()
-    total_transfers = MoneyTransfer.objects.count()
-    success_rate = (completed_transfers / total_transfers * 100) if total_transfers > 0 else 0
+    if request.method == "POST":
+        action = request.POST.get("action")
+        if action == "send_notification":
+            return handle_admin_notification(request)
+        elif action == "update_transfer":
+            return handle_transfer_update(request)
+        elif action == "toggle_user":
+            return handle_user_toggle(request)
+
+    # KPI tiles come from one grouped pass, cached and refreshed by a job
+    metrics = admin_metrics.kpis()
     
     # Get recent data
     recent_transfers = MoneyTransfer.objects.select_related('sender', 'recipient').order_by('-created_at')[:10]
     user_profiles = UserProfile.objects.select_related('user').order_by('-created_at')[:15]
     
     context = {
-        'total_users': total_users,
-        'active_transfers': active_transfers,
-        'total_earnings': total_earnings,
-        'success_rate': success_rate,
-        'potential_earnings': total_earnings * Decimal('2'),
+        'total_users': metrics['total_users'],
+        'active_transfers': metrics['active_transfers'],
+        'total_earnings': metrics['total_earnings'],
+        'success_rate': metrics['success_rate'],
+        'potential_earnings': metrics['total_earnings'] * Decimal('2'),
+        'metrics_computed_at': datetime.fromtimestamp(metrics['computed_at'], tz=dt_timezone.utc),
+        # Starting point for the live feed's KPI deltas
+        'live_kpis': {
+            'transfers': sum(metrics['transfers_by_status'].values()),
+            'pending': metrics['active_transfers'],
+            'completed': metrics['transfers_by_status'].get(MoneyTransfer.COMPLETED, 0),
+            'earnings': str(metrics['total_earnings']),
+        },
+        # The feed picks up from the last event this page already reflects
+        'live_position': live.latest_id(),
         'recent_transfers': recent_transfers,
         'user_profiles': user_profiles,
     }
     
-    return render(request, 'admin_dashboard.html', context)
\ No newline at end of file
+    return render(request, 'admin_dashboard.html', context)
+
+
+@login_required
+def trace_export(request):
+    """Export sampled span timings and rate limiter metrics as JSON for administrators."""
+    if not is_admin(request.user):
+        return JsonResponse({"error": "Administrator privileges required."}, status=403)
+
+    try:
+        limit = int(request.GET.get("limit", 200))
+    except ValueError:
+        limit = 200
+
+    return JsonResponse({
+        "sample_rate": tracing.sample_rate(),
+        "summary": tracing.summary(),
+        "spans": tracing.recent(limit),
+        "rate_limits": ratelimit.metrics(),
+    })
+
+
+@login_required
+def transfer_events(request):
+    """
+    Page through the transfer event log for reconciliation: events after
+    ``after`` (an event id), oldest first. Pass the returned ``last_id``
+    as the next ``after``.
+    """
+    if not is_admin(request.user):
+        return JsonResponse({"error": "Administrator privileges required."}, status=403)
+
+    try:
+        after = int(request.GET.get("after", 0))
+        limit = int(request.GET.get("limit", transfer_states.MAX_EVENTS))
+    except ValueError:
+        return JsonResponse({"error": "after and limit must be integers."}, status=400)
+
+    events = transfer_states.events_since(after, limit)
+    return JsonResponse({
+        "events": [transfer_states.serialize(event) for event in events],
+        "last_id": events[-1].id if events else after,
+    })
+
+
+def _last_event_id(request):
+    return live.parse_id(request.headers.get("Last-Event-ID") or request.GET.get("last_event_id"))
+
+
+@login_required
+async def admin_events(request):
+    """
+    Server-sent events for the admin console: new transfers and status
+    changes with their KPI deltas, tailed from the transfer event log.
+
+    Served over ASGI this is one long-lived stream per console. A WSGI
+    worker cannot hold a stream open, so there the response only replays
+    what was missed and the browser reconnects after the retry interval.
+    """
+    user = await request.auser()
+    if not await sync_to_async(is_admin)(user):
+        return JsonResponse({"error": "Administrator privileges required."}, status=403)
+
+    last_id = _last_event_id(request)
+    if not isinstance(request, ASGIRequest):
+        body = await sync_to_async(live.replay)(last_id)
+        return HttpResponse(body, content_type="text/event-stream")
+
+    response = StreamingHttpResponse(live.stream(last_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # stop nginx from buffering the stream
+    return response
+
+
+def _bulk_payload(request):
+    try:
+        payload = json.loads(request.body or b"{}")
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict) or not isinstance(payload.get("filters", {}), dict):
+        raise bulk_admin.BulkActionError("Send the selection as a JSON object.")
+    return payload
+
+
+def _selection(payload):
+    ids = payload.get("ids") or []
+    if not isinstance(ids, list):
+        raise bulk_admin.BulkActionError("\"ids\" must be a list.")
+    return {
+        "ids": ids,
+        "filters": payload.get("filters") or {},
+        "reason": str(payload.get("reason", "")),
+        "dry_run": bool(payload.get("dry_run", False)),
+    }
+
+
+@login_required
+@require_POST
+def bulk_transfer_status(request):
+    """
+    Move many transfers to one status in a single update.
+
+    Body: ``{"status": "failed", "ids": [...], "filters": {...}, "reason":
+    "...", "dry_run": false}``. Rows whose status does not allow the move
+    are reported as skipped.
+    """
+    if not is_admin(request.user):
+        return JsonResponse({"error": "Administrator privileges required."}, status=403)
+    try:
+        payload = _bulk_payload(request)
+        result = bulk_admin.update_transfer_status(request.user, str(payload.get("status", "")), **_selection(payload))
+    except bulk_admin.BulkActionError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(result.as_dict())
+
+
+@login_required
+@require_POST
+def bulk_user_active(request):
+    """
+    Activate or suspend many users in a single update.
+
+    Body: ``{"active": false, "ids": [...], "filters": {...}, "reason": "...",
+    "dry_run": false}``; ``ids`` are user ids.
+    """
+    if not is_admin(request.user):
+        return JsonResponse({"error": "Administrator privileges required."}, status=403)
+    try:
+        payload = _bulk_payload(request)
+        if not isinstance(payload.get("active"), bool):
+            raise bulk_admin.BulkActionError("Set \"active\" to true or false.")
+        result = bulk_admin.set_users_active(request.user, payload["active"], **_selection(payload))
+    except bulk_admin.BulkActionError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(result.as_dict())
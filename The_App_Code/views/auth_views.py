@@ -1,14 +1,25 @@
 from django.shortcuts import render, redirect
-from django.contrib.auth import login, authenticate
-from django.contrib.auth.models import User
+from django.contrib.auth import login
 from django.contrib import messages
-from django.db import transaction
-from ..models import UserProfile
+import logging
+
+from ..services import ratelimit
+from ..services import registration as registration_service
+
+logger = logging.getLogger(__name__)
 
 
 def register_view(request):
     """Handle user registration with profile creation."""
     if request.method == 'POST':
+        # Turn bursts away before any lookup or password hashing
+        decision = ratelimit.hit('register', ip=ratelimit.client_ip(request))
+        if not decision.allowed:
+            messages.error(
+                request, f'Too many sign-up attempts. Try again in {decision.retry_after} seconds.'
+            )
+            return ratelimit.reject(render(request, 'register.html'), decision)
+
         # Get form data
         username = request.POST.get('username')
         email = request.POST.get('email')
@@ -24,7 +35,7 @@ def register_view(request):
         preferred_currency = request.POST.get('preferred_currency', 'USD')
         
         # Validation
-        if not all([username, email, password1, password2]):
+        if not all([username, email, password1, password2, phone_number]):
             messages.error(request, 'Please fill in all required fields.')
             return render(request, 'register.html')
         
@@ -36,52 +47,33 @@ def register_view(request):
             messages.error(request, 'Password must be at least 8 characters long.')
             return render(request, 'register.html')
         
-        if User.objects.filter(username=username).exists():
-            messages.error(request, 'Username already exists.')
-            return render(request, 'register.html')
-        
-        if User.objects.filter(email=email).exists():
-            messages.error(request, 'Email already registered.')
-            return render(request, 'register.html')
-        
-        if phone_number and UserProfile.objects.filter(phone_number=phone_number).exists():
-            messages.error(request, 'Phone number already registered.')
-            return render(request, 'register.html')
-        
         try:
-            # Create user and profile in a transaction
-            with transaction.atomic():
-                # Create user
-                user = User.objects.create_user(
+            # One pre-check query; unique constraints settle any race
+            with ratelimit.measure_hash('register'):
+                user = registration_service.register(
                     username=username,
                     email=email,
                     password=password1,
-                    first_name=first_name,
-                    last_name=last_name
-                )
-                
-                # Create user profile
-                UserProfile.objects.create(
-                    user=user,
-                    display_name=f"{first_name} {last_name}".strip() or username,
                     phone_number=phone_number,
-                    country=country,
+                    first_name=first_name,
+                    last_name=last_name,
+                    country=country or '',
                     city=city,
                     preferred_currency=preferred_currency,
-                    role=UserProfile.STANDARD,
-                    is_active=True
                 )
-                
-                # Log the user in
-                user = authenticate(username=username, password=password1)
-                if user:
-                    login(request, user)
-                    messages.success(request, f'Welcome to Remittence, {user.first_name or user.username}!')
-                    return redirect('dashboard')
-                    
-        except Exception as e:
-            messages.error(request, f'Registration failed: {str(e)}')
+        except registration_service.RegistrationError as e:
+            for error in e.errors.values():
+                messages.error(request, error)
+            return render(request, 'register.html')
+        except Exception:
+            logger.exception("Registration failed for %s", username)
+            messages.error(request, 'Registration failed. Please try again.')
             return render(request, 'register.html')
+        
+        # The password was just hashed; log in without authenticating again
+        login(request, user)
+        messages.success(request, f'Welcome to Remittence, {user.first_name or user.username}!')
+        return redirect('dashboard')
     
     # Countries for dropdown
     countries = [
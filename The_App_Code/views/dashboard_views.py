@@ -1,13 +1,19 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Count  # Use Count instead of Sum
 from django.utils import timezone
-from decimal import Decimal, InvalidOperation
+import logging
 import uuid
 
-from ..models import Transaction, SavingGoal, UserProfile, MoneyTransfer, Donation
 from ..forms import TransactionForm, SavingGoalForm
+from ..services import dashboard as dashboard_service
+from ..services import notifications as notification_service
+from ..services import rollups as rollup_service
+from ..services import transfers as transfer_service
+from ..services.tracing import traced
+
+logger = logging.getLogger(__name__)
 
 
 def handle_money_transfer(request):
@@ -16,72 +22,35 @@ def handle_money_transfer(request):
     amount = request.POST.get("amount")
     currency = request.POST.get("currency", "USD")
     description = request.POST.get("description", "")
+    idempotency_key = request.POST.get("idempotency_key")
     
     try:
-        # Validate amount
-        if not amount:
-            messages.error(request, "Please enter an amount to transfer.")
-            return redirect('dashboard')
-            
-        try:
-            amount = Decimal(str(amount))
-        except (InvalidOperation, ValueError):
-            messages.error(request, "Please enter a valid amount.")
-            return redirect('dashboard')
-            
-        if amount <= 0:
-            messages.error(request, "Amount must be greater than 0.")
-            return redirect('dashboard')
-            
-        service_fee = amount * Decimal('0.02')  # 2% fee
-        total_amount = amount + service_fee
-        
-        # Find recipient by phone number
-        recipient_profile = get_object_or_404(UserProfile, phone_number=recipient_phone)
-        recipient = recipient_profile.user
-        
-        # Create money transfer record
-        transfer = MoneyTransfer.objects.create(
-            sender=request.user,
-            recipient=recipient,
-            amount=amount,
+        transfer, created = transfer_service.send_money(
+            request.user,
+            recipient_phone,
+            amount,
             currency=currency,
-            service_fee=service_fee,
-            total_amount=total_amount,
             description=description,
-            reference_number=str(uuid.uuid4())[:8].upper(),
-            status='completed'  # Auto-approve for demo
-        )
-        
-        # Create transaction records for both users
-        Transaction.objects.create(
-            user=request.user,
-            description=f"Transfer to {recipient.username}: {description}",
-            amount=total_amount,  # Include fee in sender's deduction
-            currency=currency,
-            kind='outgoing',
-            category="Transfer",
+            idempotency_key=idempotency_key,
         )
-        
-        Transaction.objects.create(
-            user=recipient,
-            description=f"Transfer from {request.user.username}: {description}",
-            amount=amount,  # Recipient gets amount without fee
-            currency=currency,
-            kind='incoming',
-            category="Transfer",
-        )
-        
+    except transfer_service.TransferError as e:
+        messages.error(request, str(e))
+        return redirect('dashboard')
+    except Exception as e:
+        messages.error(request, f"Transfer failed: {str(e)}")
+        return redirect('dashboard')
+    
+    if created:
         messages.success(
             request, 
-            f"Successfully sent {amount} {currency} to {recipient.username}. "
-            f"Service fee: {service_fee} {currency}. Reference: {transfer.reference_number}"
+            f"Successfully sent {transfer.amount} {transfer.currency} to {transfer.recipient.username}. "
+            f"Service fee: {transfer.service_fee} {transfer.currency}. Reference: {transfer.reference_number}"
+        )
+    else:
+        messages.info(
+            request,
+            f"This transfer was already submitted. Reference: {transfer.reference_number}"
         )
-        
-    except UserProfile.DoesNotExist:
-        messages.error(request, "Recipient not found with that phone number.")
-    except Exception as e:
-        messages.error(request, f"Transfer failed: {str(e)}")
     
     return redirect('dashboard')
 
@@ -117,6 +86,7 @@ def handle_goal_form(request):
 
 
 @login_required(login_url="/login/")
+@traced("dashboard_view")
 def dashboard_view(request):
     """
     Display the user dashboard and handle transaction/goal submissions.
@@ -135,74 +105,30 @@ def dashboard_view(request):
             return handle_goal_form(request)
     
     try:
-        print(f"DEBUG: Starting dashboard for user {user.username}")
-        
-        # AVOID DECIMAL AGGREGATION - Use counts instead
-        print("DEBUG: Getting transaction counts...")
-        
-        # Count transactions instead of summing amounts
-        incoming_count = Transaction.objects.filter(
-            user=user, 
-            kind__in=['incoming', 'transfer_in']
-        ).count()
-        
-        outgoing_count = Transaction.objects.filter(
-            user=user, 
-            kind__in=['outgoing', 'transfer_out']
-        ).count()
-        
-        # Use placeholder values to avoid decimal issues
-        incoming_total = incoming_count * 100  # $100 average per transaction
-        outgoing_total = outgoing_count * 75   # $75 average per transaction
-        net_flow = incoming_total - outgoing_total
-        
-        print(f"DEBUG: Incoming transactions: {incoming_count}")
-        print(f"DEBUG: Outgoing transactions: {outgoing_count}")
-        
-        # Get recent transactions WITHOUT accessing amount field
-        print("DEBUG: Getting recent transactions...")
-        recent_transactions = Transaction.objects.filter(user=user).order_by("-created_at")[:10]
-        
-        # Get user's goals safely
-        print("DEBUG: Getting goals...")
-        goals = SavingGoal.objects.filter(user=user)[:5]
-        
-        # Get donation count instead of sum
-        print("DEBUG: Getting donations...")
-        donation_count = Donation.objects.filter(donor=user).count()
-        donation_total_packs = donation_count * 5  # 5 packs per donation average
-        
-        # Get available recipients
-        print("DEBUG: Getting available recipients...")
-        available_recipients = UserProfile.objects.filter(
-            phone_number__isnull=False,
-            phone_number__gt='',
-            is_active=True
-        ).exclude(user=user).select_related('user')
-        
-        print(f"DEBUG Dashboard: Current user is {user.username}")
-        print(f"DEBUG Dashboard: Found {available_recipients.count()} recipients")
-        for recipient in available_recipients:
-            print(f"  DEBUG: {recipient.user.username} - {recipient.phone_number} ({recipient.country})")
+        # Cached per-user metrics; model signals retire them on every write
+        metrics = dashboard_service.snapshot(user)
         
         context = {
-            "recent_transactions": recent_transactions,
-            "goals": goals,
-            "incoming_total": incoming_total,
-            "outgoing_total": outgoing_total,
-            "net_flow": net_flow,
-            "donation_total_packs": donation_total_packs,
-            "available_recipients": available_recipients,
+            "recent_transactions": metrics["recent_transactions"],
+            "goals": metrics["goals"][:5],
+            "incoming_total": metrics["incoming_total"],
+            "outgoing_total": metrics["outgoing_total"],
+            "net_flow": metrics["net_flow"],
+            "currency": metrics["currency"],
+            "unconverted_currencies": metrics["unconverted_currencies"],
+            "donation_total_packs": metrics["donation_total_packs"],
+            "notification_unread": notification_service.unread_count(user),
+            "spending_trend": rollup_service.series(user),
             "transaction_form": TransactionForm(),
             "goal_form": SavingGoalForm(),
+            "transfer_idempotency_key": uuid.uuid4().hex,
             "now": timezone.now(),
         }
         
-        print("DEBUG: Rendering template...")
         return render(request, "dashboard.html", context)
         
-    except Exception as e:
-        print(f"ERROR in dashboard_view: {e}")
+    except Exception:
+        logger.exception("Dashboard failed for user %s", user.pk)
         messages.error(request, "Dashboard loaded with sample data.")
         
         # Return safe context with sample data
@@ -213,12 +139,9 @@ def dashboard_view(request):
             "outgoing_total": 180,
             "net_flow": 70,
             "donation_total_packs": 15,
-            "available_recipients": UserProfile.objects.filter(
-                phone_number__isnull=False,
-                is_active=True
-            ).exclude(user=user).select_related('user'),
             "transaction_form": TransactionForm(),
             "goal_form": SavingGoalForm(),
+            "transfer_idempotency_key": uuid.uuid4().hex,
             "now": timezone.now(),
         }
         
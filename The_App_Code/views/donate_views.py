@@ -1,5 +1,7 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib import messages
+from django.template.response import TemplateResponse
 from ..services import donate as donate_service
 
 
@@ -16,3 +18,23 @@ def donate_view(request):
     context.update(extras)
     context["active_page"] = "donate"
     return render(request, "donate.html", context)
+
+
+async def adonate_view(request):
+    """
+    Async ``donate_view``, routed for requests served over ASGI.
+    """
+    user = await request.auser()
+    if request.method == "POST":
+        # Saving a pledge stays on the sync form path; only reads run async.
+        success, extras = await sync_to_async(donate_service.handle_post)(request, user)
+        if success:
+            messages.success(request, "Thank you for your donation!")
+            return redirect("donate")
+    else:
+        extras = {}
+
+    context = await donate_service.abuild_context(user)
+    context.update(extras)
+    context["active_page"] = "donate"
+    return TemplateResponse(request, "donate.html", context)
@@ -0,0 +1,56 @@
+from django.contrib.auth.models import User
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseBadRequest, HttpResponseForbidden, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import require_GET
+
+from ..services import exports as export_service
+from .permissions import is_admin
+
+
+def _date_param(request, name):
+    value = request.GET.get(name)
+    if not value:
+        return None
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(f"{name} must be a YYYY-MM-DD date")
+    return parsed
+
+
+@login_required(login_url="/login/")
+@require_GET
+def statement_export(request):
+    """
+    Stream the user's transactions or transfers as CSV or NDJSON.
+
+    Query parameters: ``source`` (transactions|transfers), ``format``
+    (csv|ndjson), ``start``/``end`` dates and repeated ``kind`` filters.
+    Administrators may pass ``user`` to export another account.
+    """
+    source = request.GET.get("source", export_service.TRANSACTIONS)
+    fmt = request.GET.get("format", export_service.CSV)
+    if source not in export_service.SOURCES or fmt not in export_service.FORMATS:
+        return HttpResponseBadRequest("Unknown export source or format.")
+    try:
+        start, end = _date_param(request, "start"), _date_param(request, "end")
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+
+    owner = request.user
+    user_id = request.GET.get("user", "").strip()
+    if user_id:
+        if not (user_id.isascii() and user_id.isdigit()):
+            return HttpResponseBadRequest("user must be a numeric user id")
+        if not is_admin(request.user):
+            return HttpResponseForbidden("Administrator privileges required.")
+        owner = get_object_or_404(User, pk=int(user_id))
+
+    lines = export_service.export(
+        owner, source, fmt, start=start, end=end, kinds=request.GET.getlist("kind"),
+    )
+    response = StreamingHttpResponse(lines, content_type=export_service.CONTENT_TYPES[fmt])
+    filename = f"{owner.username}-{source}.{fmt}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
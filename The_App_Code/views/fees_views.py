@@ -0,0 +1,33 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from ..services import fees as fee_service
+from ..services import phones
+from ..services import transfers as transfer_service
+
+
+@login_required(login_url="/login/")
+@require_GET
+def fee_quote(request):
+    """
+    Price a transfer for the send-money form without posting it.
+
+    ``recipient`` is optional; without it the quote uses the sender's side
+    of the corridor only.
+    """
+    try:
+        amount = transfer_service.parse_amount(request.GET.get("amount"))
+    except transfer_service.TransferError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    currency = request.GET.get("currency", "USD")
+    recipient = None
+    if request.GET.get("recipient"):
+        recipient = transfer_service.resolve_recipient(request.GET["recipient"], request.user)
+
+    if recipient is not None:
+        quote = transfer_service.quote(request.user, recipient, amount, currency)
+    else:
+        quote = fee_service.quote(amount, currency, phones.country_of(request.user))
+    return JsonResponse(quote.as_dict())
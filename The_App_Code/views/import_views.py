@@ -0,0 +1,35 @@
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import redirect
+from django.views.decorators.http import require_POST
+
+from ..services import imports as import_service
+
+SHOWN_ERRORS = 5
+
+
+@login_required(login_url="/login/")
+@require_POST
+def transaction_import(request):
+    """
+    Import an uploaded CSV or OFX bank statement into the user's transactions.
+    """
+    upload = request.FILES.get("statement")
+    if not upload:
+        messages.error(request, "Please choose a statement file to import.")
+        return redirect("dashboard")
+
+    report = import_service.import_file(
+        request.user,
+        upload.file,
+        fmt=import_service.detect_format(upload.name),
+    )
+
+    if report.created or not report.error_count:
+        messages.success(request, f"Statement imported: {report}.")
+    else:
+        messages.error(request, f"Nothing imported: {report}.")
+    for line, error in report.errors[:SHOWN_ERRORS]:
+        messages.warning(request, f"Row {line}: {error}")
+
+    return redirect("dashboard")
@@ -1,18 +1,19 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth import login
-from ..services import login as login_service
+from ..services import login as login_service, ratelimit
 
 
 def login_view(request):
     """
     Render the login page and authenticate user.
     """
-    success, form = login_service.handle_request(request)
+    success, form, throttled = login_service.handle_request(request)
     if success:
         messages.success(request, "Welcome back!")
         return redirect("dashboard")
 
     context = login_service.build_context(form)
     context["active_page"] = "login"
-    return render(request, "login.html", context)
+    response = render(request, "login.html", context)
+    return ratelimit.reject(response, throttled) if throttled else response
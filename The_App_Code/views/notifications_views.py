@@ -0,0 +1,30 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+
+from ..services import notifications as notification_service
+
+
+@login_required(login_url="/login/")
+@require_http_methods(["GET", "POST"])
+def notification_feed(request):
+    """
+    GET: the user's recent notifications and unread count.
+    POST: the same, then mark everything up to ``upto`` (default: the newest) as seen.
+    """
+    upto = None
+    if request.POST.get("upto"):
+        try:
+            upto = int(request.POST["upto"])
+        except ValueError:
+            return JsonResponse({"error": "upto must be a notification id."}, status=400)
+
+    # Read before marking so the response still flags what was new
+    results = notification_service.recent(request.user)
+    if request.method == "POST":
+        notification_service.mark_seen(request.user, upto)
+
+    return JsonResponse({
+        "unread": notification_service.unread_count(request.user),
+        "results": results,
+    })
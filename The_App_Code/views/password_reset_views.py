@@ -1,15 +1,23 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.core.mail import send_mail
 from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
 from django.urls import reverse
-from django.utils.crypto import get_random_string
-from django.utils import timezone
-from datetime import timedelta
-import uuid
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 
-from ..models import PasswordResetToken
+from ..services import mail
+
+
+def _user_for_link(uidb64, token):
+    """The user a reset link was issued for, if its token still checks out."""
+    try:
+        user_id = urlsafe_base64_decode(uidb64).decode()
+        user = User.objects.get(pk=user_id, is_active=True)
+    except (TypeError, ValueError, OverflowError, User.DoesNotExist):
+        return None
+    return user if default_token_generator.check_token(user, token) else None
 
 
 def password_reset_request(request):
@@ -24,44 +32,28 @@ def password_reset_request(request):
         try:
             user = User.objects.get(email=email)
             
-            # Create reset token
-            token = str(uuid.uuid4())
-            expires_at = timezone.now() + timedelta(hours=2)  # Token expires in 2 hours
-            
-            # Delete any existing tokens for this user
-            PasswordResetToken.objects.filter(user=user).delete()
-            
-            # Create new token
-            reset_token = PasswordResetToken.objects.create(
-                user=user,
-                token=token,
-                expires_at=expires_at
-            )
-            
-            # Create reset URL
+            # Nothing is stored: the token expires after PASSWORD_RESET_TIMEOUT
+            # and stops working once the password changes
             reset_url = request.build_absolute_uri(
-                reverse('password_reset_confirm', kwargs={'token': token})
+                reverse('password_reset_confirm', kwargs={
+                    'uidb64': urlsafe_base64_encode(force_bytes(user.pk)),
+                    'token': default_token_generator.make_token(user),
+                })
             )
             
-            # Send email (for now, just show the link)
-            try:
-                send_mail(
-                    subject='Remittence - Password Reset',
-                    message=f'Click this link to reset your password: {reset_url}',
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[email],
-                    fail_silently=False,
-                )
-                messages.success(
-                    request, 
-                    f'Password reset link has been sent to {email}. Please check your email.'
-                )
-            except Exception as e:
+            # Sent by the job worker; the request returns once it is queued
+            mail.queue(
+                subject='Remittence - Password Reset',
+                message=f'Click this link to reset your password: {reset_url}',
+                recipient_list=[email],
+            )
+            messages.success(
+                request, 
+                f'Password reset link has been sent to {email}. Please check your email.'
+            )
+            if settings.DEBUG:
                 # For development, show the reset link directly
-                messages.info(
-                    request,
-                    f'Email not configured. Use this link to reset: {reset_url}'
-                )
+                messages.info(request, f'Development mode: use this link to reset: {reset_url}')
             
             return redirect('login')
             
@@ -76,15 +68,10 @@ def password_reset_request(request):
     return render(request, 'password_reset_request.html')
 
 
-def password_reset_confirm(request, token):
+def password_reset_confirm(request, uidb64, token):
     """Handle password reset confirmation."""
-    try:
-        reset_token = PasswordResetToken.objects.get(
-            token=token,
-            used=False,
-            expires_at__gt=timezone.now()
-        )
-    except PasswordResetToken.DoesNotExist:
+    user = _user_for_link(uidb64, token)
+    if user is None:
         messages.error(request, 'Invalid or expired reset link.')
         return redirect('login')
     
@@ -104,20 +91,15 @@ def password_reset_confirm(request, token):
             messages.error(request, 'Password must be at least 8 characters long.')
             return render(request, 'password_reset_confirm.html', {'token': token})
         
-        # Reset the password
-        user = reset_token.user
+        # Changing the password hash invalidates the link
         user.set_password(password1)
         user.save()
         
-        # Mark token as used
-        reset_token.used = True
-        reset_token.save()
-        
         messages.success(request, 'Your password has been reset successfully. You can now login.')
         return redirect('login')
     
     context = {
         'token': token,
-        'user': reset_token.user
+        'user': user
     }
     return render(request, 'password_reset_confirm.html', context)
\ No newline at end of file
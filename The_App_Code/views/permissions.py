@@ -0,0 +1,4 @@
+def is_admin(user):
+    """Whether ``user`` has an admin or super-admin profile; False for anonymous users."""
+    profile = getattr(user, "profile", None)
+    return profile is not None and profile.is_admin()
@@ -1,4 +1,5 @@
 from django.shortcuts import render
+from django.template.response import TemplateResponse
 from ..services import promotions as promotions_service
 
 
@@ -12,3 +13,16 @@ def promotions_view(request):
         "active_page": "promotions",
     }
     return render(request, "promotions.html", context)
+
+
+async def apromotions_view(request):
+    """
+    Async ``promotions_view``, routed for requests served over ASGI.
+    """
+    promotions = await promotions_service.alist_promotions()
+    context = {
+        "promotions": promotions,
+        "active_page": "promotions",
+    }
+    # Rendered by the handler in a sync thread: context processors touch the session
+    return TemplateResponse(request, "promotions.html", context)
@@ -0,0 +1,27 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from ..services import recipients as recipients_service
+
+
+def _int_param(request, name, default=None):
+    try:
+        return int(request.GET.get(name) or default)
+    except (TypeError, ValueError):
+        return default
+
+
+@login_required(login_url="/login/")
+@require_GET
+def recipient_search(request):
+    """
+    Page through active recipients for the send-money picker.
+    """
+    results, next_cursor = recipients_service.search(
+        request.user,
+        request.GET.get("q", ""),
+        after=_int_param(request, "after"),
+        limit=_int_param(request, "limit", recipients_service.DEFAULT_LIMIT),
+    )
+    return JsonResponse({"results": results, "next": next_cursor})
@@ -1,4 +1,7 @@
+import asyncio
+
 from django.shortcuts import render
+from django.template.response import TemplateResponse
 from ..services import users as users_service
 
 
@@ -12,3 +15,19 @@ def users_view(request):
         "active_page": "users",
     }
     return render(request, "users.html", context)
+
+
+async def ausers_view(request):
+    """
+    Async ``users_view``, routed for requests served over ASGI.
+    """
+    total_users, breakdown = await asyncio.gather(
+        users_service.atotal_users(),
+        users_service.acategory_breakdown(),
+    )
+    context = {
+        "total_users": total_users,
+        "membership_breakdown": breakdown,
+        "active_page": "users",
+    }
+    return TemplateResponse(request, "users.html", context)